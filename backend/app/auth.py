@@ -1,12 +1,19 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Users
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.cache import MemoryCache
+from app.config import settings
+from app.database import SessionLocal, get_async_db, get_db
+from app.metrics import metrics
+from app.models import TokenFamily, Users
+from app.password_hashing import pwd_context
+from app.token_revocation import revoke_family, token_revocations
+from uuid import UUID
 import os
 from dotenv import load_dotenv
 
@@ -15,22 +22,21 @@ load_dotenv()
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 500
-REFRESH_TOKEN_EXPIRE_DAYS = 7
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 # JWT Bearer scheme
 security = HTTPBearer()
+# Same scheme for endpoints where a token is optional (no 403 when it's missing)
+optional_security = HTTPBearer(auto_error=False)
 
 class AuthHandler:
     def hash_password(self, password: str) -> str:
-        """Hash a password"""
+        """Hash a password (blocking; endpoints await password_hasher instead)"""
         return pwd_context.hash(password)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
+        """Verify a password against its hash (blocking; endpoints await password_hasher instead)"""
         return pwd_context.verify(plain_password, hashed_password)
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -65,31 +71,143 @@ class AuthHandler:
                 headers={"WWW-Authenticate": "Bearer"},
             )
     
-    def refresh_access_token(self, refresh_token: str) -> str:
-        """Generate new access token from refresh token"""
+    def issue_tokens(self, user: Users, db: Session) -> dict:
+        """Start a token family for a login: an access token and the family's first refresh token"""
+        family = TokenFamily(
+            userid=user.id,
+            generation=0,
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        db.add(family)
+        db.commit()
+        return self._family_tokens(user.username, user.id, family)
+    
+    def refresh_access_token(self, refresh_token: str, db: Session) -> dict:
+        """
+        Exchange a refresh token for a new access token and the next refresh token of its family.
+        Each refresh token works once: presenting a used one (a stolen copy, or the original
+        after the thief used it) revokes the family, logging out both holders.
+        """
         payload = self.verify_token(refresh_token)
         
-        if payload.get("type") != "refresh":
+        if payload.get("type") != "refresh" or not payload.get("fam"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token type"
             )
         
-        # Create new access token
-        user_data = {"sub": payload.get("sub"), "username": payload.get("username")}
-        access_token = self.create_access_token(data=user_data)
-        return access_token
+        # Row lock: concurrent refreshes with the same token can't both rotate
+        family = db.query(TokenFamily).filter(
+            TokenFamily.family_id == UUID(payload["fam"])
+        ).with_for_update().first()
+        if family is None or family.revoked_at is not None or family.expires_at <= datetime.utcnow():
+            db.rollback()
+            raise _token_revoked()
+        if payload.get("gen") != family.generation:
+            revoke_family(db, family)
+            db.commit()
+            raise _token_revoked()
+        
+        family.generation += 1
+        family.expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        db.commit()
+        return self._family_tokens(payload["sub"], payload.get("uid"), family)
+    
+    def revoke_refresh_token(self, refresh_token: str, db: Session):
+        """Log out: revoke the family of a refresh token (unknown or invalid tokens are ignored)"""
+        try:
+            payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return
+        if payload.get("type") != "refresh" or not payload.get("fam"):
+            return
+        family = db.get(TokenFamily, UUID(payload["fam"]))
+        if family is not None:
+            revoke_family(db, family)
+            db.commit()
+    
+    def _family_tokens(self, username: str, user_id, family: TokenFamily) -> dict:
+        claims = {"sub": username, "uid": str(user_id), "fam": str(family.family_id)}
+        return {
+            "access_token": self.create_access_token(data=claims),
+            "refresh_token": self.create_refresh_token(data={**claims, "gen": family.generation}),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        }
 
 # Create auth handler instance
 auth_handler = AuthHandler()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Users:
-    """Get current authenticated user"""
-    token = credentials.credentials
+# Principal cache: user id -> Users column values (not the password hash), so an
+# authenticated request doesn't need a users lookup. Keyed by id, not username: a name
+# freed by a deleted user may be taken by a new account. Deleting a user revokes their
+# token families (seen by every worker), and leaves a local tombstone so this worker
+# rejects their tokens without waiting for the revocation sync.
+principal_cache = MemoryCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+PRINCIPAL_COLUMNS = [column.key for column in Users.__table__.columns if column.key != "password"]
+DELETED_PRINCIPAL = "deleted"
+
+def _principal_key(user_id) -> str:
+    return f"user:{user_id}"
+
+def invalidate_principal(user_id: UUID, deleted: bool = False):
+    """Forget a cached user; call after deleting them or changing their role."""
+    if deleted:
+        principal_cache.set(_principal_key(user_id), DELETED_PRINCIPAL, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    else:
+        principal_cache.delete(_principal_key(user_id))
+
+@event.listens_for(Users, "after_update")
+def _invalidate_updated_principal(mapper, connection, target):
+    # Covers admin `type` changes (and renames) wherever they are made
+    invalidate_principal(target.id)
+
+def _token_revoked():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _user_not_found():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found"
+    )
+
+def _load_principal(payload: dict, db: Session) -> Users:
+    """The user of an access token, from the principal cache when possible."""
+    if not payload.get("uid"):
+        # Tokens issued before the uid claim existed
+        user = db.query(Users).filter(Users.username == payload["sub"]).first()
+        if user is None:
+            raise _user_not_found()
+        return user
     
+    user_id = UUID(payload["uid"])
+    cached = principal_cache.get(_principal_key(user_id))
+    if cached == DELETED_PRINCIPAL:
+        raise _user_not_found()
+    if cached is not None:
+        metrics.incr("principal_cache.hits")
+        # Attach to this session without a SELECT; unloaded columns lazy-load on access
+        user = Users(**cached)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    metrics.incr("principal_cache.misses")
+    user = db.get(Users, user_id)
+    if user is None:
+        raise _user_not_found()
+    principal_cache.set(
+        _principal_key(user_id),
+        {column: getattr(user, column) for column in PRINCIPAL_COLUMNS},
+        settings.PRINCIPAL_CACHE_TTL_SECONDS
+    )
+    return user
+
+def _access_token_payload(token: str) -> dict:
+    """Decode an access token and check its subject and type."""
     try:
         payload = auth_handler.verify_token(token)
         username: str = payload.get("sub")
@@ -107,6 +225,10 @@ def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token type"
             )
+        
+        # Logged out / refresh token reuse: an in-memory filter check, no query
+        if payload.get("fam") and token_revocations.is_revoked(payload["fam"]):
+            raise _token_revoked()
             
     except JWTError:
         raise HTTPException(
@@ -115,32 +237,54 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = db.query(Users).filter(Users.username == username).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
+    return payload
 
-def get_current_active_user(current_user: Users = Depends(get_current_user)) -> Users:
-    """Get current active user (can add additional checks here)"""
-    return current_user
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Users:
+    """Get current authenticated user"""
+    payload = _access_token_payload(credentials.credentials)
+    return _load_principal(payload, db)
 
-def get_admin_user(current_user: Users = Depends(get_current_user)) -> Users:
-    """Get current user if they are admin"""
-    if not current_user.type:  # type=True means admin
+def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> UUID:
+    """Get the current user's ID from the token alone, for endpoints that need nothing else"""
+    payload = _access_token_payload(credentials.credentials)
+    return _user_id_from_payload(payload, db)
+
+def get_stream_user_id(
+    token: Optional[str] = Query(default=None, description="Access token, for clients that can't send headers (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> UUID:
+    """Like get_current_user_id, for long-lived streams: no session is held for the connection's lifetime"""
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    return current_user
+    payload = _access_token_payload(raw_token)
+    with SessionLocal() as db:
+        return _user_id_from_payload(payload, db)
+
+def _user_id_from_payload(payload: dict, db: Session) -> UUID:
+    if not payload.get("uid"):
+        return _load_principal(payload, db).id
+    
+    # A deleted user's tokens fail the family revocation check on every worker; the
+    # tombstone covers this worker in the meantime
+    user_id = UUID(payload["uid"])
+    if principal_cache.get(_principal_key(user_id)) == DELETED_PRINCIPAL:
+        raise _user_not_found()
+    return user_id
 
 # Optional: For routes that don't require authentication but can use user info if available
 def get_optional_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db)
 ) -> Optional[Users]:
     """Get current user if token is provided, otherwise return None"""
@@ -148,10 +292,57 @@ def get_optional_current_user(
         return None
     
     try:
-        return get_current_user(credentials, db)
+        return _load_principal(_access_token_payload(credentials.credentials), db)
     except HTTPException:
         return None
 
+# DATABASE_ASYNC versions of the above. They authenticate on the request's AsyncSession,
+# the one its endpoint gets (see app/routing.py), so an async request neither opens a
+# sync session nor waits for a threadpool thread to authenticate.
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Users:
+    payload = _access_token_payload(credentials.credentials)
+    return await db.run_sync(lambda session: _load_principal(payload, session))
+
+async def get_current_user_id_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> UUID:
+    payload = _access_token_payload(credentials.credentials)
+    return await db.run_sync(lambda session: _user_id_from_payload(payload, session))
+
+async def get_optional_current_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[Users]:
+    if not credentials:
+        return None
+    
+    try:
+        return await get_current_user_async(credentials, db)
+    except HTTPException:
+        return None
+
+if settings.DATABASE_ASYNC:
+    get_current_user = get_current_user_async
+    get_current_user_id = get_current_user_id_async
+    get_optional_current_user = get_optional_current_user_async
+
+def get_current_active_user(current_user: Users = Depends(get_current_user)) -> Users:
+    """Get current active user (can add additional checks here)"""
+    return current_user
+
+async def get_admin_user(current_user: Users = Depends(get_current_user)) -> Users:
+    """Get current user if they are admin (no I/O, so it runs on the event loop)"""
+    if not current_user.type:  # type=True means admin
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
 # Token response models
 class Token:
     def __init__(self, access_token: str, refresh_token: str, token_type: str = "bearer"):
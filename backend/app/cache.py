@@ -0,0 +1,342 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+import orjson
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import metrics
+from app.routing import async_session_signature, session_param
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Invalidation namespaces: feeds/stats/tags change with any question write,
+# a question page with writes to that question, its answers or their votes
+QUESTIONS_NAMESPACE = "questions"
+
+def question_namespace(qid) -> str:
+    return f"question:{qid}"
+
+
+class MemoryCache:
+    """
+    In-process LRU store with per-entry TTL (the default backend).
+
+    Counters (ResponseCache generations) are kept apart: at most `max_counters`, least recently
+    used first, each dropped after `counter_ttl` seconds unused. A missing counter reads as the
+    floor: above every value a dropped counter had (and not 0 in a new process), so a namespace
+    whose counter comes back never repeats a generation that live entries are keyed with.
+    """
+    blocking = False
+
+    def __init__(self, max_entries: int, max_counters: int = 10000, counter_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_counters = max_counters
+        self.counter_ttl = counter_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._counters: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._counter_floor = int(time.time())
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            now = time.monotonic()
+            value = self._counter(key, now)
+            value = self._touch_counter(key, (self._counter_floor if value is None else value) + 1, now)
+            # Least recently used first, which is also soonest to expire
+            while self._counters and (
+                len(self._counters) > self.max_counters or next(iter(self._counters.values()))[0] <= now
+            ):
+                self._drop_counter(next(iter(self._counters)))
+            return value
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        with self._lock:
+            now = time.monotonic()
+            values = []
+            for key in keys:
+                value = self._counter(key, now)
+                # Entries are about to be keyed with it: keep it alive at least as long as they are
+                values.append(self._counter_floor if value is None else self._touch_counter(key, value, now))
+            return values
+
+    def _counter(self, key: str, now: float) -> Optional[int]:
+        counter = self._counters.get(key)
+        if counter is None:
+            return None
+        if counter[0] <= now:
+            self._drop_counter(key)
+            return None
+        return counter[1]
+
+    def _touch_counter(self, key: str, value: int, now: float) -> int:
+        expires_at = now + self.counter_ttl if self.counter_ttl is not None else float("inf")
+        self._counters[key] = (expires_at, value)
+        self._counters.move_to_end(key)
+        return value
+
+    def _drop_counter(self, key: str):
+        _, value = self._counters.pop(key)
+        self._counter_floor = max(self._counter_floor, value + 1)
+
+
+class RedisCache:
+    """
+    Store shared by all workers, for any client with the redis-py get/set/incr/mget API
+    (a fake such as fakeredis can stand in locally). Values are stored as JSON.
+    """
+    blocking = True  # network round trips: async endpoints call it from the threadpool
+
+    def __init__(self, client, prefix: str = "stackit:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCache":
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, json.dumps(value, separators=(",", ":")), ex=max(int(ttl), 1))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        if not keys:
+            return []
+        return [int(value or 0) for value in self.client.mget([self.prefix + key for key in keys])]
+
+
+class ResponseCache:
+    """
+    Read-through cache of JSON responses with stale-while-revalidate.
+
+    Entries are fresh for `ttl` seconds and may then be served stale for `stale_ttl` more
+    while one background refresh recomputes them. Each entry's key embeds the current
+    generation of the namespaces it depends on, so invalidate() bumps a counter instead
+    of scanning keys, and an invalidated entry is never served, not even stale.
+    """
+
+    def __init__(self, backend, ttl: float, stale_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        metrics.gauge("response_cache.hit_ratio", self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        hits = metrics.get("response_cache.hits") + metrics.get("response_cache.stale_hits")
+        total = hits + metrics.get("response_cache.misses")
+        return hits / total if total else 0.0
+
+    def invalidate(self, *namespaces: str):
+        """Drop every entry that depends on any of the namespaces (call after commit)."""
+        for namespace in namespaces:
+            if self.backend.blocking and in_greenlet():
+                # An async endpoint's run_sync (see app/routing.py): wait off the event loop
+                await_only(run_in_threadpool(self.backend.incr, "gen:" + namespace))
+            else:
+                self.backend.incr("gen:" + namespace)
+        metrics.incr("response_cache.invalidations", len(namespaces))
+
+    def key(self, name: str, params: Dict[str, Any], namespaces: List[str]) -> str:
+        generations = self.backend.get_counters(["gen:" + namespace for namespace in namespaces])
+        versions = ",".join(f"{namespace}@{generation}" for namespace, generation in zip(namespaces, generations))
+        normalized = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        return f"{name}|{versions}|{normalized}"
+
+    def get_or_compute(self, key: str, compute: Callable[[], dict], refresh: Optional[Callable[[], dict]] = None) -> dict:
+        """
+        Return the cached entry for key. A miss is computed inline; a stale hit is returned
+        as is and recomputed in the background with `refresh` (default: `compute`).
+        """
+        entry = self.lookup(key, refresh or compute)
+        if entry is None:
+            entry = self.store(key, compute())
+        return entry
+
+    def lookup(self, key: str, refresh: Callable[[], dict]) -> Optional[dict]:
+        """The entry for key, or None on a miss; a stale hit is recomputed in the background with `refresh`."""
+        entry = self.backend.get(key)
+        if entry is None:
+            metrics.incr("response_cache.misses")
+            return None
+        if entry["fresh_until"] > time.time():
+            metrics.incr("response_cache.hits")
+        else:
+            metrics.incr("response_cache.stale_hits")
+            self._refresh_in_background(key, refresh)
+        return entry
+
+    def store(self, key: str, entry: dict) -> dict:
+        entry["fresh_until"] = time.time() + self.ttl
+        self.backend.set(key, entry, self.ttl + self.stale_ttl)
+        return entry
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], dict]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(key, compute())
+            except Exception:
+                metrics.incr("response_cache.refresh_errors")
+                logger.exception("Response cache refresh failed for %s", key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="response-cache-refresh", daemon=True).start()
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCache.from_url(settings.RESPONSE_CACHE_REDIS_URL)
+    return MemoryCache(
+        settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_counters=settings.RESPONSE_CACHE_MAX_GENERATIONS,
+        counter_ttl=settings.RESPONSE_CACHE_GENERATION_TTL_SECONDS
+    )
+
+
+response_cache = ResponseCache(
+    _create_backend(),
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_STALE_SECONDS
+)
+
+
+async def _off_loop(call: Callable, *args):
+    """Call the cache from an async endpoint: in the threadpool if its backend blocks (Redis)."""
+    if response_cache.backend.blocking:
+        return await run_in_threadpool(call, *args)
+    return call(*args)
+
+
+def cached(namespaces: Union[Iterable[str], Callable[[Dict[str, Any]], Iterable[str]]]):
+    """
+    Serve a (sync, user-independent) GET endpoint from response_cache.
+
+    The key is the endpoint name plus its validated parameters, so equivalent query strings
+    share an entry. `namespaces` is a list, or a function of those parameters, naming what
+    invalidates the entry. Headers the endpoint sets on its `response` (e.g. X-Next-Cursor)
+    are cached along with the body. The endpoint may return data or a ready JSON response
+    (see app/serialization.py).
+
+    With DATABASE_ASYNC the wrapper is async: only a miss runs the endpoint on the request's
+    AsyncSession, and cache reads and writes stay off the event loop.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        db_param = session_param(signature)
+        response_param = next((p.name for p in signature.parameters.values() if p.annotation is Response), None)
+        name = f"{func.__module__}.{func.__name__}"
+
+        def compute(kwargs: Dict[str, Any]) -> dict:
+            response = Response()
+            del response.headers["content-length"]
+            if response_param:
+                kwargs[response_param] = response
+            body = func(**kwargs)
+            # Entries hold the serialized JSON, so hits skip encoding altogether
+            if isinstance(body, Response):
+                content = body.body.decode()
+            else:
+                content = orjson.dumps(jsonable_encoder(body)).decode()
+            return {"body": content, "headers": dict(response.headers)}
+
+        def compute_in_new_session(kwargs: Dict[str, Any]) -> dict:
+            # Background refreshes outlive the request and its session
+            db = SessionLocal()
+            try:
+                return compute({**kwargs, db_param: db} if db_param else dict(kwargs))
+            finally:
+                db.close()
+
+        def cache_key(kwargs: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+            params = {k: v for k, v in kwargs.items() if k not in (db_param, response_param)}
+            depends_on = list(namespaces(params) if callable(namespaces) else namespaces)
+            return response_cache.key(name, params, depends_on), params
+
+        def respond(entry: dict) -> Response:
+            return Response(content=entry["body"], media_type="application/json", headers=entry["headers"])
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            if settings.RESPONSE_CACHE_BACKEND == "none":
+                return func(**kwargs)
+
+            key, params = cache_key(kwargs)
+            # A miss is computed on the request's own session, like an uncached call
+            entry = response_cache.get_or_compute(
+                key,
+                lambda: compute(dict(kwargs)),
+                lambda: compute_in_new_session(params)
+            )
+            return respond(entry)
+
+        if not (settings.DATABASE_ASYNC and db_param):
+            return wrapper
+
+        @functools.wraps(func)
+        async def async_wrapper(**kwargs):
+            db: AsyncSession = kwargs.pop(db_param)
+            if settings.RESPONSE_CACHE_BACKEND == "none":
+                return await db.run_sync(lambda session: func(**kwargs, **{db_param: session}))
+
+            key, params = await _off_loop(cache_key, kwargs)
+            entry = await _off_loop(response_cache.lookup, key, lambda: compute_in_new_session(params))
+            if entry is None:
+                entry = await db.run_sync(lambda session: compute({**kwargs, db_param: session}))
+                await _off_loop(response_cache.store, key, entry)
+            return respond(entry)
+
+        # The route passes the request's AsyncSession (see app/routing.py)
+        async_wrapper.__signature__ = async_session_signature(signature, db_param)
+        return async_wrapper
+    return decorator
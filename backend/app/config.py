@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 load_dotenv()
@@ -6,6 +7,95 @@ load_dotenv()
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
+    
+    # Serve the routers' database work on an AsyncEngine/AsyncSession instead of the
+    # threadpool; ASYNC_DATABASE_URL defaults to DATABASE_URL with the asyncpg/aiosqlite driver
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool, per engine and per worker: keep
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres' max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = -1  # seconds; replace connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = True  # test each checkout; turn off when recycle covers server idle timeouts
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # PostgreSQL statement_timeout (0 = server default)
+    # Behind PgBouncer in transaction mode: no prepared statement caching, no startup
+    # options; DB_NULL_POOL leaves all pooling to PgBouncer
+    DB_PGBOUNCER: bool = False
+    DB_NULL_POOL: bool = False
+    
+    # Write-behind vote counters: Votes rows are written immediately, Question/Answer.votes
+    # deltas are coalesced in memory and flushed at least every VOTE_BUFFER_FLUSH_MS, or as
+    # soon as VOTE_BUFFER_MAX_PENDING posts have pending deltas (bounds what a crash can lose)
+    VOTE_BUFFER_ENABLED: bool = False
+    VOTE_BUFFER_FLUSH_MS: int = 250
+    VOTE_BUFFER_MAX_PENDING: int = 1000
+
+    # Response cache for the public home/question reads: "memory" (per worker), "redis"
+    # (shared, needs the redis package and RESPONSE_CACHE_REDIS_URL) or "none"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 15
+    RESPONSE_CACHE_STALE_SECONDS: int = 60  # served while one request refreshes in the background
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    # Memory backend: invalidation generations kept per namespace (one per question page),
+    # dropped least recently used, or after this long unused; keep it above TTL + STALE so
+    # dropping one never orphans an entry that could still be served
+    RESPONSE_CACHE_MAX_GENERATIONS: int = 10000
+    RESPONSE_CACHE_GENERATION_TTL_SECONDS: int = 900
+
+    # Access tokens are short-lived and renewed through /api/auth/refresh with a rotating
+    # refresh token; revoked logins are checked against an in-memory bloom filter, synced
+    # from the token_families table every TOKEN_REVOCATION_SYNC_SECONDS
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 5
+    # revoked_at is stamped before commit, so each sync re-scans this far behind the newest
+    # revocation it saw; must exceed the longest transaction that revokes a family
+    TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS: int = 60
+    TOKEN_REVOCATION_FILTER_BITS: int = 1 << 20  # 128 KiB
+    TOKEN_REVOCATION_FILTER_HASHES: int = 7
+
+    # Authenticated users resolved from tokens are kept per worker for this long,
+    # so most requests skip the users lookup (deletes/role changes invalidate early)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # bcrypt cost (stored hashes with another cost are upgraded on the next login), and the
+    # dedicated hashing pool: threads, and hashes allowed to run or wait before logins get 503
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # How new notifications reach /api/notification/stream clients: "memory" (only the
+    # worker that created them) or "postgres" (LISTEN/NOTIFY, reaches every worker)
+    NOTIFICATION_HUB_BACKEND: str = "memory"
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Read notifications older than this are deleted (hourly, in batches)
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_PRUNE_BATCH_SIZE: int = 1000
+
+    # Notification fan-out runs in a background worker fed from the notification_outbox
+    # table: committed events are queued in memory (bounded) and the table is polled for
+    # any that missed the queue; failed events are retried with backoff, then given up on
+    NOTIFICATION_OUTBOX_QUEUE_SIZE: int = 1000
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_POLL_SECONDS: float = 5
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_OUTBOX_RETENTION_HOURS: int = 24  # handled events are pruned after this
+
+    # @username mentions notified per question/answer/comment (the rest are ignored)
+    MENTION_MAX_PER_POST: int = 20
+
+    # Characters of plain text kept in Question.excerpt, the listing preview of desc
+    QUESTION_EXCERPT_LENGTH: int = 300
+
+    # Recount of drifted answer/comment counts (a full scan of answers and comments)
+    POST_COUNT_REPAIR_INTERVAL_SECONDS: int = 86400
+    POST_COUNT_REPAIR_BATCH_SIZE: int = 500  # rows locked and recounted per transaction
 
     class Config:
         env_file = ".env"
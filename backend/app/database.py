@@ -1,12 +1,17 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.config import settings
+from app.db_pool import engine_options, register_pool_metrics
 
 engine = create_engine(
     settings.DATABASE_URL,
     echo=False,  # Set to True to log SQL queries (useful for debugging)
-    pool_pre_ping=True  # Helps avoid stale connections
+    **engine_options(make_url(settings.DATABASE_URL))  # pool sizing/pre-ping/timeouts, see Settings
 )
+register_pool_metrics(engine, "db_pool")
 
 
 SessionLocal = sessionmaker(
@@ -15,6 +20,30 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+def async_database_url(url: str) -> URL:
+    """DATABASE_URL with its async driver (asyncpg for PostgreSQL, aiosqlite for SQLite)."""
+    url = make_url(url)
+    drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    return url.set(drivername=drivers[url.get_backend_name()])
+
+# Async engine for DATABASE_ASYNC mode (see app/routing.py). Its sessions use SessionLocal's
+# session class, so session event listeners (e.g. the vote buffer's) apply to both.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_url = make_url(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DATABASE_URL else async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        echo=False,
+        **engine_options(async_url, is_async=True)
+    )
+    register_pool_metrics(async_engine.sync_engine, "db_async_pool")
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=SessionLocal.class_,
+        autoflush=False
+    )
+
 Base = declarative_base()
 #get session dependency
 def get_db() :
@@ -23,3 +52,13 @@ def get_db() :
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dialect_insert(db: Session, table):
+    """INSERT construct for the session's dialect, supporting ON CONFLICT upserts (PostgreSQL, SQLite)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
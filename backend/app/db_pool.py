@@ -0,0 +1,90 @@
+import time
+import uuid
+from sqlalchemy import exc
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.config import settings
+from app.metrics import metrics
+
+
+class _CheckoutMetrics:
+    """
+    Records every pool checkout under `metrics_prefix`: checkouts, waits (checkouts that found
+    the pool and its overflow exhausted), total wait time and timeouts.
+    """
+    metrics_prefix = "db_pool"
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # QueuePool has no public getter for it
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        # Nothing idle and no overflow left: this checkout waits for a connection to come back
+        waited = self.max_overflow > -1 and self.overflow() >= self.max_overflow and self.checkedin() == 0
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.incr(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            metrics.incr(f"{self.metrics_prefix}.checkouts")
+            if waited:
+                metrics.incr(f"{self.metrics_prefix}.waits")
+                metrics.incr(f"{self.metrics_prefix}.wait_ms", (time.perf_counter() - start) * 1000)
+
+
+class InstrumentedQueuePool(_CheckoutMetrics, QueuePool):
+    metrics_prefix = "db_pool"
+
+
+class InstrumentedAsyncQueuePool(_CheckoutMetrics, AsyncAdaptedQueuePool):
+    metrics_prefix = "db_async_pool"
+
+
+def engine_options(url: URL, is_async: bool = False) -> dict:
+    """create_engine()/create_async_engine() pool and connection options from Settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "connect_args": {}}
+    if url.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single-connection pool
+        return options
+    if settings.DB_NULL_POOL:
+        # One server connection per checkout; PgBouncer does the pooling
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE
+        )
+
+    if url.get_backend_name() != "postgresql":
+        return options
+
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling: no statement cache or named prepared statements survive
+        # between transactions, and startup options are rejected (set statement_timeout
+        # on the role or in PgBouncer instead)
+        if is_async:
+            options["connect_args"].update(
+                statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__"
+            )
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"]["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            options["connect_args"]["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    return options
+
+
+def register_pool_metrics(engine: Engine, prefix: str):
+    """Publish the pool's current size, checked-out connections and overflow in use."""
+    if not isinstance(engine.pool, QueuePool):
+        return
+    metrics.gauge(f"{prefix}.size", lambda: engine.pool.size())
+    metrics.gauge(f"{prefix}.checked_out", lambda: engine.pool.checkedout())
+    metrics.gauge(f"{prefix}.overflow", lambda: max(engine.pool.overflow(), 0))
@@ -0,0 +1,64 @@
+import logging
+import threading
+from typing import Callable, List
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Runs `func(db)` every `interval_seconds` on a daemon thread with its own session."""
+
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[Session], None]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Run the job a single time, logging (not raising) failures."""
+        db = SessionLocal()
+        try:
+            self.func(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Periodic job %s failed", self.name)
+        finally:
+            db.close()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+_jobs: List[PeriodicJob] = []
+
+def periodic_job(name: str, interval_seconds: float):
+    """Register a maintenance function to run periodically while the app is up."""
+    def decorator(func: Callable[[Session], None]):
+        _jobs.append(PeriodicJob(name, interval_seconds, func))
+        return func
+    return decorator
+
+def start_jobs():
+    for job in _jobs:
+        job.start()
+
+def stop_jobs():
+    for job in _jobs:
+        job.stop()
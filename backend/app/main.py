@@ -1,11 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
-from app.database import engine, get_db
+from fastapi.responses import ORJSONResponse
+from app.database import engine, async_engine, get_db
 from sqlalchemy.orm import Session
 import app.models
-from app.routers import chatbot, auth, user, question, answer, vote, notifications, home, comment
+from app.routers import chatbot, auth, user, question, answer, vote, notifications, home, comment, metrics
 from fastapi.middleware.cors import CORSMiddleware
+from app.pagination import NEXT_CURSOR_HEADER
+from app import jobs
+from app.config import settings
+from app.services.vote_buffer import vote_buffer
+from app.services.notification_hub import hub
+from app.services.notification_pipeline import pipeline
 import re
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background maintenance (bucket pruning etc.) runs for the lifetime of the app
+    jobs.start_jobs()
+    if settings.VOTE_BUFFER_ENABLED:
+        vote_buffer.start()
+    hub.start()
+    pipeline.start()
+    yield
+    pipeline.stop()
+    hub.stop()
+    if settings.VOTE_BUFFER_ENABLED:
+        vote_buffer.stop()
+    jobs.stop_jobs()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 #optional to create all tables
 #models.Base.metadata.create_all(bind=engine)
 #app.include_router(chatbot.router)
@@ -17,6 +43,7 @@ app.include_router(vote.router, prefix="/api")
 app.include_router(notifications.router, prefix="/api")
 app.include_router(home.router, prefix="/api")
 app.include_router(comment.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,    
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 @app.get("/api")
 def root():
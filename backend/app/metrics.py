@@ -0,0 +1,35 @@
+import threading
+from typing import Callable, Dict
+
+
+class Metrics:
+    """Process-local counters and gauges, exposed to admins at /api/metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, func: Callable[[], float]):
+        """Register a gauge whose value is read when metrics are collected."""
+        with self._lock:
+            self._gauges[name] = func
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = dict(self._counters)
+            gauges = dict(self._gauges)
+        for name, func in gauges.items():
+            values[name] = func()
+        return dict(sorted(values.items()))
+
+
+metrics = Metrics()
@@ -1,5 +1,5 @@
 from app.database import Base
-from sqlalchemy import (Boolean,Column,String,DateTime,Integer,Enum,Table,Text,ForeignKey)
+from sqlalchemy import (Boolean,Column,String,DateTime,Integer,Float,Enum,Table,Text,JSON,ForeignKey,Index,UniqueConstraint,text)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,9 +9,26 @@ ques_tag = Table(
     "ques_tag",
     Base.metadata,
     Column("qid",UUID(as_uuid=True),ForeignKey("question.qid"),primary_key=True),
-    Column("tag",String,primary_key=True)
+    Column("tag",String,ForeignKey("tags.name"),primary_key=True),
+    Index("ix_ques_tag_tag_qid","tag","qid")
 )
 
+class Tag(Base):
+    __tablename__ = "tags"
+    
+    name = Column(String, primary_key=True)  # normalized: stripped + lowercase
+    usage_count = Column(Integer, nullable=False, default=0)
+    
+    questions = relationship("Question",secondary=ques_tag,back_populates="tag_entries")
+
+class TagActivity(Base):
+    __tablename__ = "tag_activity"
+    
+    # Hourly bucket (by question creation time) of how many questions used a tag
+    bucket_start = Column(DateTime, primary_key=True)
+    tag = Column(String, primary_key=True)
+    question_count = Column(Integer, nullable=False, default=0)
+
 class Users(Base):
     __tablename__ = "users"  
     
@@ -21,7 +38,7 @@ class Users(Base):
     email = Column(String , nullable=False,unique=True)
     type = Column(Boolean, default=False)  
     googlelogin = Column(Boolean,default=False)
-    created_at = Column(DateTime,default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     profile_path = Column(String, nullable=True)
     
     questions = relationship("Question",back_populates="user")
@@ -30,6 +47,31 @@ class Users(Base):
     notifications = relationship("Notification",back_populates="user")
     votes = relationship("Votes",back_populates="user")
     
+    __table_args__ = (
+        Index("ix_users_created_at_id","created_at","id"),
+    )
+    
+class TokenFamily(Base):
+    __tablename__ = "token_families"
+    
+    # One per login. Its refresh tokens rotate (each use bumps generation); presenting an
+    # already used one revokes the family, and with it every token issued from that login
+    family_id = Column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
+    # Kept (revoked) when the user is deleted, so the revocation reaches every worker
+    userid = Column(UUID(as_uuid=True),ForeignKey("users.id",ondelete="SET NULL"),nullable=True)
+    generation = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime,default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)  # of the current refresh token
+    revoked_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_token_families_userid","userid"),
+        Index("ix_token_families_expires_at","expires_at"),
+        # Revocation filter loads/syncs
+        Index("ix_token_families_revoked_at","revoked_at",
+              postgresql_where=text("revoked_at IS NOT NULL"),sqlite_where=text("revoked_at IS NOT NULL")),
+    )
+    
 class Notification(Base):
     __tablename__ = "notifications"  
     
@@ -38,10 +80,64 @@ class Notification(Base):
     is_read = Column(Boolean,default=False) 
     content = Column(Text, nullable=False)
     type = Column(Integer, nullable=False)  
-    created_at = Column(DateTime,default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Grouped notifications ("5 people answered ..."): new events with the same group_key
+    # update the user's unread row for it instead of adding one
+    group_key = Column(String, nullable=True)
+    actor_count = Column(Integer, nullable=False, default=1)  # distinct users, see NotificationActor
 
     user = relationship("Users",back_populates="notifications")
     
+    __table_args__ = (
+        Index("ix_notifications_userid_created_at","userid","created_at","nid"),
+        # Unread badge / unread-only listing
+        Index("ix_notifications_userid_unread","userid","created_at",
+              postgresql_where=text("is_read = false"),sqlite_where=text("is_read = false")),
+        # At most one unread row per group (the ON CONFLICT target of grouped inserts)
+        Index("ix_notifications_userid_group_key_unread","userid","group_key",unique=True,
+              postgresql_where=text("is_read = false AND group_key IS NOT NULL"),
+              sqlite_where=text("is_read = false AND group_key IS NOT NULL")),
+        # Retention pruning of old read notifications
+        Index("ix_notifications_read_created_at","created_at",
+              postgresql_where=text("is_read = true"),sqlite_where=text("is_read = true")),
+    )
+
+class NotificationActor(Base):
+    __tablename__ = "notification_actors"
+    
+    # The distinct users folded into a grouped notification, so a repeat actor isn't counted twice
+    nid = Column(UUID(as_uuid=True),ForeignKey("notifications.nid",ondelete="CASCADE"),primary_key=True)
+    actor_id = Column(UUID(as_uuid=True),primary_key=True)
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    
+    # Per-user totals kept in step with the user's notifications (see NotificationService)
+    userid = Column(UUID(as_uuid=True),ForeignKey("users.id",ondelete="CASCADE"),primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    
+    # Events written in the same transaction as the post that caused them;
+    # services/notification_pipeline.py turns them into notifications
+    id = Column(UUID(as_uuid=True),primary_key=True,default=uuid.uuid4)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime,default=datetime.utcnow)
+    available_at = Column(DateTime,nullable=False,default=datetime.utcnow)  # next attempt not before
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    processed_at = Column(DateTime, nullable=True)  # set when handled, or given up on (last_error kept)
+    
+    __table_args__ = (
+        # Pending events, oldest due first
+        Index("ix_notification_outbox_pending","available_at","created_at",
+              postgresql_where=text("processed_at IS NULL"),sqlite_where=text("processed_at IS NULL")),
+        Index("ix_notification_outbox_processed_at","processed_at"),
+    )
+    
 class Question(Base):
     __tablename__ = "question"
     
@@ -50,14 +146,30 @@ class Question(Base):
     userid = Column(UUID(as_uuid=True),ForeignKey("users.id"),nullable=False)
     title = Column(Text, nullable=False)
     desc = Column(Text, nullable=False) 
-    votes = Column(Integer, default=0)
-    tags = Column(Text, nullable=True)  
-    created_at = Column(DateTime,default=datetime.utcnow)
+    excerpt = Column(Text, nullable=False, default="")  # plain-text preview of desc, see services/question_service.py
+    votes = Column(Integer, nullable=False, default=0)
+    upvotes = Column(Integer, nullable=False, default=0)  # votes == upvotes - downvotes
+    downvotes = Column(Integer, nullable=False, default=0)
+    tags = Column(Text, nullable=True)  # display copy of the normalized tags in ques_tag
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     is_closed = Column(Boolean, default=False)  
     image_path = Column(Text, nullable=True)  
+    hot_score = Column(Float, nullable=False, default=0.0)  # trending rank, see services/ranking_service.py
+    # Maintained by services/post_count_service.py; accepted_aid is not a foreign key (answers
+    # already reference question), it is cleared when the answer is unaccepted or deleted
+    answer_count = Column(Integer, nullable=False, default=0)
+    accepted_aid = Column(UUID(as_uuid=True), nullable=True)
 
     user = relationship("Users",back_populates="questions")
     answers = relationship("Answer",back_populates="question",cascade="all, delete")
+    tag_entries = relationship("Tag",secondary=ques_tag,back_populates="questions")
+    
+    __table_args__ = (
+        Index("ix_question_hot_score_qid","hot_score","qid"),
+        Index("ix_question_created_at_qid","created_at","qid"),
+        Index("ix_question_votes_created_at_qid","votes","created_at","qid"),
+        Index("ix_question_userid","userid"),
+    )
     
 class Answer(Base):
     __tablename__ = "answers"
@@ -67,15 +179,24 @@ class Answer(Base):
     userid = Column(UUID(as_uuid=True),ForeignKey("users.id"),nullable=False)
     username = Column(String, nullable=False) 
     content = Column(Text, nullable=False)  
-    accepted = Column(Boolean, default=False)  
-    votes = Column(Integer, default=0)  
-    created_at = Column(DateTime,default=datetime.utcnow)
+    accepted = Column(Boolean, nullable=False, default=False)  
+    votes = Column(Integer, nullable=False, default=0)  
+    upvotes = Column(Integer, nullable=False, default=0)  # votes == upvotes - downvotes
+    downvotes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     image_path = Column(Text, nullable=True)  
+    comment_count = Column(Integer, nullable=False, default=0)  # maintained by services/post_count_service.py
 
     user = relationship("Users",back_populates="answers")
     question = relationship("Question",back_populates="answers")
     comments = relationship("Comment",back_populates="answer",cascade="all, delete")
     
+    __table_args__ = (
+        # Answers of a question in display order: accepted, votes, then oldest first
+        Index("ix_answers_qid_display_order","qid",text("accepted DESC"),text("votes DESC"),"created_at","aid"),
+        Index("ix_answers_userid","userid"),
+    )
+    
 class Comment(Base):
     __tablename__ = "comments"
 
@@ -83,11 +204,16 @@ class Comment(Base):
     userid = Column(UUID(as_uuid=True),ForeignKey("users.id"),nullable=False) 
     message = Column(Text, nullable=False)  
     aid = Column(UUID(as_uuid=True),ForeignKey("answers.aid"),nullable=False)  
-    created_at = Column(DateTime,default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     user = relationship("Users",back_populates="comments")
     answer = relationship("Answer",back_populates="comments")
     
+    __table_args__ = (
+        Index("ix_comments_aid_created_at","aid","created_at","cid"),
+        Index("ix_comments_userid","userid"),
+    )
+    
 class Votes(Base):
     __tablename__ = "votes"
     
@@ -98,4 +224,10 @@ class Votes(Base):
     id = Column(UUID(as_uuid=True),nullable=False)  # Question or Answer ID
     
     user = relationship("Users",back_populates="votes")
+    
+    __table_args__ = (
+        # One vote per user per post
+        UniqueConstraint("userid","id","is_answer",name="uq_votes_userid_id_is_answer"),
+        Index("ix_votes_id_is_answer_is_upvote","id","is_answer","is_upvote"),
+    )
 
@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import and_, literal, or_
+
+# Header used by list endpoints (which return bare JSON arrays) to hand back the next cursor
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_value(value: Any):
+    """Convert a keyset value into something JSON can carry."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _decode_value(value: Any, value_type: type):
+    """Convert a JSON value back into the type of its keyset column."""
+    if value is None:
+        return None
+    if value_type is datetime:
+        return datetime.fromisoformat(value)
+    if value_type is UUID:
+        return UUID(value)
+    return value_type(value)
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort-key values of the last row of a page into an opaque cursor."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor, validating it against the expected key types."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return [_decode_value(v, t) for v, t in zip(values, types)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: Sequence[bool]):
+    """
+    Build the seek predicate "rows strictly after `values`" for an ORDER BY over `columns`.
+
+    Mixed sort directions are supported, e.g. (accepted DESC, votes DESC, created_at ASC, aid ASC).
+    """
+    # Bind values as typed literals so boolean keys (e.g. accepted) can be range-compared
+    bound = [literal(value, type_=column.type) for column, value in zip(columns, values)]
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == bound[j] for j in range(i)]
+        after = column < bound[i] if descending[i] else column > bound[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+def keyset_page(
+    query,
+    columns: Sequence[Any],
+    descending: Sequence[bool],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[list, Optional[str]]:
+    """
+    Order `query` by `columns` and fetch one page, returning (rows, next_cursor).
+
+    With a cursor the page is seeked on the indexed sort keys; without one the legacy
+    `offset` is used, so page-number clients keep working and can switch to the cursor
+    from any page. The last column must be unique (a primary key) to break ties.
+    """
+    if cursor:
+        values = decode_cursor(cursor, [column.type.python_type for column in columns])
+        query = query.filter(keyset_filter(columns, values, descending))
+
+    order_by = [column.desc() if desc else column.asc() for column, desc in zip(columns, descending)]
+    query = query.order_by(*order_by)
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
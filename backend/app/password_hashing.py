@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.config import settings
+from app.metrics import metrics
+from typing import Optional, Tuple
+
+# Password hashing. Pinning min/max rounds to the configured cost makes verify_and_update()
+# flag hashes made with any other cost, so changing PASSWORD_BCRYPT_ROUNDS rehashes on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS
+)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL), so a burst of
+    logins/signups uses at most `workers` cores and never holds the event loop or the
+    Starlette threadpool. At most `max_pending` hashes may be running or queued; beyond
+    that callers get a 503 with Retry-After instead of an ever-growing queue.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        metrics.gauge("password_hash.pending", lambda: self._pending)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash if the stored one uses outdated parameters, else None)."""
+        return await self._run(pwd_context.verify_and_update, password, hashed_password)
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.incr("password_hash.rejected")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in attempts in progress, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+            metrics.incr("password_hash.calls")
+            metrics.incr("password_hash.ms", (time.perf_counter() - start) * 1000)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
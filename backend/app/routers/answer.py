@@ -3,19 +3,31 @@ from sqlalchemy.orm import Session
 from app.auth import get_current_user
 from app.models import Users, Question, Answer
 from app.database import get_db
+from app.routing import DatabaseRoute
 from app.schemas.answer_schema import (
     AnswerCreate,
     AnswerCreateResponse,
     AnswerResponse,
     AnswerAccept
 )
-from app.services.notification_service import NotificationService
+from app.services import notification_pipeline
+from app.services.mention_service import enqueue_mentions, extract_mentions
+from app.pagination import keyset_page
+from app.services.post_count_service import PostCountService
+from app.cache import QUESTIONS_NAMESPACE, question_namespace, response_cache
+from app.serialization import json_response, rows_to_dicts, schema_columns
 from uuid import UUID
+from typing import Optional
+
+# Answer pages select just the AnswerResponse columns (they include every sort key)
+ANSWER_FIELDS = tuple(AnswerResponse.model_fields)
+ANSWER_COLUMNS = schema_columns(Answer, AnswerResponse)
 
 router = APIRouter(
     prefix="/answer",
     tags=["Answers"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.post("/", status_code=201, response_model=AnswerCreateResponse)
@@ -53,16 +65,22 @@ def create_answer(
     )
     
     db.add(new_answer)
+    PostCountService(db).answer_added(answer.qid)
+    # The question author is notified by the notification pipeline, after this commits
+    notification_pipeline.enqueue_event(
+        db,
+        notification_pipeline.ANSWER_CREATED,
+        question_id=str(answer.qid),
+        actor_id=str(current_user.id),
+        actor_username=current_user.username
+    )
+    enqueue_mentions(
+        db, extract_mentions(answer.content), answer.qid,
+        "answer", current_user.id, current_user.username
+    )
     db.commit()
     db.refresh(new_answer)
-    
-    # Send notification to question author (if not self-answering)
-    if question.userid != current_user.id:
-        notification_service = NotificationService(db)
-        notification_service.notify_question_answered(
-            question_id=answer.qid,
-            answerer_username=current_user.username
-        )
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(answer.qid))
     
     return AnswerCreateResponse(aid=new_answer.aid)
 
@@ -91,8 +109,11 @@ def delete_answer(
         )
     
     # Delete the answer (cascade will delete related comments)
+    qid = answer.qid
     db.delete(answer)
+    PostCountService(db).answer_removed(qid, aid)
     db.commit()
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(qid))
     
     return None  # 204 No Content
 
@@ -117,6 +138,7 @@ def get_answer(aid: UUID, db: Session = Depends(get_db)):
         content=answer.content,
         accepted=answer.accepted,
         votes=answer.votes,
+        comment_count=answer.comment_count,
         created_at=answer.created_at,
         image_path=answer.image_path
     )
@@ -162,8 +184,10 @@ def accept_answer(
     
     # Accept this answer
     answer.accepted = True
+    PostCountService(db).answer_accepted(answer.qid, aid)
     db.commit()
     db.refresh(answer)
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(answer.qid))
     
     return {"message": "Answer accepted successfully", "aid": answer.aid}
 
@@ -202,8 +226,10 @@ def unaccept_answer(
     
     # Unaccept the answer
     answer.accepted = False
+    PostCountService(db).answer_unaccepted(answer.qid, aid)
     db.commit()
     db.refresh(answer)
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(answer.qid))
     
     return {"message": "Answer unaccepted successfully", "aid": answer.aid}
 
@@ -212,9 +238,10 @@ def get_answers_by_question(
     qid: UUID,
     db: Session = Depends(get_db),
     page: int = 1,
-    per_page: int = 10
+    per_page: int = 10,
+    cursor: Optional[str] = None
 ):
-    """Get all answers for a specific question."""
+    """Get all answers for a specific question. Pass `next_cursor` back as `cursor` to seek to the next page."""
     
     # Check if question exists
     question = db.query(Question).filter(Question.qid == qid).first()
@@ -228,32 +255,18 @@ def get_answers_by_question(
     offset = (page - 1) * per_page
     
     # Get answers for the question (accepted first, then by votes, then by date)
-    answers = db.query(Answer).filter(Answer.qid == qid).order_by(
-        Answer.accepted.desc(),  # Accepted answers first
-        Answer.votes.desc(),     # Then by votes
-        Answer.created_at.asc()  # Then by creation time
-    ).offset(offset).limit(per_page).all()
-    
-    # Get total count
-    total = db.query(Answer).filter(Answer.qid == qid).count()
+    answers, next_cursor = keyset_page(
+        db.query(*ANSWER_COLUMNS).filter(Answer.qid == qid),
+        [Answer.accepted, Answer.votes, Answer.created_at, Answer.aid],
+        [True, True, False, False],
+        per_page, cursor, offset
+    )
     
-    return {
+    return json_response({
         "question_id": qid,
-        "answers": [
-            AnswerResponse(
-                aid=a.aid,
-                qid=a.qid,
-                userid=a.userid,
-                username=a.username,
-                content=a.content,
-                accepted=a.accepted,
-                votes=a.votes,
-                created_at=a.created_at,
-                image_path=a.image_path
-            )
-            for a in answers
-        ],
-        "total_answers": total,
+        "answers": rows_to_dicts(answers, ANSWER_FIELDS),
+        "total_answers": question.answer_count,
         "page": page,
-        "per_page": per_page
-    }
\ No newline at end of file
+        "per_page": per_page,
+        "next_cursor": next_cursor
+    })
\ No newline at end of file
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Body, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordBearer
 from app.models import Users
 from app.database import get_db
-from app.schemas.user_schemas import UserCreate, UserLogin, UserResponse
+from app.schemas.user_schemas import TokenRefresh, UserCreate, UserLogin, UserResponse
 from app.auth import auth_handler
+from app.password_hashing import password_hasher
 
 router = APIRouter(
     prefix="/auth",
@@ -12,33 +14,51 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+# login and signup are async so that bcrypt runs on the password hashing pool while the
+# request holds no threadpool thread; their (short) database work goes to the threadpool
+
 @router.post("/login")
-def login(User: UserLogin = Body(...), db: Session = Depends(get_db)):
+async def login(User: UserLogin = Body(...), db: Session = Depends(get_db)):
     """Authenticate user and return access token"""
     
     # Fetch user from database
-    user = db.query(Users).filter(Users.username == User.username).first()
+    user = await run_in_threadpool(_get_user, db, User.username)
     
     # Fix: Compare User.password (plain) with user.password (hashed from DB)
-    if not user or not auth_handler.verify_password(User.password, user.password):
+    verified, new_hash = (False, None)
+    if user and user.password:
+        verified, new_hash = await password_hasher.verify_and_update(User.password, user.password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token = auth_handler.create_access_token(data={"sub": user.username, "type": "access"})
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Stored hash made with outdated parameters (e.g. a lower bcrypt cost): upgrade it
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+    
+    # Short-lived access token, plus a refresh token for /auth/refresh
+    return await run_in_threadpool(auth_handler.issue_tokens, user, db)
+
+@router.post("/refresh")
+def refresh(token: TokenRefresh, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a new refresh token (the old one stops working)"""
+    return auth_handler.refresh_access_token(token.refresh_token, db)
+
+@router.post("/logout", status_code=204)
+def logout(token: TokenRefresh, db: Session = Depends(get_db)):
+    """Revoke the login's refresh token and the access tokens issued with it"""
+    auth_handler.revoke_refresh_token(token.refresh_token, db)
+    return None
 
 @router.post("/signup", status_code=201)
-def signup(user: UserCreate = Body(...), db: Session = Depends(get_db)):
+async def signup(user: UserCreate = Body(...), db: Session = Depends(get_db)):
     """Sign up a new user."""
 
     # Check if user already exists (check both username and email)
-    existing_user = db.query(Users).filter(
-        (Users.username == user.username) | (Users.email == user.email)
-    ).first()
+    existing_user = await run_in_threadpool(_get_existing_user, db, user.username, user.email)
     
     if existing_user:
         raise HTTPException(
@@ -47,16 +67,13 @@ def signup(user: UserCreate = Body(...), db: Session = Depends(get_db)):
         )
 
     # Hash the password before storing
-    hashed_password = auth_handler.hash_password(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     
     # Create new user with hashed password
     user_data = user.model_dump()
     user_data['password'] = hashed_password
     
-    new_user = Users(**user_data)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_in_threadpool(_add_user, db, Users(**user_data))
     
     user_response = UserResponse.model_validate(new_user)
     
@@ -65,6 +82,24 @@ def signup(user: UserCreate = Body(...), db: Session = Depends(get_db)):
         "user": user_response
     }
 
+def _get_user(db: Session, username: str) -> Users:
+    return db.query(Users).filter(Users.username == username).first()
+
+def _get_existing_user(db: Session, username: str, email: str) -> Users:
+    return db.query(Users).filter(
+        (Users.username == username) | (Users.email == email)
+    ).first()
+
+def _add_user(db: Session, new_user: Users) -> Users:
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+def _update_password_hash(db: Session, user: Users, new_hash: str):
+    user.password = new_hash
+    db.commit()
+
 @router.post("/google")
 def google_auth(token: str):
     return {"message": "Google auth not implemented yet"}
\ No newline at end of file
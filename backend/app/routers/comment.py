@@ -1,22 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
 from sqlalchemy.orm import Session
 from app.auth import get_current_user
 from app.models import Users, Answer, Comment
 from app.database import get_db
+from app.routing import DatabaseRoute
 from app.schemas.comment_scheme import (
     CommentCreate,
     CommentCreateResponse,
     CommentResponse,
     CommentList
 )
-from app.services.notification_service import NotificationService
+from app.services import notification_pipeline
+from app.services.mention_service import enqueue_mentions, extract_mentions
+from app.services.post_count_service import PostCountService
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page
+from app.cache import question_namespace, response_cache
+from app.serialization import json_response, rows_to_dicts
 from uuid import UUID
-from typing import List
+from typing import List, Optional
+
+# Comment pages select the CommentResponse columns (username comes from users)
+COMMENT_FIELDS = tuple(CommentResponse.model_fields)
+COMMENT_COLUMNS = [Comment.cid, Comment.userid, Users.username, Comment.message, Comment.aid, Comment.created_at]
 
 router = APIRouter(
     prefix="/comments",
     tags=["Comments"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.post("/{aid}", status_code=201, response_model=CommentCreateResponse)
@@ -44,16 +55,22 @@ def create_comment(
     )
     
     db.add(new_comment)
+    PostCountService(db).comment_added(aid)
+    # The answer author is notified by the notification pipeline, after this commits
+    notification_pipeline.enqueue_event(
+        db,
+        notification_pipeline.COMMENT_CREATED,
+        answer_id=str(aid),
+        actor_id=str(current_user.id),
+        actor_username=current_user.username
+    )
+    enqueue_mentions(
+        db, extract_mentions(comment.message), answer.qid,
+        "comment", current_user.id, current_user.username
+    )
     db.commit()
     db.refresh(new_comment)
-    
-    # Send notification to answer author (if not self-commenting)
-    if answer.userid != current_user.id:
-        notification_service = NotificationService(db)
-        notification_service.notify_answer_commented(
-            answer_id=aid,
-            commenter_username=current_user.username
-        )
+    response_cache.invalidate(question_namespace(answer.qid))
     
     return CommentCreateResponse(
         cid=new_comment.cid,
@@ -63,11 +80,13 @@ def create_comment(
 @router.get("/{aid}", response_model=List[CommentResponse])
 def get_comments(
     aid: UUID,
+    response: Response,
     db: Session = Depends(get_db),
     page: int = Query(default=1, ge=1, description="Page number"),
-    per_page: int = Query(default=10, ge=1, le=50, description="Items per page")
+    per_page: int = Query(default=10, ge=1, le=50, description="Items per page"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
-    """Get all comments for a specific answer."""
+    """Get all comments for a specific answer. Returns an X-Next-Cursor header when more comments follow."""
     
     # Check if answer exists
     answer = db.query(Answer).filter(Answer.aid == aid).first()
@@ -80,23 +99,19 @@ def get_comments(
     # Calculate offset for pagination
     offset = (page - 1) * per_page
     
-    # Get comments for the answer (ordered by creation time - oldest first)
-    comments = db.query(Comment).join(Users).filter(
-        Comment.aid == aid
-    ).order_by(Comment.created_at.asc()).offset(offset).limit(per_page).all()
-    
-    # Convert to response format
-    return [
-        CommentResponse(
-            cid=c.cid,
-            userid=c.userid,
-            username=c.user.username,  # Get username from relationship
-            message=c.message,
-            aid=c.aid,
-            created_at=c.created_at
-        )
-        for c in comments
-    ]
+    # Get comments for the answer (ordered by creation time - oldest first), with the
+    # author's username from the join rather than a lazy load per comment
+    comments, next_cursor = keyset_page(
+        db.query(*COMMENT_COLUMNS).join(Users, Users.id == Comment.userid).filter(Comment.aid == aid),
+        [Comment.created_at, Comment.cid],
+        [False, False],
+        per_page, cursor, offset
+    )
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return json_response(rows_to_dicts(comments, COMMENT_FIELDS), response)
 
 @router.delete("/{cid}", status_code=204)
 def delete_comment(
@@ -123,8 +138,11 @@ def delete_comment(
         )
     
     # Delete the comment
+    qid = comment.answer.qid
     db.delete(comment)
+    PostCountService(db).comment_removed(comment.aid)
     db.commit()
+    response_cache.invalidate(question_namespace(qid))
     
     return None  # 204 No Content
 
@@ -140,12 +158,9 @@ def get_comment_stats(aid: UUID, db: Session = Depends(get_db)):
             detail="Answer not found"
         )
     
-    # Get total comments count
-    total_comments = db.query(Comment).filter(Comment.aid == aid).count()
-    
     return {
         "answer_id": aid,
-        "total_comments": total_comments
+        "total_comments": answer.comment_count
     }
 
 @router.put("/{cid}", response_model=CommentResponse)
@@ -1,175 +1,150 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, func
+from sqlalchemy import desc, func
 from datetime import datetime, timedelta
 from app.models import Question, Users
 from app.database import get_db
-from app.schemas.question_schemas import QuestionResponse
+from app.routing import DatabaseRoute
+from app.schemas.question_schemas import QuestionListItem
+from app.services.question_service import LISTING_FIELDS, QuestionService
+from app.services.search_service import SearchService
+from app.services.tag_service import TagService
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page
+from app.cache import QUESTIONS_NAMESPACE, cached
+from app.serialization import json_response, rows_to_dicts
 from typing import List, Optional
 from uuid import UUID
 
 router = APIRouter(
     prefix="/home",
     tags=["Home"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
-@router.get("/", response_model=List[QuestionResponse])
+@router.get("/", response_model=List[QuestionListItem])
+@cached([QUESTIONS_NAMESPACE])
 def home(
+    response: Response,
     db: Session = Depends(get_db),
-    sort: str = Query(default="trending", description="Sort by: trending, latest, most_popular"),
+    sort: str = Query(default="trending", description="Sort by: trending (hot score), latest, most_popular"),
     page: int = Query(default=1, ge=1, description="Page number"),
     per_page: int = Query(default=10, ge=1, le=50, description="Items per page"),
-    tags: Optional[str] = Query(default=None, description="Filter by tags")
+    tags: Optional[str] = Query(default=None, description="Filter by comma-separated tags"),
+    tag_mode: str = Query(default="all", pattern="^(all|any)$", description="Match all tags (AND) or any tag (OR)"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
     """
     Get all questions with different sorting options:
-    - trending: Questions created in last 24 hours sorted by votes, then all others by creation date
+    - trending: Sort by hot score (votes with time decay)
     - latest: Sort by creation date (newest first)
     - most_popular: Sort by votes (highest first)
+    
+    Every sort returns an X-Next-Cursor header; pass it back as `cursor` to seek to the next page.
     """
     
     # Calculate offset for pagination
     offset = (page - 1) * per_page
     
     # Base query
-    query = db.query(Question)
+    query = QuestionService(db).listing_query()
     
     # Apply tags filter if provided
     if tags:
-        query = query.filter(Question.tags.ilike(f"%{tags}%"))
+        query = TagService(db).filter_questions(query, tags, match_all=tag_mode == "all")
     
     # Apply sorting based on sort parameter
+    next_cursor = None
     if sort == "trending":
-        # Get current time minus 24 hours
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        
-        # First get questions from last 24 hours sorted by votes
-        trending_questions = query.filter(
-            Question.created_at >= twenty_four_hours_ago
-        ).order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+        # Single indexed scan over the precomputed hot score
+        questions, next_cursor = keyset_page(
+            query, [Question.hot_score, Question.qid], [True, True], per_page, cursor, offset
+        )
         
-        # If we don't have enough trending questions, fill with latest
-        if len(trending_questions) < per_page:
-            remaining_limit = per_page - len(trending_questions)
-            trending_qids = [q.qid for q in trending_questions]
-            
-            older_questions = query.filter(
-                and_(
-                    Question.created_at < twenty_four_hours_ago,
-                    ~Question.qid.in_(trending_qids) if trending_qids else True
-                )
-            ).order_by(desc(Question.created_at)).limit(remaining_limit).all()
-            
-            questions = trending_questions + older_questions
-        else:
-            questions = trending_questions
-            
     elif sort == "latest":
-        questions = query.order_by(desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            query, [Question.created_at, Question.qid], [True, True], per_page, cursor, offset
+        )
         
     elif sort == "most_popular":
-        questions = query.order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            query, [Question.votes, Question.created_at, Question.qid], [True, True, True], per_page, cursor, offset
+        )
         
     else:
         raise HTTPException(status_code=400, detail="Invalid sort parameter. Use: trending, latest, or most_popular")
     
-    # Convert to response format
-    return [
-        QuestionResponse(
-            qid=q.qid,
-            username=q.username,
-            userid=q.userid,
-            title=q.title,
-            desc=q.desc,
-            votes=q.votes,
-            tags=q.tags,
-            created_at=q.created_at,
-            is_closed=q.is_closed,
-            image_path=q.image_path
-        )
-        for q in questions
-    ]
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Rows go out as they were selected, without building or re-validating models
+    return json_response(rows_to_dicts(questions, LISTING_FIELDS), response)
 
-@router.get("/search", response_model=List[QuestionResponse])
+@router.get("/search", response_model=List[QuestionListItem])
 def search_home(
+    response: Response,
     query: str = Query(..., min_length=1, description="Search query"),
     db: Session = Depends(get_db),
-    sort: str = Query(default="latest", description="Sort by: trending, latest, most_popular"),
+    sort: str = Query(default="relevance", description="Sort by: relevance, trending, latest, most_popular"),
     page: int = Query(default=1, ge=1, description="Page number"),
     per_page: int = Query(default=10, ge=1, le=50, description="Items per page"),
-    tags: Optional[str] = Query(default=None, description="Filter by tags")
+    tags: Optional[str] = Query(default=None, description="Filter by comma-separated tags"),
+    tag_mode: str = Query(default="all", pattern="^(all|any)$", description="Match all tags (AND) or any tag (OR)"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
     """
-    Search questions by title, description, or tags with sorting options.
+    Full-text search over question title, description, and tags with sorting options.
+    - relevance: Best matches first
+    
+    Every sort returns an X-Next-Cursor header; pass it back as `cursor` to seek to the next page.
     """
     
     # Calculate offset for pagination
     offset = (page - 1) * per_page
     
-    # Base search query - search in title, description, and tags
-    search_query = db.query(Question).filter(
-        Question.title.ilike(f"%{query}%") | 
-        Question.desc.ilike(f"%{query}%") |
-        Question.tags.ilike(f"%{query}%")
-    )
+    search_service = SearchService(db)
+    search_query = QuestionService(db).listing_query()
     
     # Apply additional tags filter if provided
     if tags:
-        search_query = search_query.filter(Question.tags.ilike(f"%{tags}%"))
+        search_query = TagService(db).filter_questions(search_query, tags, match_all=tag_mode == "all")
+    
+    # Restrict to matching questions (relevance ranking applies its own match)
+    if sort != "relevance":
+        search_query = search_service.filter(search_query, query)
     
     # Apply sorting
-    if sort == "trending":
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
+    next_cursor = None
+    if sort == "relevance":
+        questions, next_cursor = search_service.ranked_page(search_query, query, per_page, cursor)
         
-        # Prioritize recent questions with high votes
-        trending_questions = search_query.filter(
-            Question.created_at >= twenty_four_hours_ago
-        ).order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+    elif sort == "trending":
+        # Single indexed scan over the precomputed hot score
+        questions, next_cursor = keyset_page(
+            search_query, [Question.hot_score, Question.qid], [True, True], per_page, cursor, offset
+        )
         
-        # Fill with older questions if needed
-        if len(trending_questions) < per_page:
-            remaining_limit = per_page - len(trending_questions)
-            trending_qids = [q.qid for q in trending_questions]
-            
-            older_questions = search_query.filter(
-                and_(
-                    Question.created_at < twenty_four_hours_ago,
-                    ~Question.qid.in_(trending_qids) if trending_qids else True
-                )
-            ).order_by(desc(Question.created_at)).limit(remaining_limit).all()
-            
-            questions = trending_questions + older_questions
-        else:
-            questions = trending_questions
-            
     elif sort == "latest":
-        questions = search_query.order_by(desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            search_query, [Question.created_at, Question.qid], [True, True], per_page, cursor, offset
+        )
         
     elif sort == "most_popular":
-        questions = search_query.order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            search_query, [Question.votes, Question.created_at, Question.qid], [True, True, True], per_page, cursor, offset
+        )
         
     else:
-        raise HTTPException(status_code=400, detail="Invalid sort parameter. Use: trending, latest, or most_popular")
+        raise HTTPException(status_code=400, detail="Invalid sort parameter. Use: relevance, trending, latest, or most_popular")
     
-    # Convert to response format
-    return [
-        QuestionResponse(
-            qid=q.qid,
-            username=q.username,
-            userid=q.userid,
-            title=q.title,
-            desc=q.desc,
-            votes=q.votes,
-            tags=q.tags,
-            created_at=q.created_at,
-            is_closed=q.is_closed,
-            image_path=q.image_path
-        )
-        for q in questions
-    ]
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Rows go out as they were selected, without building or re-validating models
+    return json_response(rows_to_dicts(questions, LISTING_FIELDS), response)
 
 @router.get("/stats")
+@cached([QUESTIONS_NAMESPACE])
 def get_home_stats(db: Session = Depends(get_db)):
     """Get homepage statistics."""
     
@@ -202,32 +177,12 @@ def get_home_stats(db: Session = Depends(get_db)):
     }
 
 @router.get("/trending-tags")
+@cached([QUESTIONS_NAMESPACE])
 def get_trending_tags(db: Session = Depends(get_db), limit: int = Query(default=10, ge=1, le=20)):
-    """Get most popular tags from recent questions."""
+    """Get the most used tags of questions created in the last 7 days (counted in whole hours, so 6 days 23 hours at least)."""
     
-    # Get questions from last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    
-    questions = db.query(Question.tags).filter(
-        and_(
-            Question.created_at >= seven_days_ago,
-            Question.tags.isnot(None),
-            Question.tags != ""
-        )
-    ).all()
-    
-    # Count tag occurrences
-    tag_counts = {}
-    for question in questions:
-        if question.tags:
-            # Split tags by comma and clean them
-            tags = [tag.strip().lower() for tag in question.tags.split(',')]
-            for tag in tags:
-                if tag:  # Ignore empty tags
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
-    # Sort by count and return top tags
-    trending_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+    # Read the top tags from the hourly tag_activity buckets (maintained on question writes)
+    trending_tags = TagService(db).trending_tags(limit)
     
     return {
         "trending_tags": [
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+from app.auth import get_admin_user
+from app.metrics import metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    responses={404: {"description": "Not found"}}
+)
+
+@router.get("/", dependencies=[Depends(get_admin_user)])
+def get_metrics():
+    """Get this worker's counters and gauges (admin only)."""
+    return metrics.snapshot()
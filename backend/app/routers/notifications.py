@@ -1,22 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query, Body
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.auth import get_current_user
+from app.auth import get_current_user, get_current_user_id, get_stream_user_id
+from app.config import settings
 from app.models import Users, Notification
 from app.database import get_db
+from app.routing import DatabaseRoute
 from app.schemas.notification_schema import (
     NotificationResponse,
     NotificationList,
     NotificationMarkRead,
+    NotificationReadRequest,
+    NotificationBulkRequest,
+    NotificationBulkResult,
     NotificationStats,
-    NotificationType
+    NotificationType,
+    NotificationUnreadCount
 )
+from app.pagination import keyset_page
+from app.services.notification_hub import hub
+from app.services.notification_service import NotificationService
 from uuid import UUID
 from typing import List, Optional
 
 router = APIRouter(
     prefix="/notification",
     tags=["Notifications"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.get("/", response_model=NotificationList)
@@ -26,7 +39,8 @@ def get_notifications(
     page: int = Query(default=1, ge=1, description="Page number"),
     per_page: int = Query(default=10, ge=1, le=50, description="Items per page"),
     unread_only: bool = Query(default=False, description="Show only unread notifications"),
-    type_filter: Optional[NotificationType] = Query(default=None, description="Filter by notification type")
+    type_filter: Optional[NotificationType] = Query(default=None, description="Filter by notification type"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page")
 ):
     """Get notifications for the current user."""
     
@@ -43,19 +57,22 @@ def get_notifications(
     if type_filter:
         query = query.filter(Notification.type == type_filter.value)
     
-    # Get total count before pagination
-    total = query.count()
+    # Unread and unfiltered totals come from the maintained counters
+    unread_count, total = NotificationService(db).get_counts(current_user.id)
     
-    # Get unread count
-    unread_count = db.query(Notification).filter(
-        Notification.userid == current_user.id,
-        Notification.is_read == False
-    ).count()
+    # Get total count before pagination
+    if unread_only and not type_filter:
+        total = unread_count
+    elif unread_only or type_filter:
+        total = query.count()
     
     # Apply pagination and ordering (newest first)
-    notifications = query.order_by(
-        Notification.created_at.desc()
-    ).offset(offset).limit(per_page).all()
+    notifications, next_cursor = keyset_page(
+        query,
+        [Notification.created_at, Notification.nid],
+        [True, True],
+        per_page, cursor, offset
+    )
     
     # Convert to response format
     notification_responses = [
@@ -66,7 +83,8 @@ def get_notifications(
             is_read=n.is_read,
             content=n.content,
             type=NotificationType(n.type),
-            created_at=n.created_at
+            created_at=n.created_at,
+            actor_count=n.actor_count
         )
         for n in notifications
     ]
@@ -76,55 +94,76 @@ def get_notifications(
         total=total,
         unread_count=unread_count,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        next_cursor=next_cursor
     )
 
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    current_user_id: UUID = Depends(get_stream_user_id)
+):
+    """
+    Server-sent events: a `notification` event (same fields as the list endpoint, minus
+    username) for each new notification of the current user. Idle connections cost no
+    database queries; a comment line is sent every few seconds to keep proxies from timing out.
+    """
+    return StreamingResponse(
+        _notification_events(request, current_user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _notification_events(request: Request, user_id: UUID):
+    subscriber = hub.subscribe(user_id)
+    _, queue = subscriber
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: notification\ndata: {json.dumps(message)}\n\n"
+    finally:
+        hub.unsubscribe(user_id, subscriber)
+
 @router.post("/read", status_code=200)
 def mark_notification_as_read(
-    notification_data: dict = Body(..., example={"notification_id": "uuid-here"}),
-    current_user: Users = Depends(get_current_user),
+    notification_data: NotificationReadRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Mark a specific notification as read."""
     
-    notification_id = UUID(notification_data["notification_id"])
-    
-    # Find the notification
-    notification = db.query(Notification).filter(
-        Notification.nid == notification_id,
-        Notification.userid == current_user.id
-    ).first()
+    notification_id = notification_data.notification_id
     
-    if not notification:
+    # Mark as read (the unread counter follows in the same transaction)
+    if not NotificationService(db).mark_as_read(current_user_id, notification_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    
-    # Mark as read
-    notification.is_read = True
     db.commit()
-    db.refresh(notification)
     
     return {
         "message": "Notification marked as read",
         "notification_id": notification_id,
-        "is_read": notification.is_read
+        "is_read": True
     }
 
 @router.post("/read-all", status_code=200)
 def mark_all_notifications_as_read(
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Mark all notifications as read for the current user."""
     
     # Update all unread notifications for the user
-    updated_count = db.query(Notification).filter(
-        Notification.userid == current_user.id,
-        Notification.is_read == False
-    ).update({"is_read": True})
-    
+    updated_count = NotificationService(db).mark_all_as_read(current_user_id)
     db.commit()
     
     return {
@@ -132,49 +171,58 @@ def mark_all_notifications_as_read(
         "updated_count": updated_count
     }
 
+@router.post("/bulk/read", response_model=NotificationBulkResult)
+def mark_notifications_as_read(
+    selection: NotificationBulkRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Mark several notifications as read: by id, or all up to a created_at watermark."""
+    
+    updated = NotificationService(db).mark_many_as_read(current_user_id, selection.notification_ids, selection.before)
+    db.commit()
+    
+    return NotificationBulkResult(updated_count=len(updated), notification_ids=updated)
+
+@router.post("/bulk/delete", response_model=NotificationBulkResult)
+def delete_notifications(
+    selection: NotificationBulkRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Delete several notifications: by id, or all up to a created_at watermark."""
+    
+    deleted = NotificationService(db).delete_many(current_user_id, selection.notification_ids, selection.before)
+    db.commit()
+    
+    return NotificationBulkResult(updated_count=len(deleted), notification_ids=deleted)
+
 @router.delete("/{notification_id}", status_code=204)
 def delete_notification(
     notification_id: UUID,
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Delete a specific notification."""
     
-    # Find the notification
-    notification = db.query(Notification).filter(
-        Notification.nid == notification_id,
-        Notification.userid == current_user.id
-    ).first()
-    
-    if not notification:
+    if not NotificationService(db).delete_notification(current_user_id, notification_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    
-    # Delete the notification
-    db.delete(notification)
     db.commit()
     
     return None  # 204 No Content
 
 @router.get("/stats", response_model=NotificationStats)
 def get_notification_stats(
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get notification statistics for the current user."""
     
-    # Get total notifications
-    total = db.query(Notification).filter(
-        Notification.userid == current_user.id
-    ).count()
-    
-    # Get unread notifications
-    unread = db.query(Notification).filter(
-        Notification.userid == current_user.id,
-        Notification.is_read == False
-    ).count()
+    # Maintained counters: one primary-key read
+    unread, total = NotificationService(db).get_counts(current_user_id)
     
     # Calculate read notifications
     read = total - unread
@@ -185,6 +233,26 @@ def get_notification_stats(
         read_notifications=read
     )
 
+@router.get("/unread-count", response_model=NotificationUnreadCount)
+def get_unread_count(
+    request: Request,
+    response: Response,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Unread badge count: one primary-key read. Revalidate with If-None-Match (304 while unchanged)."""
+    
+    unread, _ = NotificationService(db).get_counts(current_user_id)
+    
+    # The count is the whole body, so it is its own ETag
+    etag = f'"{unread}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    
+    return NotificationUnreadCount(unread_count=unread)
+
 @router.get("/unread", response_model=List[NotificationResponse])
 def get_unread_notifications(
     current_user: Users = Depends(get_current_user),
@@ -209,7 +277,8 @@ def get_unread_notifications(
             is_read=n.is_read,
             content=n.content,
             type=NotificationType(n.type),
-            created_at=n.created_at
+            created_at=n.created_at,
+            actor_count=n.actor_count
         )
         for n in notifications
     ]
@@ -223,15 +292,4 @@ def create_notification(
 ):
     """Helper function to create a new notification."""
     
-    new_notification = Notification(
-        userid=user_id,
-        content=content,
-        type=notification_type.value,
-        is_read=False
-    )
-    
-    db.add(new_notification)
-    db.commit()
-    db.refresh(new_notification)
-    
-    return new_notification
\ No newline at end of file
+    return NotificationService(db).create_notification(user_id, content, notification_type)
\ No newline at end of file
@@ -1,28 +1,42 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
-from datetime import datetime, timedelta
-from app.auth import get_current_user, get_admin_user
+from datetime import datetime
+from app.auth import get_current_user, get_admin_user, get_optional_current_user
 from app.models import Users, Question, Answer
 from app.database import get_db
+from app.routing import DatabaseRoute
 from app.schemas.question_schemas import (
     QuestionCreate, 
     QuestionUpdate, 
     QuestionResponse, 
+    QuestionListItem,
     QuestionDetailResponse,
     QuestionCreateResponse,
-    AnswerInQuestion
+    QuestionFullResponse,
+    AnswerInQuestion,
+    AnswerWithComments
 )
+from app.schemas.comment_scheme import CommentResponse
+from app.services.question_service import LISTING_FIELDS, QuestionService, make_excerpt
+from app.services.search_service import SearchService
+from app.services.tag_service import TagService
+from app.services.mention_service import enqueue_mentions, extract_mentions
+from app.services.ranking_service import hot_score
+from app.pagination import NEXT_CURSOR_HEADER, keyset_page
+from app.cache import QUESTIONS_NAMESPACE, cached, question_namespace, response_cache
+from app.serialization import json_response, rows_to_dicts
 from uuid import UUID
 from typing import List, Optional
 
 router = APIRouter(
     prefix="/question",
     tags=["Questions"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.get("/{qid}", response_model=QuestionDetailResponse)
+@cached(lambda params: [question_namespace(params["qid"])])
 def get_question(qid: UUID, db: Session = Depends(get_db)):
     """Get a specific question with all its answers."""
     
@@ -47,6 +61,7 @@ def get_question(qid: UUID, db: Session = Depends(get_db)):
             content=answer.content,
             accepted=answer.accepted,
             votes=answer.votes,
+            comment_count=answer.comment_count,
             created_at=answer.created_at,
             image_path=answer.image_path
         )
@@ -68,6 +83,70 @@ def get_question(qid: UUID, db: Session = Depends(get_db)):
         answers=answer_list
     )
 
+@router.get("/{qid}/full", response_model=QuestionFullResponse)
+def get_question_full(
+    qid: UUID,
+    current_user: Optional[Users] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db),
+    comments_per_answer: int = Query(default=5, ge=1, le=50, description="Comments returned per answer")
+):
+    """Get a question with its sorted answers, their first comments and vote stats in one request."""
+    
+    page = QuestionService(db).page(qid, current_user.id if current_user else None, comments_per_answer)
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    question = page["question"]
+    return QuestionFullResponse(
+        qid=question.qid,
+        username=question.username,
+        userid=question.userid,
+        title=question.title,
+        desc=question.desc,
+        votes=question.votes,
+        upvotes=question.upvotes,
+        downvotes=question.downvotes,
+        user_vote=page["user_vote"],
+        tags=question.tags,
+        created_at=question.created_at,
+        is_closed=question.is_closed,
+        image_path=question.image_path,
+        total_answers=len(page["answers"]),
+        answers=[
+            AnswerWithComments(
+                aid=entry["answer"].aid,
+                userid=entry["answer"].userid,
+                username=entry["answer"].username,
+                content=entry["answer"].content,
+                accepted=entry["answer"].accepted,
+                votes=entry["answer"].votes,
+                upvotes=entry["answer"].upvotes,
+                downvotes=entry["answer"].downvotes,
+                user_vote=entry["user_vote"],
+                comment_count=entry["answer"].comment_count,
+                created_at=entry["answer"].created_at,
+                image_path=entry["answer"].image_path,
+                comments=[
+                    CommentResponse(
+                        cid=c.cid,
+                        userid=c.userid,
+                        username=c.username,
+                        message=c.message,
+                        aid=c.aid,
+                        created_at=c.created_at
+                    )
+                    for c in entry["comments"]
+                ],
+                total_comments=entry["total_comments"],
+                comments_next_cursor=entry["comments_next_cursor"]
+            )
+            for entry in page["answers"]
+        ]
+    )
+
 @router.post("/", response_model=QuestionCreateResponse)
 def create_question(
     question: QuestionCreate, 
@@ -76,22 +155,34 @@ def create_question(
 ):
     """Create a new question."""
     
-    # Create new question
+    # Create new question (its hot score starts from the creation time)
+    created_at = datetime.utcnow()
     new_question = Question(
         username=current_user.username,
         userid=current_user.id,
         title=question.title,
         desc=question.desc,
-        tags=question.tags,
+        excerpt=make_excerpt(question.desc),
         image_path=question.image_path,
         votes=0,
-        is_closed=False
+        is_closed=False,
+        created_at=created_at,
+        hot_score=hot_score(0, created_at)
     )
     
     db.add(new_question)
+    TagService(db).set_question_tags(new_question, question.tags)
+    db.flush()
+    enqueue_mentions(
+        db, extract_mentions(question.title, question.desc), new_question.qid,
+        "question", current_user.id, current_user.username
+    )
     db.commit()
     db.refresh(new_question)
     
+    SearchService(db).index(new_question)
+    response_cache.invalidate(QUESTIONS_NAMESPACE)
+    
     return QuestionCreateResponse(
         qid=new_question.qid,
         created_at=new_question.created_at
@@ -121,96 +212,87 @@ def delete_question(
             detail="Not authorized to delete this question"
         )
     
-    # Delete the question (cascade will delete related answers and comments)
+    # Release its tags, then delete the question (cascade will delete related answers and comments)
+    TagService(db).release_question_tags(question)
     db.delete(question)
     db.commit()
     
+    SearchService(db).remove(qid)
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(qid))
+    
     return None  # 204 No Content
 
-@router.get("/", response_model=List[QuestionResponse])
+@router.get("/", response_model=List[QuestionListItem])
 def get_questions(
+    response: Response,
     db: Session = Depends(get_db),
     page: int = Query(default=1, ge=1, description="Page number"),
     per_page: int = Query(default=10, ge=1, le=50, description="Items per page"),
     search: Optional[str] = Query(default=None, description="Search in title, description, or tags"),
-    tags: Optional[str] = Query(default=None, description="Filter by tags"),
-    sort: str = Query(default="latest", description="Sort by: trending, latest, most_popular"),
-    username: Optional[str] = Query(default=None, description="Filter by username")
+    tags: Optional[str] = Query(default=None, description="Filter by comma-separated tags"),
+    tag_mode: str = Query(default="all", pattern="^(all|any)$", description="Match all tags (AND) or any tag (OR)"),
+    sort: str = Query(default="latest", description="Sort by: relevance (with search), trending, latest, most_popular"),
+    username: Optional[str] = Query(default=None, description="Filter by username"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from the X-Next-Cursor header of the previous page")
 ):
-    """Get all questions with optional search, filtering, and sorting."""
+    """
+    Get all questions with optional search, filtering, and sorting.
+    
+    Every sort returns an X-Next-Cursor header; pass it back as `cursor` to seek to the next page.
+    """
     
     # Calculate offset for pagination
     offset = (page - 1) * per_page
     
     # Base query
-    query = db.query(Question)
-    
-    # Apply search filter (search in title, description, and tags)
-    if search:
-        query = query.filter(
-            Question.title.ilike(f"%{search}%") | 
-            Question.desc.ilike(f"%{search}%") |
-            Question.tags.ilike(f"%{search}%")
-        )
+    query = QuestionService(db).listing_query()
+    search_service = SearchService(db)
+    
+    # Relevance ordering only makes sense for a search
+    if sort == "relevance" and not search:
+        sort = "latest"
     
     # Apply tags filter
     if tags:
-        query = query.filter(Question.tags.ilike(f"%{tags}%"))
+        query = TagService(db).filter_questions(query, tags, match_all=tag_mode == "all")
     
     # Apply username filter
     if username:
         query = query.filter(Question.username.ilike(f"%{username}%"))
     
+    # Apply full-text search filter (relevance ranking applies its own match)
+    if search and sort != "relevance":
+        query = search_service.filter(query, search)
+    
     # Apply sorting based on sort parameter
-    if sort == "trending":
-        # Get current time minus 24 hours
-        twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
+    next_cursor = None
+    if sort == "relevance":
+        questions, next_cursor = search_service.ranked_page(query, search, per_page, cursor)
         
-        # First get questions from last 24 hours sorted by votes
-        trending_questions = query.filter(
-            Question.created_at >= twenty_four_hours_ago
-        ).order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+    elif sort == "trending":
+        # Single indexed scan over the precomputed hot score
+        questions, next_cursor = keyset_page(
+            query, [Question.hot_score, Question.qid], [True, True], per_page, cursor, offset
+        )
         
-        # If we don't have enough trending questions, fill with latest
-        if len(trending_questions) < per_page:
-            remaining_limit = per_page - len(trending_questions)
-            trending_qids = [q.qid for q in trending_questions]
-            
-            older_questions = query.filter(
-                and_(
-                    Question.created_at < twenty_four_hours_ago,
-                    ~Question.qid.in_(trending_qids) if trending_qids else True
-                )
-            ).order_by(desc(Question.created_at)).limit(remaining_limit).all()
-            
-            questions = trending_questions + older_questions
-        else:
-            questions = trending_questions
-            
     elif sort == "latest":
-        questions = query.order_by(desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            query, [Question.created_at, Question.qid], [True, True], per_page, cursor, offset
+        )
         
     elif sort == "most_popular":
-        questions = query.order_by(desc(Question.votes), desc(Question.created_at)).offset(offset).limit(per_page).all()
+        questions, next_cursor = keyset_page(
+            query, [Question.votes, Question.created_at, Question.qid], [True, True, True], per_page, cursor, offset
+        )
         
     else:
-        raise HTTPException(status_code=400, detail="Invalid sort parameter. Use: trending, latest, or most_popular")
-    
-    return [
-        QuestionResponse(
-            qid=q.qid,
-            username=q.username,
-            userid=q.userid,
-            title=q.title,
-            desc=q.desc,
-            votes=q.votes,
-            tags=q.tags,
-            created_at=q.created_at,
-            is_closed=q.is_closed,
-            image_path=q.image_path
-        )
-        for q in questions
-    ]
+        raise HTTPException(status_code=400, detail="Invalid sort parameter. Use: relevance, trending, latest, or most_popular")
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Rows go out as they were selected, without building or re-validating models
+    return json_response(rows_to_dicts(questions, LISTING_FIELDS), response)
 
 @router.put("/{qid}", response_model=QuestionResponse)
 def update_question(
@@ -238,13 +320,24 @@ def update_question(
         )
     
     # Update question fields
+    previous_mentions = set(extract_mentions(question.title, question.desc))
     update_data = question_update.model_dump(exclude_unset=True)
+    if "tags" in update_data:
+        TagService(db).set_question_tags(question, update_data.pop("tags"))
     for field, value in update_data.items():
         setattr(question, field, value)
+    if "desc" in update_data:
+        question.excerpt = make_excerpt(question.desc)
     
+    # Only users mentioned by this edit are notified
+    new_mentions = [u for u in extract_mentions(question.title, question.desc) if u not in previous_mentions]
+    enqueue_mentions(db, new_mentions, qid, "question", current_user.id, current_user.username)
     db.commit()
     db.refresh(question)
     
+    SearchService(db).index(question)
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(qid))
+    
     return QuestionResponse(
         qid=question.qid,
         username=question.username,
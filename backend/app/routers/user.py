@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from app.auth import get_current_user, get_admin_user
+from app.auth import get_current_user, get_admin_user, invalidate_principal
+from app.token_revocation import revoke_user_families
 from app.models import Users, Question, Answer, Comment, Votes
 from app.database import get_db
+from app.routing import DatabaseRoute
 from app.schemas.user_schemas import (
     UserResponse, 
     UserUpdate, 
@@ -12,13 +14,15 @@ from app.schemas.user_schemas import (
     UsersListResponse,
     UserListItem
 )
-from typing import List, Dict, Any
+from app.pagination import keyset_page
+from typing import List, Dict, Any, Optional
 from uuid import UUID
 
 router = APIRouter(
     prefix="/user",
     tags=["Users"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.get("/me", status_code=200, response_model=UserProfileResponse)
@@ -63,9 +67,11 @@ def get_me(current_user: Users = Depends(get_current_user), db: Session = Depend
     )
 
 @router.get("/all", response_model=UsersListResponse, dependencies=[Depends(get_admin_user)])
-def get_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
-    """Get all users - Admin only access."""
-    users = db.query(Users).offset(skip).limit(limit).all()
+def get_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Get all users (oldest first) - Admin only access. Pass `next_cursor` back as `cursor` for the next page."""
+    users, next_cursor = keyset_page(
+        db.query(Users), [Users.created_at, Users.id], [False, False], limit, cursor, skip
+    )
     
     user_items = [
         UserListItem(
@@ -81,7 +87,8 @@ def get_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
     
     return UsersListResponse(
         users=user_items,
-        total=db.query(Users).count()
+        total=db.query(Users).count(),
+        next_cursor=next_cursor
     )
 
 
@@ -121,7 +128,11 @@ def delete_user(user_name: str, db: Session = Depends(get_db), current_user: Use
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Revoke their logins first: the families outlive the user so every worker sees it
+    user_id = user.id
+    revoke_user_families(db, user_id)
     db.delete(user)
     db.commit()
+    invalidate_principal(user_id, deleted=True)
     
     return {"message": f"User {user_name} deleted successfully"}
\ No newline at end of file
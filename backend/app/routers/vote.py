@@ -1,23 +1,27 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from app.auth import get_current_user
+from app.auth import get_current_user, get_current_user_id, get_optional_current_user
 from app.models import Users, Question, Answer, Votes
 from app.database import get_db
-from app.schemas.vote_schemas import VoteCreate, VoteResponse, VoteStats
+from app.routing import DatabaseRoute
+from app.schemas.vote_schemas import VoteCreate, VoteResponse, VoteStats, QuestionVoteStats
+from app.services.vote_service import VoteService
+from app.cache import QUESTIONS_NAMESPACE, question_namespace, response_cache
 from uuid import UUID
 from typing import Optional
 
 router = APIRouter(
     prefix="/vote",
     tags=["Votes"],
-    responses={404: {"description": "Not found"}}
+    responses={404: {"description": "Not found"}},
+    route_class=DatabaseRoute
 )
 
 @router.post("/answer/{aid}", status_code=200)
 def vote_answer(
     aid: UUID,
     vote_data: VoteCreate,
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Vote on an answer (upvote or downvote)."""
@@ -31,64 +35,33 @@ def vote_answer(
         )
     
     # Check if user is trying to vote on their own answer
-    if answer.userid == current_user.id:
+    if answer.userid == current_user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot vote on your own answer"
         )
     
-    # Check if user has already voted on this answer
-    existing_vote = db.query(Votes).filter(
-        Votes.userid == current_user.id,
-        Votes.id == aid,
-        Votes.is_answer == True
-    ).first()
-    
-    if existing_vote:
-        # Update existing vote if it's different
-        if existing_vote.is_upvote != vote_data.is_upvote:
-            # Change vote direction - update vote count accordingly
-            if vote_data.is_upvote:
-                answer.votes += 2  # Remove downvote (-1) and add upvote (+1) = +2
-            else:
-                answer.votes -= 2  # Remove upvote (+1) and add downvote (-1) = -2
-            
-            existing_vote.is_upvote = vote_data.is_upvote
-        else:
-            # Same vote - do nothing or return message
-            return {"message": "Vote already exists", "current_vote": existing_vote.is_upvote}
-    else:
-        # Create new vote
-        new_vote = Votes(
-            userid=current_user.id,
-            is_answer=True,
-            is_upvote=vote_data.is_upvote,
-            id=aid
-        )
-        
-        # Update answer vote count
-        if vote_data.is_upvote:
-            answer.votes += 1
-        else:
-            answer.votes -= 1
-        
-        db.add(new_vote)
+    # Upsert the vote and move the counter atomically
+    changed, total_votes = VoteService(db).cast(current_user_id, aid, True, vote_data.is_upvote)
+    if not changed:
+        # Same vote - do nothing or return message
+        return {"message": "Vote already exists", "current_vote": vote_data.is_upvote}
     
     db.commit()
-    db.refresh(answer)
+    response_cache.invalidate(question_namespace(answer.qid))
     
     return {
         "message": "Vote recorded successfully",
         "answer_id": aid,
         "vote_type": "upvote" if vote_data.is_upvote else "downvote",
-        "total_votes": answer.votes
+        "total_votes": total_votes
     }
 
 @router.post("/question/{qid}", status_code=200)
 def vote_question(
     qid: UUID,
     vote_data: VoteCreate,
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Vote on a question (upvote or downvote)."""
@@ -102,63 +75,32 @@ def vote_question(
         )
     
     # Check if user is trying to vote on their own question
-    if question.userid == current_user.id:
+    if question.userid == current_user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot vote on your own question"
         )
     
-    # Check if user has already voted on this question
-    existing_vote = db.query(Votes).filter(
-        Votes.userid == current_user.id,
-        Votes.id == qid,
-        Votes.is_answer == False
-    ).first()
-    
-    if existing_vote:
-        # Update existing vote if it's different
-        if existing_vote.is_upvote != vote_data.is_upvote:
-            # Change vote direction - update vote count accordingly
-            if vote_data.is_upvote:
-                question.votes += 2  # Remove downvote (-1) and add upvote (+1) = +2
-            else:
-                question.votes -= 2  # Remove upvote (+1) and add downvote (-1) = -2
-            
-            existing_vote.is_upvote = vote_data.is_upvote
-        else:
-            # Same vote - do nothing or return message
-            return {"message": "Vote already exists", "current_vote": existing_vote.is_upvote}
-    else:
-        # Create new vote
-        new_vote = Votes(
-            userid=current_user.id,
-            is_answer=False,
-            is_upvote=vote_data.is_upvote,
-            id=qid
-        )
-        
-        # Update question vote count
-        if vote_data.is_upvote:
-            question.votes += 1
-        else:
-            question.votes -= 1
-        
-        db.add(new_vote)
+    # Upsert the vote and move the counter (and hot score) atomically
+    changed, total_votes = VoteService(db).cast(current_user_id, qid, False, vote_data.is_upvote)
+    if not changed:
+        # Same vote - do nothing or return message
+        return {"message": "Vote already exists", "current_vote": vote_data.is_upvote}
     
     db.commit()
-    db.refresh(question)
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(qid))
     
     return {
         "message": "Vote recorded successfully",
         "question_id": qid,
         "vote_type": "upvote" if vote_data.is_upvote else "downvote",
-        "total_votes": question.votes
+        "total_votes": total_votes
     }
 
 @router.delete("/answer/{aid}", status_code=204)
 def delete_vote_answer(
     aid: UUID,
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Remove vote from an answer."""
@@ -171,42 +113,22 @@ def delete_vote_answer(
             detail="Answer not found"
         )
     
-    # Find user's vote on this answer
-    vote = db.query(Votes).filter(
-        Votes.userid == current_user.id,
-        Votes.id == aid,
-        Votes.is_answer == True
-    ).first()
-    
-    if not vote:
+    # Delete the user's vote and take it back out of the counter
+    if VoteService(db).retract(current_user_id, aid, True) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vote not found"
         )
     
-    # Check if user owns the vote
-    if vote.userid != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this vote"
-        )
-    
-    # Update answer vote count
-    if vote.is_upvote:
-        answer.votes -= 1
-    else:
-        answer.votes += 1
-    
-    # Delete the vote
-    db.delete(vote)
     db.commit()
+    response_cache.invalidate(question_namespace(answer.qid))
     
     return None  # 204 No Content
 
 @router.delete("/question/{qid}", status_code=204)
 def delete_vote_question(
     qid: UUID,
-    current_user: Users = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Remove vote from a question."""
@@ -219,35 +141,15 @@ def delete_vote_question(
             detail="Question not found"
         )
     
-    # Find user's vote on this question
-    vote = db.query(Votes).filter(
-        Votes.userid == current_user.id,
-        Votes.id == qid,
-        Votes.is_answer == False
-    ).first()
-    
-    if not vote:
+    # Delete the user's vote and take it back out of the counter
+    if VoteService(db).retract(current_user_id, qid, False) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vote not found"
         )
     
-    # Check if user owns the vote
-    if vote.userid != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this vote"
-        )
-    
-    # Update question vote count
-    if vote.is_upvote:
-        question.votes -= 1
-    else:
-        question.votes += 1
-    
-    # Delete the vote
-    db.delete(vote)
     db.commit()
+    response_cache.invalidate(QUESTIONS_NAMESPACE, question_namespace(qid))
     
     return None  # 204 No Content
 
@@ -267,19 +169,6 @@ def get_answer_vote_stats(
             detail="Answer not found"
         )
     
-    # Get vote counts
-    upvotes = db.query(Votes).filter(
-        Votes.id == aid,
-        Votes.is_answer == True,
-        Votes.is_upvote == True
-    ).count()
-    
-    downvotes = db.query(Votes).filter(
-        Votes.id == aid,
-        Votes.is_answer == True,
-        Votes.is_upvote == False
-    ).count()
-    
     # Get current user's vote if authenticated
     user_vote = None
     if current_user:
@@ -294,8 +183,8 @@ def get_answer_vote_stats(
     return {
         "answer_id": aid,
         "total_votes": answer.votes,
-        "upvotes": upvotes,
-        "downvotes": downvotes,
+        "upvotes": answer.upvotes,
+        "downvotes": answer.downvotes,
         "user_vote": user_vote
     }
 
@@ -315,19 +204,6 @@ def get_question_vote_stats(
             detail="Question not found"
         )
     
-    # Get vote counts
-    upvotes = db.query(Votes).filter(
-        Votes.id == qid,
-        Votes.is_answer == False,
-        Votes.is_upvote == True
-    ).count()
-    
-    downvotes = db.query(Votes).filter(
-        Votes.id == qid,
-        Votes.is_answer == False,
-        Votes.is_upvote == False
-    ).count()
-    
     # Get current user's vote if authenticated
     user_vote = None
     if current_user:
@@ -342,7 +218,24 @@ def get_question_vote_stats(
     return {
         "question_id": qid,
         "total_votes": question.votes,
-        "upvotes": upvotes,
-        "downvotes": downvotes,
+        "upvotes": question.upvotes,
+        "downvotes": question.downvotes,
         "user_vote": user_vote
-    }
\ No newline at end of file
+    }
+
+@router.get("/question/{qid}/page-stats", response_model=QuestionVoteStats)
+def get_question_page_vote_stats(
+    qid: UUID,
+    current_user: Optional[Users] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get vote statistics for a question and all its answers (one request per question page)."""
+    
+    stats = VoteService(db).question_stats(qid, current_user.id if current_user else None)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    return stats
@@ -0,0 +1,55 @@
+import functools
+import inspect
+from fastapi import Depends
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_async_db
+from typing import Optional
+
+
+def run_on_async_session(endpoint):
+    """
+    Turn a sync endpoint taking `db: Session` into an async one taking an AsyncSession.
+
+    The original function runs unchanged inside AsyncSession.run_sync: its queries are
+    awaited on the async driver from a greenlet on the event loop, so the request holds
+    no threadpool thread while it waits on the database.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    signature = inspect.signature(endpoint)
+    db_param = session_param(signature)
+    if db_param is None:
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        db: AsyncSession = kwargs.pop(db_param)
+        return await db.run_sync(lambda session: endpoint(**kwargs, **{db_param: session}))
+
+    wrapper.__signature__ = async_session_signature(signature, db_param)
+    return wrapper
+
+
+def session_param(signature: inspect.Signature) -> Optional[str]:
+    """Name of the `db: Session` parameter, if any."""
+    return next((p.name for p in signature.parameters.values() if p.annotation is Session), None)
+
+
+def async_session_signature(signature: inspect.Signature, db_param: str) -> inspect.Signature:
+    """`signature` with its `db: Session` parameter taking the request's AsyncSession instead."""
+    return signature.replace(parameters=[
+        p.replace(annotation=AsyncSession, default=Depends(get_async_db)) if p.name == db_param else p
+        for p in signature.parameters.values()
+    ])
+
+
+class DatabaseRoute(APIRoute):
+    """Route class for routers whose endpoints use `db: Session = Depends(get_db)`; switches them to async with DATABASE_ASYNC."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if settings.DATABASE_ASYNC:
+            endpoint = run_on_async_session(endpoint)
+        super().__init__(path, endpoint, **kwargs)
@@ -20,6 +20,7 @@ class AnswerResponse(BaseModel):
     content: str
     accepted: bool
     votes: int
+    comment_count: int = 0
     created_at: datetime
     image_path: Optional[str] = None
     
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
@@ -25,6 +25,7 @@ class NotificationResponse(BaseModel):
     content: str
     type: NotificationType
     created_at: datetime
+    actor_count: int = 1  # > 1 for a grouped notification ("3 people answered ...")
     
     class Config:
         from_attributes = True
@@ -32,14 +33,36 @@ class NotificationResponse(BaseModel):
 class NotificationMarkRead(BaseModel):
     is_read: bool = True
 
+class NotificationReadRequest(BaseModel):
+    notification_id: UUID
+
+class NotificationBulkRequest(BaseModel):
+    """Select notifications by id, or all of them up to a created_at watermark (exactly one)."""
+    notification_ids: Optional[List[UUID]] = Field(None, min_length=1, max_length=500, description="Notification IDs")
+    before: Optional[datetime] = Field(None, description="Every notification created at or before this time")
+
+    @model_validator(mode="after")
+    def check_selector(self):
+        if (self.notification_ids is None) == (self.before is None):
+            raise ValueError("Provide exactly one of notification_ids or before")
+        return self
+
+class NotificationBulkResult(BaseModel):
+    updated_count: int
+    notification_ids: List[UUID]  # the notifications actually changed
+
 class NotificationList(BaseModel):
     notifications: List[NotificationResponse]
     total: int
     unread_count: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 class NotificationStats(BaseModel):
     total_notifications: int
     unread_notifications: int
-    read_notifications: int
\ No newline at end of file
+    read_notifications: int
+
+class NotificationUnreadCount(BaseModel):
+    unread_count: int
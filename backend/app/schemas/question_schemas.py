@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
+from app.schemas.comment_scheme import CommentResponse
 
 class QuestionCreate(BaseModel):
     title: str
@@ -31,6 +32,21 @@ class QuestionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Listing card: a plain-text excerpt instead of the full rich-text desc
+class QuestionListItem(BaseModel):
+    qid: UUID
+    username: str
+    userid: UUID
+    title: str
+    excerpt: str
+    votes: int
+    answer_count: int = 0
+    accepted_aid: Optional[UUID] = None
+    tags: Optional[str] = None
+    created_at: datetime
+    is_closed: bool
+    image_path: Optional[str] = None
+
 # New schema for answer response within question
 class AnswerInQuestion(BaseModel):
     aid: UUID
@@ -39,6 +55,7 @@ class AnswerInQuestion(BaseModel):
     content: str
     accepted: bool
     votes: int
+    comment_count: int = 0
     created_at: datetime
     image_path: Optional[str] = None
     
@@ -62,6 +79,23 @@ class QuestionDetailResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Answer with its vote counts and first page of comments, for the full question page
+class AnswerWithComments(AnswerInQuestion):
+    upvotes: int
+    downvotes: int
+    user_vote: Optional[bool] = None  # True=upvote, False=downvote, None=no vote / anonymous
+    comments: List[CommentResponse]
+    total_comments: int
+    comments_next_cursor: Optional[str] = None  # pass as `cursor` to GET /comments/{aid}
+
+# Everything the question page renders, in one response
+class QuestionFullResponse(QuestionResponse):
+    upvotes: int
+    downvotes: int
+    user_vote: Optional[bool] = None
+    total_answers: int
+    answers: List[AnswerWithComments]
+
 # Schema for question creation response
 class QuestionCreateResponse(BaseModel):
     qid: UUID
@@ -15,6 +15,9 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class UserResponse(BaseModel):
     id: UUID
     username: str
@@ -63,4 +66,5 @@ class UserListItem(BaseModel):
 
 class UsersListResponse(BaseModel):
     users: List[UserListItem]
-    total: int
\ No newline at end of file
+    total: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
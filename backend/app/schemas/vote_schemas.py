@@ -30,6 +30,10 @@ class VoteStats(BaseModel):
     downvotes: int
     user_vote: Optional[bool] = None  # True=upvote, False=downvote, None=no vote
 
+class QuestionVoteStats(BaseModel):
+    question: VoteStats
+    answers: list[VoteStats]  # every answer of the question
+
 class VoteList(BaseModel):
     votes: list[VoteResponse]
     total: int
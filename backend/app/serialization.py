@@ -0,0 +1,32 @@
+import operator
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import Any, List, Optional, Sequence, Type
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> list:
+    """The model columns backing each field of a response schema, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_to_dicts(rows: Sequence[Any], fields: Sequence[str]) -> List[dict]:
+    """Map result rows (column tuples or ORM objects) to plain dicts of `fields`."""
+    if len(fields) == 1:
+        return [{fields[0]: getattr(row, fields[0])} for row in rows]
+    get = operator.attrgetter(*fields)
+    return [dict(zip(fields, get(row))) for row in rows]
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> ORJSONResponse:
+    """
+    Serialize plain content (dicts, lists, UUIDs, datetimes) straight with orjson.
+
+    Returning a response skips FastAPI's response_model validation and jsonable_encoder pass,
+    so the content must already have the documented shape, e.g. rows_to_dicts() over the
+    schema's own fields. Headers the endpoint set on its `response` (X-Next-Cursor) are kept.
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return ORJSONResponse(content, headers=headers)
@@ -0,0 +1,46 @@
+import re
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.services import notification_pipeline
+from uuid import UUID
+from typing import Iterable, List
+
+# "@username", but not the middle of an e-mail address or "@@"; trailing punctuation is not part of the name
+MENTION_PATTERN = re.compile(r"(?<![\w@])@([\w.-]*\w)")
+
+
+def extract_mentions(*texts: str, limit: int = None) -> List[str]:
+    """Distinct mentioned usernames in order of first appearance, at most `limit` (MENTION_MAX_PER_POST)."""
+    limit = settings.MENTION_MAX_PER_POST if limit is None else limit
+    usernames: List[str] = []
+    for text in texts:
+        for match in MENTION_PATTERN.finditer(text or ""):
+            if len(usernames) >= limit:
+                return usernames
+            username = match.group(1)
+            if username not in usernames:
+                usernames.append(username)
+    return usernames
+
+
+def enqueue_mentions(
+    db: Session,
+    usernames: Iterable[str],
+    question_id: UUID,
+    content_type: str,
+    actor_id: UUID,
+    actor_username: str
+):
+    """Queue one mention event for a post; the pipeline notifies every mentioned user in one insert."""
+    usernames = [username for username in usernames if username != actor_username]
+    if not usernames:
+        return
+    notification_pipeline.enqueue_event(
+        db,
+        notification_pipeline.USERS_MENTIONED,
+        usernames=usernames,
+        question_id=str(question_id),
+        content_type=content_type,
+        actor_id=str(actor_id),
+        actor_username=actor_username
+    )
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.metrics import metrics
+from app.models import Notification
+from uuid import UUID
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding messages that are only published once their transaction commits
+SESSION_MESSAGES_KEY = "notification_hub_messages"
+# Postgres channel used by the LISTEN/NOTIFY backend
+PG_CHANNEL = "stackit_notifications"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more, failing the whole transaction
+PG_NOTIFY_MAX_BYTES = 7999
+# Published messages are these Notification columns, so one too big for NOTIFY can be
+# sent as its nid and reloaded from the row by the listener
+MESSAGE_FIELDS = ("nid", "userid", "is_read", "content", "type", "created_at", "actor_count")
+
+Subscriber = Tuple[asyncio.AbstractEventLoop, asyncio.Queue]
+
+
+class NotificationHub:
+    """
+    Pub/sub of new notifications to the streaming clients connected to this worker.
+
+    Subscribers are per-connection asyncio queues; deliver() may be called from any thread.
+    How messages reach deliver() depends on the backend: in-process, they are handed over
+    when the creating session commits; with Postgres, they go through NOTIFY (sent inside the
+    creating transaction) and a LISTEN thread, so every worker sees every notification.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[UUID, Set[Subscriber]] = defaultdict(set)
+
+        metrics.gauge("notification_hub.subscribers", lambda: sum(len(s) for s in self._subscribers.values()))
+
+    def subscribe(self, user_id: UUID) -> Subscriber:
+        """Register the current event loop's connection for a user's notifications."""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id: UUID, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def deliver(self, user_id: UUID, message: dict):
+        """Push a message to this worker's subscribers of user_id."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, message: dict):
+        try:
+            queue.put_nowait(message)
+            metrics.incr("notification_hub.delivered")
+        except asyncio.QueueFull:
+            # A client that stopped reading misses pushes; it still sees them on its next fetch
+            metrics.incr("notification_hub.dropped")
+
+    def publish(self, db: Session, user_id: UUID, message: dict):
+        """Publish a message when db's current transaction commits (dropped on rollback)."""
+        metrics.incr("notification_hub.published")
+        if settings.NOTIFICATION_HUB_BACKEND == "postgres":
+            # NOTIFY is transactional: Postgres delivers it on commit only
+            payload = notify_payload(user_id, message)
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": PG_CHANNEL, "payload": payload})
+        else:
+            db.info.setdefault(SESSION_MESSAGES_KEY, []).append((user_id, message))
+
+    def start(self):
+        if settings.NOTIFICATION_HUB_BACKEND == "postgres":
+            _pg_listener.start()
+
+    def stop(self):
+        _pg_listener.stop()
+
+
+def notify_payload(user_id: UUID, message: dict) -> str:
+    """NOTIFY payload for a message: the message itself, or just its nid if it would not fit."""
+    payload = json.dumps({"user_id": str(user_id), "message": message}, separators=(",", ":"))
+    if len(payload) > PG_NOTIFY_MAX_BYTES:  # ASCII: json.dumps escapes everything else
+        metrics.incr("notification_hub.oversized")
+        payload = json.dumps({"user_id": str(user_id), "nid": message["nid"]}, separators=(",", ":"))
+    return payload
+
+
+def load_message(nid: UUID) -> Optional[dict]:
+    """The message for a stored notification; None if it was deleted since."""
+    with SessionLocal() as db:
+        notification = db.get(Notification, nid)
+        if notification is None:
+            return None
+        return jsonable_encoder({field: getattr(notification, field) for field in MESSAGE_FIELDS})
+
+
+class PostgresListener:
+    """Background LISTEN on PG_CHANNEL that feeds NOTIFY payloads into the local hub."""
+
+    def __init__(self, poll_seconds: float = 5):
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Notification listener lost its connection; reconnecting")
+                self._stop.wait(self.poll_seconds)
+
+    def _listen(self):
+        # A dedicated connection, detached from the pool for as long as it listens
+        connection = engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.dbapi_connection
+        try:
+            dbapi_connection.autocommit = True
+            dbapi_connection.cursor().execute(f"LISTEN {PG_CHANNEL}")
+            while not self._stop.is_set():
+                if select.select([dbapi_connection], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    payload = json.loads(notify.payload)
+                    message = payload["message"] if "message" in payload else load_message(UUID(payload["nid"]))
+                    if message is not None:
+                        hub.deliver(UUID(payload["user_id"]), message)
+        finally:
+            connection.close()
+
+
+hub = NotificationHub()
+_pg_listener = PostgresListener()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_messages(session: Session):
+    messages: List = session.info.pop(SESSION_MESSAGES_KEY, [])
+    for user_id, message in messages:
+        hub.deliver(user_id, message)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_messages(session: Session):
+    session.info.pop(SESSION_MESSAGES_KEY, None)
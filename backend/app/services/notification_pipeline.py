@@ -0,0 +1,222 @@
+import logging
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.jobs import periodic_job
+from app.metrics import metrics
+from app.models import NotificationOutbox
+from app.services.notification_service import NotificationService
+from uuid import UUID
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding outbox ids handed to the worker once their transaction commits
+SESSION_EVENTS_KEY = "notification_outbox_events"
+
+# Event types
+ANSWER_CREATED = "answer_created"
+COMMENT_CREATED = "comment_created"
+USERS_MENTIONED = "users_mentioned"
+
+# event type -> handler(NotificationService, **payload); handlers only add to the transaction
+HANDLERS: Dict[str, Callable[..., None]] = {
+    ANSWER_CREATED: lambda service, question_id, actor_id, actor_username: service.notify_question_answered(
+        UUID(question_id), UUID(actor_id), actor_username
+    ),
+    COMMENT_CREATED: lambda service, answer_id, actor_id, actor_username: service.notify_answer_commented(
+        UUID(answer_id), UUID(actor_id), actor_username
+    ),
+    USERS_MENTIONED: lambda service, usernames, question_id, content_type, actor_id, actor_username: service.notify_users_mentioned(
+        usernames, UUID(question_id), content_type, UUID(actor_id), actor_username
+    ),
+}
+
+
+def enqueue_event(db: Session, event_type: str, **payload):
+    """
+    Record a notification event in the caller's transaction.
+
+    The outbox row commits (or rolls back) together with the post that caused it, so a
+    crash can delay the notification but never lose it. Recipients and content are
+    resolved later by the worker, outside the request.
+    """
+    outbox_event = NotificationOutbox(event_type=event_type, payload=payload)
+    db.add(outbox_event)
+    db.flush()
+    db.info.setdefault(SESSION_EVENTS_KEY, []).append(outbox_event.id)
+
+
+class NotificationPipeline:
+    """
+    Background worker turning notification_outbox rows into notifications.
+
+    Committed event ids go through a bounded in-memory queue for prompt delivery; when it is
+    full, or after a restart, the worker picks the rows up from the table on its next poll.
+    Events are handled in batches, one transaction each; a failing batch is retried event by
+    event, and a failing event is retried with exponential backoff up to max_attempts.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, poll_seconds: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._queue: "queue.Queue[Optional[UUID]]" = queue.Queue(queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+
+        metrics.gauge("notification_pipeline.queued", self._queue.qsize)
+
+    def submit(self, event_id: UUID):
+        """Hand a committed event to the worker (the table poll catches it if the queue is full)."""
+        try:
+            self._queue.put_nowait(event_id)
+        except queue.Full:
+            metrics.incr("notification_pipeline.queue_full")
+
+    def process(self, db: Session, event_ids: Optional[List[UUID]] = None) -> int:
+        """Handle the given pending events, or the oldest due ones; returns the number handled."""
+        now = datetime.utcnow()
+        stmt = (
+            select(NotificationOutbox)
+            .where(NotificationOutbox.processed_at.is_(None), NotificationOutbox.available_at <= now)
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.created_at)
+            .limit(self.batch_size)
+            # Other workers skip what this one is handling
+            .with_for_update(skip_locked=True)
+        )
+        if event_ids is not None:
+            stmt = stmt.where(NotificationOutbox.id.in_(event_ids))
+        events = db.scalars(stmt).all()
+        if not events:
+            db.rollback()
+            return 0
+
+        event_ids = [outbox_event.id for outbox_event in events]
+        try:
+            service = NotificationService(db)
+            for outbox_event in events:
+                HANDLERS[outbox_event.event_type](service, **outbox_event.payload)
+                outbox_event.processed_at = now
+                outbox_event.last_error = None
+            db.commit()
+        except Exception:
+            db.rollback()
+            if len(event_ids) == 1:
+                self._record_failure(db, event_ids[0])
+                return 0
+        else:
+            metrics.incr("notification_pipeline.processed", len(events))
+            metrics.incr("notification_pipeline.batches")
+            return len(events)
+
+        # Isolate the failing event(s): retry one per transaction
+        return sum(self.process(db, [event_id]) for event_id in event_ids)
+
+    def _record_failure(self, db: Session, event_id: UUID):
+        logger.exception("Notification event %s failed", event_id)
+        outbox_event = db.get(NotificationOutbox, event_id)
+        if outbox_event is None:
+            return
+        outbox_event.attempts += 1
+        outbox_event.last_error = traceback.format_exc(limit=5)
+        if outbox_event.attempts >= self.max_attempts:
+            # Given up: kept with its error until pruned
+            outbox_event.processed_at = datetime.utcnow()
+            metrics.incr("notification_pipeline.dead")
+        else:
+            outbox_event.available_at = datetime.utcnow() + timedelta(seconds=2 ** outbox_event.attempts)
+            metrics.incr("notification_pipeline.retries")
+        db.commit()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="notification-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker after it handles what is already queued."""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(None)  # wake the worker
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 5)
+            self._thread = None
+
+    def _loop(self):
+        last_poll = time.monotonic()
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._process_once(batch)
+            elif self._stop.is_set():
+                return
+            # Poll the table for events that missed the queue (full queue, retries, restarts)
+            if time.monotonic() - last_poll >= self.poll_seconds:
+                self._process_once(None)
+                last_poll = time.monotonic()
+
+    def _next_batch(self) -> List[UUID]:
+        """Up to batch_size queued ids, waiting at most poll_seconds for the first one."""
+        batch: List[UUID] = []
+        try:
+            if self._stop.is_set():
+                event_id = self._queue.get_nowait()
+            else:
+                event_id = self._queue.get(timeout=self.poll_seconds)
+            while True:
+                if event_id is not None:
+                    batch.append(event_id)
+                if len(batch) >= self.batch_size:
+                    break
+                event_id = self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        return batch
+
+    def _process_once(self, event_ids: Optional[List[UUID]]):
+        db = SessionLocal()
+        try:
+            self.process(db, event_ids)
+        except Exception:
+            logger.exception("Notification pipeline run failed; events stay in the outbox")
+        finally:
+            db.close()
+
+
+pipeline = NotificationPipeline(
+    settings.NOTIFICATION_OUTBOX_QUEUE_SIZE,
+    settings.NOTIFICATION_OUTBOX_BATCH_SIZE,
+    settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+    settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _submit_events(session: Session):
+    event_ids: List = session.info.pop(SESSION_EVENTS_KEY, [])
+    for event_id in event_ids:
+        pipeline.submit(event_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_events(session: Session):
+    session.info.pop(SESSION_EVENTS_KEY, None)
+
+
+@periodic_job("prune-notification-outbox", interval_seconds=3600)
+def prune_notification_outbox(db: Session):
+    """Hourly cleanup of handled outbox events."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.NOTIFICATION_OUTBOX_RETENTION_HOURS)
+    db.execute(delete(NotificationOutbox).where(NotificationOutbox.processed_at < cutoff))
+    db.commit()
@@ -1,8 +1,24 @@
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import String, case, cast, delete, func, insert, select, text, update
 from sqlalchemy.orm import Session
-from app.models import Notification, Users, Question, Answer
+from app.config import settings
+from app.database import dialect_insert
+from app.jobs import periodic_job
+from app.metrics import metrics
+from app.models import Notification, NotificationActor, NotificationCounter, Users, Question, Answer
 from app.schemas.notification_schema import NotificationType
+from app.services.notification_hub import hub
 from uuid import UUID
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+# How mention notifications name the post: "mentioned you in an answer"
+CONTENT_TYPE_NAMES = {"question": "a question", "answer": "an answer", "comment": "a comment"}
+
+def _with_article(content_type: str) -> str:
+    return CONTENT_TYPE_NAMES.get(content_type, f"a {content_type}")
 
 class NotificationService:
     def __init__(self, db: Session):
@@ -17,6 +33,15 @@ class NotificationService:
     ):
         """Create a new notification for a user."""
         
+        new_notification = self.add_notification(user_id, content, notification_type)
+        self.db.commit()
+        self.db.refresh(new_notification)
+        
+        return new_notification
+    
+    def add_notification(self, user_id: UUID, content: str, notification_type: NotificationType) -> Notification:
+        """Add a notification to the current transaction (the caller commits)."""
+        
         new_notification = Notification(
             userid=user_id,
             content=content,
@@ -25,48 +50,359 @@ class NotificationService:
         )
         
         self.db.add(new_notification)
-        self.db.commit()
-        self.db.refresh(new_notification)
+        self.db.flush()
+        self.adjust_counters({user_id: (1, 1)})
+        self._publish(new_notification.nid, user_id, content, notification_type, new_notification.created_at)
         
         return new_notification
     
-    def notify_question_answered(self, question_id: UUID, answerer_username: str):
+    def add_notifications(self, notifications: List[Tuple[UUID, str, NotificationType]]):
+        """Add (user_id, content, type) notifications in a single INSERT (the caller commits)."""
+        
+        if not notifications:
+            return
+        created_at = datetime.utcnow()
+        rows = [
+            {
+                "nid": uuid.uuid4(),
+                "userid": user_id,
+                "is_read": False,
+                "content": content,
+                "type": notification_type.value,
+                "created_at": created_at
+            }
+            for user_id, content, notification_type in notifications
+        ]
+        self.db.execute(insert(Notification).values(rows))
+        recipients = Counter(user_id for user_id, _, _ in notifications)
+        self.adjust_counters({user_id: (count, count) for user_id, count in recipients.items()})
+        for row, (user_id, content, notification_type) in zip(rows, notifications):
+            self._publish(row["nid"], user_id, content, notification_type, created_at)
+    
+    def add_grouped_notification(
+        self,
+        user_id: UUID,
+        group_key: str,
+        actor_id: UUID,
+        content: str,
+        grouped_content: str,
+        notification_type: NotificationType
+    ):
+        """
+        Add a notification, or fold it into the user's unread one with the same group_key
+        (the caller commits). A new actor on a folded row raises its actor_count, makes it
+        read "<actor_count><grouped_content>" and moves it to the top of the list; a repeat
+        actor changes nothing.
+        """
+        
+        table = Notification.__table__
+        created_at = datetime.utcnow()
+        nid = uuid.uuid4()
+        stmt = dialect_insert(self.db, table).values(
+            nid=nid,
+            userid=user_id,
+            is_read=False,
+            content=content,
+            type=notification_type.value,
+            created_at=created_at,
+            group_key=group_key,
+            actor_count=1
+        )
+        # On conflict a no-op update: it locks the unread row, so actors are counted one at a time
+        existing_nid = self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["userid", "group_key"],
+                index_where=text("is_read = false AND group_key IS NOT NULL"),
+                set_={"group_key": table.c.group_key}
+            ).returning(table.c.nid)
+        ).scalar_one()
+        
+        actors = NotificationActor.__table__
+        new_actor = self.db.execute(
+            dialect_insert(self.db, actors)
+            .values(nid=existing_nid, actor_id=actor_id)
+            .on_conflict_do_nothing(index_elements=["nid", "actor_id"])
+        ).rowcount == 1
+        
+        if existing_nid == nid:
+            self.adjust_counters({user_id: (1, 1)})
+            self._publish(nid, user_id, content, notification_type, created_at)
+        elif new_actor:
+            row = self.db.execute(
+                update(table)
+                .where(table.c.nid == existing_nid)
+                .values(
+                    actor_count=table.c.actor_count + 1,
+                    content=cast(table.c.actor_count + 1, String) + grouped_content,
+                    created_at=created_at
+                )
+                .returning(table.c.content, table.c.actor_count)
+            ).one()
+            self._publish(existing_nid, user_id, row.content, notification_type, created_at, row.actor_count)
+    
+    def _publish(
+        self,
+        nid: UUID,
+        user_id: UUID,
+        content: str,
+        notification_type: NotificationType,
+        created_at: datetime,
+        actor_count: int = 1
+    ):
+        # Pushed to the recipient's open streams once this commits
+        hub.publish(self.db, user_id, jsonable_encoder({
+            "nid": nid,
+            "userid": user_id,
+            "is_read": False,
+            "content": content,
+            "type": notification_type.value,
+            "created_at": created_at,
+            "actor_count": actor_count
+        }))
+    
+    def adjust_counters(self, deltas: Dict[UUID, Tuple[int, int]], create: bool = False):
+        """Add (unread, total) deltas to users' notification counters, in one upsert (zero deltas skipped unless `create`)."""
+        
+        if not create:
+            deltas = {user_id: delta for user_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        table = NotificationCounter.__table__
+        stmt = dialect_insert(self.db, table).values([
+            {"userid": user_id, "unread_count": unread, "total_count": total}
+            for user_id, (unread, total) in deltas.items()
+        ])
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["userid"],
+            set_={
+                "unread_count": table.c.unread_count + stmt.excluded.unread_count,
+                "total_count": table.c.total_count + stmt.excluded.total_count
+            }
+        ))
+    
+    def get_counts(self, user_id: UUID) -> Tuple[int, int]:
+        """(unread, total) notifications of a user: a primary-key read."""
+        
+        counter = self.db.get(NotificationCounter, user_id)
+        if counter is None:
+            return 0, 0
+        return counter.unread_count, counter.total_count
+    
+    def reconcile_counters(self) -> int:
+        """Recount the users whose counters disagree with their notifications; returns how many were fixed."""
+        
+        unread = func.sum(case((Notification.is_read == False, 1), else_=0))
+        actual = (
+            select(Notification.userid, unread.label("unread_count"), func.count().label("total_count"))
+            .group_by(Notification.userid)
+            .subquery()
+        )
+        counters = NotificationCounter.__table__
+        drifted = self.db.execute(
+            select(counters.c.userid)
+            .outerjoin(actual, actual.c.userid == counters.c.userid)
+            .where(
+                (counters.c.unread_count != func.coalesce(actual.c.unread_count, 0))
+                | (counters.c.total_count != func.coalesce(actual.c.total_count, 0))
+            )
+            .union(
+                select(actual.c.userid)
+                .outerjoin(counters, counters.c.userid == actual.c.userid)
+                .where(counters.c.userid.is_(None))
+            )
+        ).scalars().all()
+        
+        for user_id in drifted:
+            # The no-op upsert creates the counter row if missing and locks it. Writers update
+            # the counter after their notification rows, so with the lock held the recount sees
+            # every change already counted, and later ones are added on top of it
+            self.adjust_counters({user_id: (0, 0)}, create=True)
+            unread_count, total_count = self.db.execute(
+                select(unread, func.count()).where(Notification.userid == user_id)
+            ).one()
+            self.db.execute(
+                update(counters)
+                .where(counters.c.userid == user_id)
+                .values(unread_count=unread_count or 0, total_count=total_count)
+            )
+            self.db.commit()
+        
+        metrics.incr("notification_counters.repaired", len(drifted))
+        return len(drifted)
+    
+    def mark_as_read(self, user_id: UUID, notification_id: UUID) -> bool:
+        """Mark one of the user's notifications read; False if it does not exist."""
+        
+        updated = self.db.execute(
+            update(Notification)
+            .where(Notification.nid == notification_id, Notification.userid == user_id, Notification.is_read == False)
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            self.adjust_counters({user_id: (-1, 0)})
+            return True
+        # Already read, or not this user's
+        return self.db.query(Notification.nid).filter(
+            Notification.nid == notification_id,
+            Notification.userid == user_id
+        ).first() is not None
+    
+    def mark_all_as_read(self, user_id: UUID) -> int:
+        """Mark all of the user's notifications read; returns how many were unread."""
+        
+        updated = self.db.execute(
+            update(Notification)
+            .where(Notification.userid == user_id, Notification.is_read == False)
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.adjust_counters({user_id: (-updated, 0)})
+        return updated
+    
+    def mark_many_as_read(
+        self,
+        user_id: UUID,
+        notification_ids: Optional[List[UUID]] = None,
+        before: Optional[datetime] = None
+    ) -> List[UUID]:
+        """Mark the user's unread notifications among notification_ids / up to `before` read, in one UPDATE; returns their ids."""
+        
+        updated = self.db.execute(
+            update(Notification)
+            .where(Notification.userid == user_id, Notification.is_read == False, *self._selector(notification_ids, before))
+            .values(is_read=True)
+            .returning(Notification.nid)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        self.adjust_counters({user_id: (-len(updated), 0)})
+        return updated
+    
+    def delete_many(
+        self,
+        user_id: UUID,
+        notification_ids: Optional[List[UUID]] = None,
+        before: Optional[datetime] = None
+    ) -> List[UUID]:
+        """Delete the user's notifications among notification_ids / up to `before`, in one DELETE; returns their ids."""
+        
+        deleted = self.db.execute(
+            delete(Notification)
+            .where(Notification.userid == user_id, *self._selector(notification_ids, before))
+            .returning(Notification.nid, Notification.is_read)
+            .execution_options(synchronize_session=False)
+        ).all()
+        unread = sum(1 for row in deleted if not row.is_read)
+        self.adjust_counters({user_id: (-unread, -len(deleted))})
+        return [row.nid for row in deleted]
+    
+    @staticmethod
+    def _selector(notification_ids: Optional[List[UUID]], before: Optional[datetime]) -> list:
+        criteria = []
+        if notification_ids is not None:
+            criteria.append(Notification.nid.in_(notification_ids))
+        if before is not None:
+            criteria.append(Notification.created_at <= before)
+        return criteria
+    
+    def delete_notification(self, user_id: UUID, notification_id: UUID) -> bool:
+        """Delete one of the user's notifications; False if it does not exist."""
+        
+        is_read = self.db.execute(
+            delete(Notification)
+            .where(Notification.nid == notification_id, Notification.userid == user_id)
+            .returning(Notification.is_read)
+        ).scalar_one_or_none()
+        if is_read is None:
+            return False
+        self.adjust_counters({user_id: (0 if is_read else -1, -1)})
+        return True
+    
+    def prune_read(self, older_than: timedelta, batch_size: int) -> int:
+        """Delete read notifications older than `older_than`, one batch; returns the number deleted."""
+        
+        cutoff = datetime.utcnow() - older_than
+        nids = select(Notification.nid).where(
+            Notification.is_read == True,
+            Notification.created_at < cutoff
+        ).limit(batch_size)
+        deleted = self.db.execute(
+            delete(Notification)
+            .where(Notification.nid.in_(nids))
+            .returning(Notification.userid)
+        ).scalars().all()
+        self.adjust_counters({user_id: (0, -count) for user_id, count in Counter(deleted).items()})
+        self.db.commit()
+        return len(deleted)
+    
+    # The notify_* methods are the notification pipeline's event handlers
+    # (services/notification_pipeline.py): they add to the current transaction, the caller commits
+    
+    def notify_question_answered(self, question_id: UUID, answerer_id: UUID, answerer_username: str):
         """Notify question author when someone answers their question."""
         
-        question = self.db.query(Question).filter(Question.qid == question_id).first()
-        if question:
-            content = f"{answerer_username} answered your question: '{question.title}'"
-            self.create_notification(
-                user_id=question.userid,
-                content=content,
-                notification_type=NotificationType.ANSWER,
-                related_id=question_id
+        question = self.db.query(Question.userid, Question.title).filter(Question.qid == question_id).first()
+        if question and question.userid != answerer_id:
+            self.add_grouped_notification(
+                question.userid,
+                f"answer:{question_id}",
+                answerer_id,
+                f"{answerer_username} answered your question: '{question.title}'",
+                f" people answered your question: '{question.title}'",
+                NotificationType.ANSWER
             )
     
-    def notify_answer_commented(self, answer_id: UUID, commenter_username: str):
+    def notify_answer_commented(self, answer_id: UUID, commenter_id: UUID, commenter_username: str):
         """Notify answer author when someone comments on their answer."""
         
-        answer = self.db.query(Answer).filter(Answer.aid == answer_id).first()
-        if answer:
-            # Get the question title for better context
-            question = self.db.query(Question).filter(Question.qid == answer.qid).first()
-            question_title = question.title if question else "your answer"
-            
-            content = f"{commenter_username} commented on your answer to: '{question_title}'"
-            self.create_notification(
-                user_id=answer.userid,
-                content=content,
-                notification_type=NotificationType.COMMENT,
-                related_id=answer_id
+        # Answer author and the question title for context, in one query
+        answer = (
+            self.db.query(Answer.userid, Question.title)
+            .outerjoin(Question, Question.qid == Answer.qid)
+            .filter(Answer.aid == answer_id)
+            .first()
+        )
+        if answer and answer.userid != commenter_id:
+            question_title = answer.title if answer.title is not None else "your answer"
+            self.add_grouped_notification(
+                answer.userid,
+                f"comment:{answer_id}",
+                commenter_id,
+                f"{commenter_username} commented on your answer to: '{question_title}'",
+                f" people commented on your answer to: '{question_title}'",
+                NotificationType.COMMENT
             )
     
     def notify_user_mentioned(self, mentioned_user_id: UUID, mentioner_username: str, content_type: str, content_title: str):
         """Notify user when they are mentioned in a question, answer, or comment."""
         
-        content = f"{mentioner_username} mentioned you in a {content_type}: '{content_title}'"
-        self.create_notification(
-            user_id=mentioned_user_id,
-            content=content,
-            notification_type=NotificationType.MENTION,
-            related_id=None
-        )
\ No newline at end of file
+        content = f"{mentioner_username} mentioned you in {_with_article(content_type)}: '{content_title}'"
+        self.add_notification(mentioned_user_id, content, NotificationType.MENTION)
+    
+    def notify_users_mentioned(self, usernames: List[str], question_id: UUID, content_type: str, mentioner_id: UUID, mentioner_username: str):
+        """Notify every existing user mentioned in a post: one lookup, one insert."""
+        
+        question_title = self.db.query(Question.title).filter(Question.qid == question_id).scalar()
+        if question_title is None:
+            return
+        # Served by the unique index on users.username
+        recipients = self.db.query(Users.id).filter(Users.username.in_(usernames), Users.id != mentioner_id).all()
+        content = f"{mentioner_username} mentioned you in {_with_article(content_type)}: '{question_title}'"
+        self.add_notifications([(recipient.id, content, NotificationType.MENTION) for recipient in recipients])
+
+
+@periodic_job("prune-notifications", interval_seconds=3600)
+def prune_notifications(db: Session):
+    """Hourly cleanup of read notifications past NOTIFICATION_RETENTION_DAYS, in batches."""
+    service = NotificationService(db)
+    older_than = timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    batch_size = settings.NOTIFICATION_PRUNE_BATCH_SIZE
+    # Short batches keep each transaction's locks brief
+    while service.prune_read(older_than, batch_size) == batch_size:
+        pass
+
+
+@periodic_job("reconcile-notification-counters", interval_seconds=3600)
+def reconcile_notification_counters(db: Session):
+    """Hourly repair of notification counters that drifted (e.g. rows changed outside the service)."""
+    NotificationService(db).reconcile_counters()
@@ -0,0 +1,106 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.jobs import periodic_job
+from app.metrics import metrics
+from app.models import Question, Answer, Comment
+from uuid import UUID
+from typing import List
+
+
+class PostCountService:
+    """
+    Denormalized post counts: Question.answer_count, Question.accepted_aid and Answer.comment_count.
+
+    Writers adjust them with relative UPDATEs in the transaction that adds or removes the
+    row, so concurrent writers never overwrite each other and a rollback undoes both.
+    The caller commits.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def answer_added(self, qid: UUID):
+        self.db.execute(
+            update(Question).where(Question.qid == qid).values(answer_count=Question.answer_count + 1)
+        )
+
+    def answer_removed(self, qid: UUID, aid: UUID):
+        self.db.execute(
+            update(Question).where(Question.qid == qid).values(answer_count=Question.answer_count - 1)
+        )
+        self.answer_unaccepted(qid, aid)
+
+    def answer_accepted(self, qid: UUID, aid: UUID):
+        self.db.execute(update(Question).where(Question.qid == qid).values(accepted_aid=aid))
+
+    def answer_unaccepted(self, qid: UUID, aid: UUID):
+        """Clear the question's accepted answer if it is `aid`."""
+        self.db.execute(
+            update(Question).where(Question.qid == qid, Question.accepted_aid == aid).values(accepted_aid=None)
+        )
+
+    def comment_added(self, aid: UUID):
+        self.db.execute(
+            update(Answer).where(Answer.aid == aid).values(comment_count=Answer.comment_count + 1)
+        )
+
+    def comment_removed(self, aid: UUID):
+        self.db.execute(
+            update(Answer).where(Answer.aid == aid).values(comment_count=Answer.comment_count - 1)
+        )
+
+    def repair(self, batch_size: int) -> int:
+        """Recount the questions and answers whose counts drifted; returns how many were fixed."""
+        answer_count = (
+            select(func.count()).where(Answer.qid == Question.qid).correlate(Question).scalar_subquery()
+        )
+        accepted_aid = (
+            select(Answer.aid)
+            .where(Answer.qid == Question.qid, Answer.accepted == True)
+            .order_by(Answer.created_at, Answer.aid)
+            .limit(1)
+            .correlate(Question)
+            .scalar_subquery()
+        )
+        drifted_questions = self._drifted(
+            select(Question.qid).where(
+                (Question.answer_count != answer_count)
+                | Question.accepted_aid.is_distinct_from(accepted_aid)
+            )
+        )
+        fixed = self._recount(
+            Question, Question.qid, drifted_questions,
+            {"answer_count": answer_count, "accepted_aid": accepted_aid}, batch_size
+        )
+
+        comment_count = (
+            select(func.count()).where(Comment.aid == Answer.aid).correlate(Answer).scalar_subquery()
+        )
+        drifted_answers = self._drifted(select(Answer.aid).where(Answer.comment_count != comment_count))
+        fixed += self._recount(Answer, Answer.aid, drifted_answers, {"comment_count": comment_count}, batch_size)
+
+        metrics.incr("post_counts.repaired", fixed)
+        return fixed
+
+    def _drifted(self, stmt) -> List[UUID]:
+        ids = self.db.execute(stmt).scalars().all()
+        self.db.rollback()
+        return ids
+
+    def _recount(self, model, key, ids: List[UUID], values: dict, batch_size: int) -> int:
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            # Lock the rows first: writers bump a count after adding their row, so once the
+            # lock is held the recount (a new statement, with a new snapshot) sees every change
+            # already counted, and later ones are applied on top of it
+            self.db.execute(select(key).where(key.in_(batch)).with_for_update()).all()
+            self.db.execute(update(model).where(key.in_(batch)).values(**values))
+            self.db.commit()
+        return len(ids)
+
+
+@periodic_job("repair-post-counts", interval_seconds=settings.POST_COUNT_REPAIR_INTERVAL_SECONDS)
+def repair_post_counts(db: Session):
+    """Periodic repair of answer/comment counts and accepted answers that drifted."""
+    PostCountService(db).repair(settings.POST_COUNT_REPAIR_BATCH_SIZE)
@@ -0,0 +1,136 @@
+import html
+import re
+from collections import defaultdict
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Question, Answer, Comment, Users, Votes
+from app.pagination import encode_cursor
+from app.schemas.question_schemas import QuestionListItem
+from app.serialization import schema_columns
+from uuid import UUID
+from typing import Dict, List, Optional
+
+# Question listings (feeds, search, /question/) select only the QuestionListItem columns,
+# plus the keyset sort keys that are not among them, and serialize the rows as they come.
+# The rich-text desc is never loaded for a listing; cards show the stored excerpt.
+LISTING_FIELDS = tuple(QuestionListItem.model_fields)
+LISTING_COLUMNS = schema_columns(Question, QuestionListItem) + [Question.hot_score]
+
+HIDDEN_ELEMENT_PATTERN = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def make_excerpt(desc: str, length: int = settings.QUESTION_EXCERPT_LENGTH) -> str:
+    """Plain text of a rich-text desc, cut at a word boundary to at most `length` characters."""
+    text = HIDDEN_ELEMENT_PATTERN.sub(" ", desc or "")
+    text = html.unescape(TAG_PATTERN.sub(" ", text))
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    # Prefer a word boundary unless it would throw away most of the excerpt
+    boundary = cut.rfind(" ")
+    if boundary > length // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "\u2026"
+
+
+class QuestionService:
+    """
+    Everything a question page renders, in a fixed number of queries.
+
+    One query each for the question, its answers and the first page of comments of every
+    answer (plus one for the caller's votes), however many answers the question has.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def listing_query(self):
+        """Query of LISTING_COLUMNS rows, ready for the tag/search filters and keyset_page."""
+        return self.db.query(*LISTING_COLUMNS)
+
+    def page(self, qid: UUID, user_id: Optional[UUID], comments_per_answer: int) -> Optional[dict]:
+        """Question, sorted answers and first-page comments; None if the question doesn't exist."""
+        question = self.db.query(Question).filter(Question.qid == qid).first()
+        if question is None:
+            return None
+
+        # Display order, served by ix_answers_qid_display_order
+        answers = (
+            self.db.query(Answer)
+            .filter(Answer.qid == qid)
+            .order_by(Answer.accepted.desc(), Answer.votes.desc(), Answer.created_at, Answer.aid)
+            .all()
+        )
+        aids = [a.aid for a in answers]
+        comments = self._first_comments(aids, comments_per_answer)
+        user_votes = self._user_votes(user_id, qid, aids)
+
+        return {
+            "question": question,
+            "user_vote": user_votes.get((False, qid)),
+            "answers": [
+                {
+                    "answer": a,
+                    "user_vote": user_votes.get((True, a.aid)),
+                    **comments.get(a.aid, {"comments": [], "total_comments": 0, "comments_next_cursor": None})
+                }
+                for a in answers
+            ]
+        }
+
+    def _first_comments(self, aids: List[UUID], limit: int) -> Dict[UUID, dict]:
+        """
+        First `limit` comments (oldest first) of each answer with the author's username.
+
+        A row_number() window per answer keeps this a single query; next cursors match the
+        keyset used by GET /comments/{aid}, so the page can load more from there.
+        """
+        if not aids:
+            return {}
+
+        ranked = (
+            select(
+                Comment.cid,
+                Comment.aid,
+                Comment.userid,
+                Comment.message,
+                Comment.created_at,
+                Users.username,
+                func.row_number().over(partition_by=Comment.aid, order_by=(Comment.created_at, Comment.cid)).label("position"),
+                func.count().over(partition_by=Comment.aid).label("total")
+            )
+            .join(Users, Users.id == Comment.userid)
+            .where(Comment.aid.in_(aids))
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(ranked).where(ranked.c.position <= limit).order_by(ranked.c.aid, ranked.c.position)
+        ).all()
+
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row.aid].append(row)
+
+        result = {}
+        for aid, comment_rows in grouped.items():
+            last = comment_rows[-1]
+            result[aid] = {
+                "comments": comment_rows,
+                "total_comments": last.total,
+                "comments_next_cursor": encode_cursor([last.created_at, last.cid]) if last.total > limit else None
+            }
+        return result
+
+    def _user_votes(self, user_id: Optional[UUID], qid: UUID, aids: List[UUID]) -> Dict[tuple, bool]:
+        """The caller's votes on the question and its answers, keyed by (is_answer, post id)."""
+        if user_id is None:
+            return {}
+        rows = self.db.query(Votes.is_answer, Votes.id, Votes.is_upvote).filter(
+            Votes.userid == user_id,
+            Votes.id.in_([qid, *aids])
+        ).all()
+        return {(row.is_answer, row.id): row.is_upvote for row in rows}
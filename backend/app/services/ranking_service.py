@@ -0,0 +1,48 @@
+import math
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models import Question
+
+# Reddit-style "hot" ranking: every 10x votes is worth HOT_SCORE_TIME_SCALE seconds of recency
+HOT_SCORE_EPOCH = datetime(2025, 1, 1)
+HOT_SCORE_TIME_SCALE = 45000  # 12.5 hours
+
+def hot_score(votes: int, created_at: Optional[datetime]) -> float:
+    """
+    Time-decayed popularity score for the trending feed.
+
+    Newer questions score higher, so the ordering decays without ever rewriting old rows;
+    the score only needs recomputing when a question's votes change. Rows without a
+    created_at rank as if posted at HOT_SCORE_EPOCH.
+    """
+    votes = votes or 0
+    order = math.log10(max(abs(votes), 1))
+    sign = 1 if votes > 0 else -1 if votes < 0 else 0
+    seconds = ((created_at or HOT_SCORE_EPOCH) - HOT_SCORE_EPOCH).total_seconds()
+    return round(sign * order + seconds / HOT_SCORE_TIME_SCALE, 7)
+
+
+class RankingService:
+    """Maintenance for Question.hot_score (vote writes keep it current, see VoteService)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recompute_all(self, batch_size: int = 1000) -> int:
+        """Repair job: recompute every stored hot score in keyset batches."""
+        updated = 0
+        last_qid = None
+        while True:
+            query = self.db.query(Question.qid, Question.votes, Question.created_at).order_by(Question.qid)
+            if last_qid is not None:
+                query = query.filter(Question.qid > last_qid)
+            rows = query.limit(batch_size).all()
+            if not rows:
+                return updated
+            self.db.bulk_update_mappings(Question, [
+                {"qid": row.qid, "hot_score": hot_score(row.votes, row.created_at)} for row in rows
+            ])
+            self.db.commit()
+            updated += len(rows)
+            last_qid = rows[-1].qid
@@ -0,0 +1,269 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Float, cast, false, func, literal_column
+from sqlalchemy.orm import Query, Session
+from app.models import Question
+from app.pagination import decode_cursor, encode_cursor, keyset_filter
+
+# Generated tsvector column maintained by PostgreSQL (see migration a3c9e1f0b7d2)
+SEARCH_VECTOR = literal_column("question.search_vector")
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# Field weights used by the in-process fallback, mirroring setweight A/B/C on PostgreSQL
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "desc": 1.0}
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "with",
+})
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split free text (or HTML from the rich text editor) into lowercase search terms."""
+    if not text:
+        return []
+    text = HTML_TAG_RE.sub(" ", text)
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def build_tsquery(text: str) -> Optional[str]:
+    """
+    Turn user input into a safe to_tsquery() expression.
+
+    All terms must match; the last term is a prefix match so search-as-you-type works.
+    """
+    terms = TOKEN_RE.findall(text.lower())
+    if not terms:
+        return None
+    terms[-1] = f"{terms[-1]}:*"
+    return " & ".join(terms)
+
+
+class InvertedIndex:
+    """
+    In-process BM25 inverted index over questions.
+
+    Used when the database has no full-text search support (SQLite, test runs). It is
+    loaded lazily from the database and kept current by the question write paths.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.loaded = False
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[UUID, float]] = defaultdict(dict)
+        self._doc_terms: Dict[UUID, Dict[str, float]] = {}
+        self._doc_lengths: Dict[UUID, float] = {}
+        self._total_length = 0.0
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+
+    def ensure_loaded(self, db: Session):
+        """Build the index from the question table on first use."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            rows = db.query(Question.qid, Question.title, Question.tags, Question.desc).yield_per(1000)
+            for row in rows:
+                self._add(row.qid, row.title, row.tags, row.desc)
+            self.loaded = True
+
+    def add(self, qid: UUID, title: str, tags: Optional[str], desc: str):
+        """Index (or re-index) a single question."""
+        with self._lock:
+            self._remove(qid)
+            self._add(qid, title, tags, desc)
+
+    def remove(self, qid: UUID):
+        """Drop a question from the index."""
+        with self._lock:
+            self._remove(qid)
+
+    def clear(self):
+        """Forget everything; the next search reloads from the database."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0.0
+            self._vocabulary = []
+            self._vocabulary_dirty = False
+            self.loaded = False
+
+    def search(self, text: str) -> List[Tuple[float, UUID]]:
+        """Return (score, qid) for every question matching all terms, best first."""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        with self._lock:
+            # Last term is a prefix match, like the PostgreSQL path
+            *exact_terms, prefix = terms
+            term_groups = [[t] for t in exact_terms] + [self._expand_prefix(prefix)]
+            if any(not group for group in term_groups):
+                return []
+
+            doc_count = len(self._doc_lengths)
+            avg_length = self._total_length / doc_count if doc_count else 0.0
+            candidates = None
+            for group in term_groups:
+                matched = set()
+                for term in group:
+                    matched.update(self._postings.get(term, {}))
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+
+            scores = []
+            for qid in candidates:
+                score = 0.0
+                for group in term_groups:
+                    score += max(self._bm25(term, qid, doc_count, avg_length) for term in group)
+                scores.append((score, qid))
+        scores.sort(key=lambda item: (item[0], str(item[1])), reverse=True)
+        return scores
+
+    def _bm25(self, term: str, qid: UUID, doc_count: int, avg_length: float) -> float:
+        postings = self._postings.get(term, {})
+        tf = postings.get(qid)
+        if not tf:
+            return 0.0
+        idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        length_norm = 1 - self.b + self.b * (self._doc_lengths[qid] / avg_length if avg_length else 1.0)
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(t for t, postings in self._postings.items() if postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _add(self, qid: UUID, title: str, tags: Optional[str], desc: str):
+        weighted: Dict[str, float] = defaultdict(float)
+        for field, text in (("title", title), ("tags", tags), ("desc", desc)):
+            for term in tokenize(text):
+                weighted[term] += FIELD_WEIGHTS[field]
+        length = sum(weighted.values())
+        for term, tf in weighted.items():
+            self._postings[term][qid] = tf
+        self._doc_terms[qid] = dict(weighted)
+        self._doc_lengths[qid] = length
+        self._total_length += length
+        self._vocabulary_dirty = True
+
+    def _remove(self, qid: UUID):
+        terms = self._doc_terms.pop(qid, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(qid, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(qid, 0.0)
+        self._vocabulary_dirty = True
+
+
+# Shared fallback index for this process
+search_index = InvertedIndex()
+
+
+class SearchService:
+    """
+    Full-text question search.
+
+    PostgreSQL uses the GIN-indexed `question.search_vector` column; other databases use
+    the in-process BM25 `search_index`.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.use_fulltext = db.get_bind().dialect.name == "postgresql"
+
+    def filter(self, query: Query, text: str) -> Query:
+        """Restrict a Question query to rows matching the search text."""
+        if self.use_fulltext:
+            tsquery = build_tsquery(text)
+            if tsquery is None:
+                return query.filter(false())
+            return query.filter(SEARCH_VECTOR.op("@@")(func.to_tsquery("english", tsquery)))
+
+        search_index.ensure_loaded(self.db)
+        qids = [qid for _, qid in search_index.search(text)]
+        return query.filter(Question.qid.in_(qids))
+
+    def ranked_page(
+        self,
+        query: Query,
+        text: str,
+        per_page: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Question], Optional[str]]:
+        """
+        Return one page of matching questions ordered by relevance, plus the cursor for the next page.
+
+        Pages are seeked on (rank, qid) so results stay stable while new questions arrive.
+        `query` may select Question entities or a column projection that includes Question.qid.
+        """
+        after = decode_cursor(cursor, (float, UUID)) if cursor else None
+
+        if self.use_fulltext:
+            tsquery = build_tsquery(text)
+            if tsquery is None:
+                return [], None
+            ts_query = func.to_tsquery("english", tsquery)
+            # Cast to double precision so the rank survives the cursor round-trip exactly
+            rank = cast(func.ts_rank_cd(SEARCH_VECTOR, ts_query), Float(precision=53))
+            ranked = query.add_columns(rank.label("rank")).filter(SEARCH_VECTOR.op("@@")(ts_query))
+            if after:
+                ranked = ranked.filter(keyset_filter([rank, Question.qid], after, [True, True]))
+            rows = ranked.order_by(rank.desc(), Question.qid.desc()).limit(per_page + 1).all()
+            # Entity queries yield (Question, rank); column projections keep the whole row
+            entity_query = len(query.column_descriptions) == 1
+            page = [(row.rank, row[0] if entity_query else row) for row in rows]
+        else:
+            search_index.ensure_loaded(self.db)
+            hits = search_index.search(text)
+            if after:
+                after_key = (after[0], str(after[1]))
+                hits = [h for h in hits if (h[0], str(h[1])) < after_key]
+            # Apply the caller's other filters (tags, username, ...) to the candidates
+            allowed = {
+                row.qid for row in query.with_entities(Question.qid).filter(
+                    Question.qid.in_([qid for _, qid in hits])
+                )
+            }
+            hits = [h for h in hits if h[1] in allowed][:per_page + 1]
+            by_id = {q.qid: q for q in query.filter(Question.qid.in_([qid for _, qid in hits]))}
+            page = [(score, by_id[qid]) for score, qid in hits]
+
+        next_cursor = None
+        if len(page) > per_page:
+            page = page[:per_page]
+            last_rank, last_question = page[-1]
+            next_cursor = encode_cursor([last_rank, last_question.qid])
+        return [question for _, question in page], next_cursor
+
+    def index(self, question: Question):
+        """Keep the fallback index in sync after a question is created or updated."""
+        if not self.use_fulltext and search_index.loaded:
+            search_index.add(question.qid, question.title, question.tags, question.desc)
+
+    def remove(self, qid: UUID):
+        """Keep the fallback index in sync after a question is deleted."""
+        if not self.use_fulltext and search_index.loaded:
+            search_index.remove(qid)
@@ -0,0 +1,151 @@
+from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.orm import Query, Session
+from datetime import datetime, timedelta
+from app.database import dialect_insert
+from app.jobs import periodic_job
+from app.models import Question, Tag, TagActivity, ques_tag
+from typing import List, Optional, Tuple
+
+MAX_TAG_LENGTH = 50
+
+# Trending tags are counted over questions created in this window
+TRENDING_WINDOW = timedelta(days=7)
+
+def hour_bucket(moment: datetime) -> datetime:
+    """Start of the hourly tag_activity bucket containing `moment`."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def parse_tags(raw: Optional[str]) -> List[str]:
+    """Split a comma-separated tag string into normalized, de-duplicated tag names (order kept)."""
+    if not raw:
+        return []
+    names = []
+    for part in raw.split(","):
+        name = part.strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class TagService:
+    """Maintains the normalized tag tables (`tags`, `ques_tag`), which are the source of truth for tags."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def set_question_tags(self, question: Question, raw: Optional[str]) -> List[str]:
+        """
+        Replace a question's tags and keep usage counts in step.
+
+        Runs inside the caller's transaction; the caller commits.
+        """
+        names = parse_tags(raw)
+        if question in self.db.new:
+            self.db.flush()  # the question row must exist before ques_tag can reference it
+
+        current = set(self.db.execute(
+            select(ques_tag.c.tag).where(ques_tag.c.qid == question.qid)
+        ).scalars())
+        added = [name for name in names if name not in current]
+        removed = [name for name in current if name not in names]
+
+        if added:
+            self.db.execute(
+                dialect_insert(self.db, Tag.__table__)
+                .values([{"name": name, "usage_count": 0} for name in added])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            self.db.execute(
+                ques_tag.insert().values([{"qid": question.qid, "tag": name} for name in added])
+            )
+            self._adjust_usage(added, 1)
+            self._adjust_activity(question, added, 1)
+
+        if removed:
+            self.db.execute(
+                delete(ques_tag).where(ques_tag.c.qid == question.qid, ques_tag.c.tag.in_(removed))
+            )
+            self._adjust_usage(removed, -1)
+            self._adjust_activity(question, removed, -1)
+
+        # Keep the display copy in the canonical form
+        question.tags = ",".join(names) if names else None
+        return names
+
+    def release_question_tags(self, question: Question):
+        """Decrement usage counts for a question that is about to be deleted."""
+        names = list(self.db.execute(
+            select(ques_tag.c.tag).where(ques_tag.c.qid == question.qid)
+        ).scalars())
+        if names:
+            self._adjust_usage(names, -1)
+            self._adjust_activity(question, names, -1)
+        return names
+
+    def trending_tags(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Top tags by number of questions created within TRENDING_WINDOW, from the hourly buckets.
+
+        The bucket holding the window's start is partly older than the window, so it is left out:
+        the counts cover the current hour and the full hours after that bucket, which is at most
+        TRENDING_WINDOW and at least one hour less.
+        """
+        window_start = hour_bucket(datetime.utcnow() - TRENDING_WINDOW) + timedelta(hours=1)
+        total = func.sum(TagActivity.question_count).label("total")
+        rows = self.db.query(TagActivity.tag, total).filter(
+            TagActivity.bucket_start >= window_start
+        ).group_by(TagActivity.tag).having(total > 0).order_by(
+            desc(total), TagActivity.tag
+        ).limit(limit).all()
+        return [(row.tag, row.total) for row in rows]
+
+    def prune_activity(self) -> int:
+        """Delete hourly buckets that have aged out of the trending window."""
+        window_start = hour_bucket(datetime.utcnow() - TRENDING_WINDOW)
+        deleted = self.db.query(TagActivity).filter(
+            TagActivity.bucket_start < window_start
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    def filter_questions(self, query: Query, raw: str, match_all: bool = True) -> Query:
+        """
+        Restrict a Question query to the given tags through the (tag, qid) index.
+
+        match_all=True requires every tag (AND); otherwise any tag matches (OR).
+        """
+        names = parse_tags(raw)
+        if not names:
+            return query
+
+        tagged = select(ques_tag.c.qid).where(ques_tag.c.tag.in_(names))
+        if match_all and len(names) > 1:
+            tagged = tagged.group_by(ques_tag.c.qid).having(func.count() == len(names))
+        return query.filter(Question.qid.in_(tagged))
+
+    def _adjust_activity(self, question: Question, names: List[str], delta: int):
+        # Buckets are keyed by creation time, so edits and deletes land in the original bucket
+        bucket = hour_bucket(question.created_at or datetime.utcnow())
+        if bucket < hour_bucket(datetime.utcnow() - TRENDING_WINDOW):
+            return  # already pruned
+        stmt = dialect_insert(self.db, TagActivity.__table__).values([
+            {"bucket_start": bucket, "tag": name, "question_count": delta} for name in names
+        ])
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=["bucket_start", "tag"],
+            set_={"question_count": TagActivity.__table__.c.question_count + stmt.excluded.question_count}
+        ))
+
+    def _adjust_usage(self, names: List[str], delta: int):
+        self.db.execute(
+            update(Tag)
+            .where(Tag.name.in_(names))
+            .values(usage_count=Tag.usage_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@periodic_job("prune-tag-activity", interval_seconds=3600)
+def prune_tag_activity(db: Session):
+    """Hourly cleanup of expired trending-tag buckets."""
+    TagService(db).prune_activity()
@@ -0,0 +1,176 @@
+import logging
+import threading
+from collections import defaultdict
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import metrics
+from app.models import Question, Answer
+from app.services.ranking_service import hot_score
+from uuid import UUID
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding counter deltas that are only handed to the buffer on commit
+SESSION_DELTAS_KEY = "vote_buffer_deltas"
+
+PostKey = Tuple[bool, UUID]  # (is_answer, post id)
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for the Question / Answer vote counters (votes, upvotes, downvotes).
+
+    Viral posts otherwise serialize every voter on the post's row lock. Here each committed
+    vote only adds its delta to an in-memory map; a background thread folds all deltas for
+    a post into one UPDATE per flush.
+    """
+
+    def __init__(self, flush_interval_ms: int, max_pending: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: Dict[PostKey, List[int]] = defaultdict(lambda: [0, 0])  # [upvotes, downvotes]
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        metrics.gauge("vote_buffer.pending_posts", lambda: len(self._pending))
+        metrics.gauge("vote_buffer.coalescing_ratio", self.coalescing_ratio)
+
+    def add(self, is_answer: bool, post_id: UUID, up: int, down: int):
+        """Queue a committed vote's counter deltas."""
+        with self._lock:
+            counts = self._pending[(is_answer, post_id)]
+            counts[0] += up
+            counts[1] += down
+            pending = len(self._pending)
+        metrics.incr("vote_buffer.deltas_received")
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def pending_delta(self, is_answer: bool, post_id: UUID) -> Tuple[int, int]:
+        """(upvotes, downvotes) not yet written to the post row (used to report an up-to-date total)."""
+        with self._lock:
+            up, down = self._pending.get((is_answer, post_id), (0, 0))
+            return up, down
+
+    def coalescing_ratio(self) -> float:
+        """Votes received per row UPDATE issued; higher means more contention absorbed."""
+        rows = metrics.get("vote_buffer.rows_flushed")
+        return metrics.get("vote_buffer.deltas_received") / rows if rows else 0.0
+
+    def flush(self, db: Session) -> int:
+        """Write all pending deltas in batched UPDATEs; returns the number of rows updated."""
+        with self._lock:
+            batch = {key: counts for key, counts in self._pending.items() if any(counts)}
+            self._pending = defaultdict(lambda: [0, 0])
+        if not batch:
+            return 0
+
+        try:
+            answer_deltas = [{"b_id": post_id, "b_up": up, "b_down": down} for (is_answer, post_id), (up, down) in batch.items() if is_answer]
+            question_deltas = [{"b_id": post_id, "b_up": up, "b_down": down} for (is_answer, post_id), (up, down) in batch.items() if not is_answer]
+            if answer_deltas:
+                table = Answer.__table__
+                db.execute(
+                    update(table)
+                    .where(table.c.aid == bindparam("b_id"))
+                    .values(**self._counter_values(table)),
+                    answer_deltas
+                )
+            if question_deltas:
+                table = Question.__table__
+                db.execute(
+                    update(table)
+                    .where(table.c.qid == bindparam("b_id"))
+                    .values(**self._counter_values(table)),
+                    question_deltas
+                )
+                rows = db.execute(
+                    select(table.c.qid, table.c.votes, table.c.created_at)
+                    .where(table.c.qid.in_([d["b_id"] for d in question_deltas]))
+                ).all()
+                if rows:
+                    db.execute(
+                        update(table)
+                        .where(table.c.qid == bindparam("b_id"))
+                        .values(hot_score=bindparam("b_hot_score")),
+                        [{"b_id": row.qid, "b_hot_score": hot_score(row.votes, row.created_at)} for row in rows]
+                    )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for key, (up, down) in batch.items():
+                    counts = self._pending[key]
+                    counts[0] += up
+                    counts[1] += down
+            metrics.incr("vote_buffer.flush_errors")
+            raise
+
+        metrics.incr("vote_buffer.flushes")
+        metrics.incr("vote_buffer.rows_flushed", len(batch))
+        return len(batch)
+
+    @staticmethod
+    def _counter_values(table):
+        return {
+            "votes": table.c.votes + bindparam("b_up") - bindparam("b_down"),
+            "upvotes": table.c.upvotes + bindparam("b_up"),
+            "downvotes": table.c.downvotes + bindparam("b_down"),
+        }
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="vote-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still pending."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self._flush_once()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush_once()
+
+    def _flush_once(self):
+        db = SessionLocal()
+        try:
+            self.flush(db)
+        except Exception:
+            logger.exception("Vote buffer flush failed; deltas kept for retry")
+        finally:
+            db.close()
+
+
+vote_buffer = VoteBuffer(settings.VOTE_BUFFER_FLUSH_MS, settings.VOTE_BUFFER_MAX_PENDING)
+
+
+def defer_delta(db: Session, is_answer: bool, post_id: UUID, up: int, down: int):
+    """Hold counter deltas on the session until its transaction commits."""
+    db.info.setdefault(SESSION_DELTAS_KEY, []).append((is_answer, post_id, up, down))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _release_deltas(session: Session):
+    deltas: List = session.info.pop(SESSION_DELTAS_KEY, [])
+    for is_answer, post_id, up, down in deltas:
+        vote_buffer.add(is_answer, post_id, up, down)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_deltas(session: Session):
+    session.info.pop(SESSION_DELTAS_KEY, None)
@@ -0,0 +1,155 @@
+import uuid
+from sqlalchemy import and_, delete, false, null, select, true, union_all, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import dialect_insert
+from app.models import Question, Answer, Votes
+from app.services.ranking_service import hot_score
+from app.services.vote_buffer import defer_delta, vote_buffer
+from uuid import UUID
+from typing import Optional, Tuple
+
+def count_deltas(is_upvote: bool, sign: int = 1) -> Tuple[int, int]:
+    """(upvotes, downvotes) change for adding (sign=1) or removing (sign=-1) one vote."""
+    return (sign, 0) if is_upvote else (0, sign)
+
+
+class VoteService:
+    """
+    Race-free voting.
+
+    The Votes row is written with an idempotent upsert on (userid, id, is_answer), and the
+    post counters (votes, upvotes, downvotes) move with server-side `col = col + :delta`,
+    so concurrent votes never lose updates and double-clicks never create duplicate rows. The caller commits.
+
+    With VOTE_BUFFER_ENABLED the counter delta is handed to the write-behind vote_buffer
+    on commit instead of updating the post row in the request.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def cast(self, user_id: UUID, post_id: UUID, is_answer: bool, is_upvote: bool) -> Tuple[bool, Optional[int]]:
+        """
+        Record (or flip) a user's vote on a post.
+
+        Returns (changed, total_votes); changed is False when the same vote already existed,
+        in which case total_votes is None.
+        """
+        # New vote: insert, or do nothing if the user already voted on this post
+        inserted = self.db.execute(
+            dialect_insert(self.db, Votes.__table__)
+            .values(vid=uuid.uuid4(), userid=user_id, id=post_id, is_answer=is_answer, is_upvote=is_upvote)
+            .on_conflict_do_nothing(index_elements=["userid", "id", "is_answer"])
+            .returning(Votes.vid)
+        ).first()
+        if inserted:
+            return True, self._apply_delta(post_id, is_answer, *count_deltas(is_upvote))
+
+        # Existing vote: flip it only if the direction differs (-1 -> +1 or +1 -> -1)
+        flipped = self.db.execute(
+            update(Votes)
+            .where(
+                Votes.userid == user_id,
+                Votes.id == post_id,
+                Votes.is_answer == is_answer,
+                Votes.is_upvote != is_upvote
+            )
+            .values(is_upvote=is_upvote)
+            .returning(Votes.vid)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if flipped:
+            up, down = count_deltas(is_upvote)
+            return True, self._apply_delta(post_id, is_answer, up - down, down - up)
+
+        return False, None
+
+    def retract(self, user_id: UUID, post_id: UUID, is_answer: bool) -> Optional[int]:
+        """Remove a user's vote; returns the new total, or None if there was no vote."""
+        removed = self.db.execute(
+            delete(Votes)
+            .where(Votes.userid == user_id, Votes.id == post_id, Votes.is_answer == is_answer)
+            .returning(Votes.is_upvote)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if removed is None:
+            return None
+        return self._apply_delta(post_id, is_answer, *count_deltas(removed.is_upvote, -1))
+
+    def question_stats(self, qid: UUID, user_id: Optional[UUID]) -> Optional[dict]:
+        """
+        Vote stats for a question and all of its answers in one query.
+
+        Counts come from the denormalized post columns; the caller's vote is a LEFT JOIN on
+        votes (unique on userid, id, is_answer). Returns None if the question doesn't exist.
+        """
+        posts = union_all(
+            select(Question.qid.label("id"), false().label("is_answer"), Question.votes, Question.upvotes, Question.downvotes)
+            .where(Question.qid == qid),
+            select(Answer.aid.label("id"), true().label("is_answer"), Answer.votes, Answer.upvotes, Answer.downvotes)
+            .where(Answer.qid == qid)
+        ).subquery()
+
+        if user_id is None:
+            query = select(posts, null().label("user_vote"))
+        else:
+            query = select(posts, Votes.is_upvote.label("user_vote")).outerjoin(
+                Votes,
+                and_(Votes.userid == user_id, Votes.id == posts.c.id, Votes.is_answer == posts.c.is_answer)
+            )
+
+        question, answers = None, []
+        for row in self.db.execute(query):
+            stats = {
+                "item_id": row.id,
+                "total_votes": row.votes or 0,
+                "upvotes": row.upvotes,
+                "downvotes": row.downvotes,
+                "user_vote": row.user_vote
+            }
+            if row.is_answer:
+                answers.append(stats)
+            else:
+                question = stats
+        if question is None:
+            return None
+        return {"question": question, "answers": answers}
+
+    def _apply_delta(self, post_id: UUID, is_answer: bool, up: int, down: int) -> int:
+        """Move the post's up/down counters (and votes = upvotes - downvotes); returns the new votes."""
+        if settings.VOTE_BUFFER_ENABLED:
+            return self._buffer_delta(post_id, is_answer, up, down)
+
+        if is_answer:
+            return self.db.execute(
+                update(Answer)
+                .where(Answer.aid == post_id)
+                .values(votes=Answer.votes + (up - down), upvotes=Answer.upvotes + up, downvotes=Answer.downvotes + down)
+                .returning(Answer.votes)
+                .execution_options(synchronize_session=False)
+            ).scalar_one()
+
+        row = self.db.execute(
+            update(Question)
+            .where(Question.qid == post_id)
+            .values(votes=Question.votes + (up - down), upvotes=Question.upvotes + up, downvotes=Question.downvotes + down)
+            .returning(Question.votes, Question.created_at)
+            .execution_options(synchronize_session=False)
+        ).one()
+        # The row stays locked until commit, so the hot score matches these votes
+        self.db.execute(
+            update(Question)
+            .where(Question.qid == post_id)
+            .values(hot_score=hot_score(row.votes, row.created_at))
+            .execution_options(synchronize_session=False)
+        )
+        return row.votes
+
+    def _buffer_delta(self, post_id: UUID, is_answer: bool, up: int, down: int) -> int:
+        defer_delta(self.db, is_answer, post_id, up, down)
+        # Report the total the post will have once pending deltas are flushed
+        column, key = (Answer.votes, Answer.aid) if is_answer else (Question.votes, Question.qid)
+        persisted = self.db.execute(select(column).where(key == post_id)).scalar_one()
+        pending_up, pending_down = vote_buffer.pending_delta(is_answer, post_id)
+        return persisted + (pending_up - pending_down) + (up - down)
@@ -0,0 +1,178 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, or_, select
+from sqlalchemy.orm import Session
+from app.cache import MemoryCache
+from app.config import settings
+from app.database import SessionLocal
+from app.jobs import periodic_job
+from app.metrics import metrics
+from app.models import TokenFamily
+from uuid import UUID
+from typing import List, Optional
+
+# Session.info key holding family ids added to the filter once their revocation commits
+SESSION_REVOKED_KEY = "token_revocations_revoked"
+
+
+class BloomFilter:
+    """Fixed-size bit array answering "maybe present" / "definitely absent" for string keys."""
+
+    def __init__(self, size_bits: int, hashes: int):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocations:
+    """
+    Revoked token families, as seen by access token validation.
+
+    An access token outlives its family's revocation by at most ACCESS_TOKEN_EXPIRE_MINUTES,
+    so the filter only holds families revoked within that window. Checking a token is a
+    bloom filter lookup; only a "maybe" (a revoked token, or a rare false positive) reads
+    the table. Revocations made by other workers arrive with the periodic sync.
+    """
+
+    def __init__(self, size_bits: int, hashes: int):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._synced_until: Optional[datetime] = None
+        self._confirmed = MemoryCache(10000)  # family id -> revoked?, for filter hits
+        self._entries = 0
+
+        metrics.gauge("token_revocations.filter_entries", lambda: self._entries)
+
+    @staticmethod
+    def window_start() -> datetime:
+        return datetime.utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    def is_revoked(self, family_id: str) -> bool:
+        if self._filter is None:
+            with SessionLocal() as db:
+                self.rebuild(db)
+        if not self._filter.might_contain(family_id):
+            return False
+
+        revoked = self._confirmed.get(family_id)
+        if revoked is None:
+            metrics.incr("token_revocations.lookups")
+            with SessionLocal() as db:
+                revoked = db.execute(
+                    select(TokenFamily.revoked_at).where(TokenFamily.family_id == UUID(family_id))
+                ).scalar() is not None
+            self._confirmed.set(family_id, revoked, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        return revoked
+
+    def add(self, family_id: str):
+        """Record a committed revocation (the filter may say "maybe" early, never late)."""
+        # Drop a cached "not revoked" answer even if the filter already said "maybe"
+        self._confirmed.delete(family_id)
+        if self._filter is not None and not self._filter.might_contain(family_id):
+            self._filter.add(family_id)
+            self._entries += 1
+
+    def rebuild(self, db: Session):
+        """Reload the filter from the table, dropping revocations no live access token can carry."""
+        window_start = self.window_start()
+        rows = db.execute(
+            select(TokenFamily.family_id, TokenFamily.revoked_at)
+            .where(TokenFamily.revoked_at >= window_start)
+        ).all()
+        bloom = BloomFilter(self.size_bits, self.hashes)
+        for row in rows:
+            bloom.add(str(row.family_id))
+        with self._lock:
+            self._filter = bloom
+            self._entries = len(rows)
+            self._synced_until = max((row.revoked_at for row in rows), default=window_start)
+
+    def sync(self, db: Session):
+        """
+        Add families revoked (by any worker) since the last sync.
+
+        revoked_at is stamped before its transaction commits, so a revocation can become
+        visible after a later-stamped one; re-scanning an overlap window behind the newest
+        revocation seen catches those (re-adding a family is a no-op).
+        """
+        if self._filter is None:
+            return self.rebuild(db)
+        since = self._synced_until - timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+        rows = db.execute(
+            select(TokenFamily.family_id, TokenFamily.revoked_at)
+            .where(TokenFamily.revoked_at >= since)
+        ).all()
+        for row in rows:
+            self.add(str(row.family_id))
+        with self._lock:
+            self._synced_until = max((row.revoked_at for row in rows), default=self._synced_until)
+
+
+token_revocations = TokenRevocations(settings.TOKEN_REVOCATION_FILTER_BITS, settings.TOKEN_REVOCATION_FILTER_HASHES)
+
+
+def revoke_family(db: Session, family: TokenFamily):
+    """Revoke every refresh and access token of a login (the caller commits)."""
+    if family.revoked_at is None:
+        family.revoked_at = datetime.utcnow()
+        # This worker's filter learns of it on commit; others on their next sync
+        db.info.setdefault(SESSION_REVOKED_KEY, []).append(str(family.family_id))
+        metrics.incr("token_revocations.revoked")
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _add_revoked(session: Session):
+    family_ids: List[str] = session.info.pop(SESSION_REVOKED_KEY, [])
+    for family_id in family_ids:
+        token_revocations.add(family_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_revoked(session: Session):
+    session.info.pop(SESSION_REVOKED_KEY, None)
+
+
+def revoke_user_families(db: Session, user_id: UUID):
+    """Revoke every login of a user, e.g. before deleting them (the caller commits)."""
+    families = db.query(TokenFamily).filter(
+        TokenFamily.userid == user_id,
+        TokenFamily.revoked_at.is_(None)
+    ).all()
+    for family in families:
+        revoke_family(db, family)
+
+
+@periodic_job("sync-token-revocations", interval_seconds=settings.TOKEN_REVOCATION_SYNC_SECONDS)
+def sync_token_revocations(db: Session):
+    """Pick up revocations made by other workers."""
+    token_revocations.sync(db)
+
+
+@periodic_job("prune-token-families", interval_seconds=3600)
+def prune_token_families(db: Session):
+    """Hourly cleanup of expired families, and a filter rebuild that forgets stale revocations."""
+    now = datetime.utcnow()
+    db.execute(
+        delete(TokenFamily).where(
+            TokenFamily.expires_at < now,
+            or_(TokenFamily.revoked_at.is_(None), TokenFamily.revoked_at < token_revocations.window_start())
+        )
+    )
+    db.commit()
+    token_revocations.rebuild(db)
@@ -0,0 +1,34 @@
+"""Notification actors
+
+Revision ID: a2e7c4f9d318
+Revises: f3d6a2b8c951
+Create Date: 2026-10-19 11:03:27.915240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2e7c4f9d318'
+down_revision: Union[str, Sequence[str], None] = 'f3d6a2b8c951'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing grouped rows start without actors: their next actor is counted as new
+    op.create_table('notification_actors',
+    sa.Column('nid', sa.UUID(), nullable=False),
+    sa.Column('actor_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['nid'], ['notifications.nid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('nid', 'actor_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_actors')
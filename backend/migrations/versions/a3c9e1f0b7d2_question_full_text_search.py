@@ -0,0 +1,53 @@
+"""Question full-text search
+
+Revision ID: a3c9e1f0b7d2
+Revises: f1693a48bfc2
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f0b7d2'
+down_revision: Union[str, Sequence[str], None] = 'f1693a48bfc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Full-text search is PostgreSQL only; other databases use the in-process index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Weighted document: title (A) > tags (B) > description with HTML stripped (C)
+    op.execute(
+        """
+        ALTER TABLE question ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+            setweight(to_tsvector('english', regexp_replace(coalesce("desc", ''), '<[^>]+>', ' ', 'g')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index(
+        'ix_question_search_vector',
+        'question',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index('ix_question_search_vector', table_name='question')
+    op.drop_column('question', 'search_vector')
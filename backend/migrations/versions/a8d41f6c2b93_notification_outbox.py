@@ -0,0 +1,49 @@
+"""Notification outbox
+
+Revision ID: a8d41f6c2b93
+Revises: f5c3d8a1e276
+Create Date: 2026-10-18 17:02:31.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d41f6c2b93'
+down_revision: Union[str, Sequence[str], None] = 'f5c3d8a1e276'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_notification_outbox_pending',
+        'notification_outbox',
+        ['available_at', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+        sqlite_where=sa.text('processed_at IS NULL')
+    )
+    op.create_index('ix_notification_outbox_processed_at', 'notification_outbox', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notification_outbox_processed_at', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_pending', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
@@ -0,0 +1,73 @@
+"""Grouped notifications and per-user notification counters
+
+Revision ID: b3e96c0d5a17
+Revises: a8d41f6c2b93
+Create Date: 2026-10-18 18:21:47.093552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e96c0d5a17'
+down_revision: Union[str, Sequence[str], None] = 'a8d41f6c2b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+notifications = sa.table(
+    'notifications',
+    sa.column('userid', sa.UUID()),
+    sa.column('is_read', sa.Boolean()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('group_key', sa.String(), nullable=True))
+    op.add_column('notifications', sa.Column('actor_count', sa.Integer(), nullable=False, server_default='1'))
+    op.create_index(
+        'ix_notifications_userid_group_key_unread',
+        'notifications',
+        ['userid', 'group_key'],
+        unique=True,
+        postgresql_where=sa.text('is_read = false AND group_key IS NOT NULL'),
+        sqlite_where=sa.text('is_read = false AND group_key IS NOT NULL')
+    )
+    op.create_index(
+        'ix_notifications_read_created_at',
+        'notifications',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_read = true'),
+        sqlite_where=sa.text('is_read = true')
+    )
+
+    notification_counters = op.create_table('notification_counters',
+    sa.Column('userid', sa.UUID(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('total_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['userid'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('userid')
+    )
+
+    # Seed the counters from the existing notifications
+    unread = sa.func.sum(sa.case((notifications.c.is_read == sa.false(), 1), else_=0))
+    op.execute(
+        notification_counters.insert().from_select(
+            ['userid', 'unread_count', 'total_count'],
+            sa.select(notifications.c.userid, unread, sa.func.count())
+            .group_by(notifications.c.userid)
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_counters')
+    op.drop_index('ix_notifications_read_created_at', table_name='notifications')
+    op.drop_index('ix_notifications_userid_group_key_unread', table_name='notifications')
+    op.drop_column('notifications', 'actor_count')
+    op.drop_column('notifications', 'group_key')
@@ -0,0 +1,130 @@
+"""Normalized question tags
+
+Revision ID: b7e2d4c91a05
+Revises: a3c9e1f0b7d2
+Create Date: 2026-10-18 10:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c91a05'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f0b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+MAX_TAG_LENGTH = 50
+
+question = sa.table(
+    'question',
+    sa.column('qid', sa.UUID()),
+    sa.column('tags', sa.Text()),
+)
+ques_tag = sa.table(
+    'ques_tag',
+    sa.column('qid', sa.UUID()),
+    sa.column('tag', sa.String()),
+)
+tags = sa.table(
+    'tags',
+    sa.column('name', sa.String()),
+    sa.column('usage_count', sa.Integer()),
+)
+
+
+def _parse_tags(raw):
+    # Frozen copy of app.services.tag_service.parse_tags
+    names = []
+    for part in (raw or "").split(","):
+        name = part.strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _backfill(connection) -> None:
+    """Copy comma-separated question.tags into ques_tag/tags, one keyset batch at a time."""
+    known_tags = set(connection.execute(sa.select(tags.c.name)).scalars())
+    last_qid = None
+    while True:
+        batch = sa.select(question.c.qid, question.c.tags).order_by(question.c.qid).limit(BATCH_SIZE)
+        if last_qid is not None:
+            batch = batch.where(question.c.qid > last_qid)
+        rows = connection.execute(batch).all()
+        if not rows:
+            break
+        last_qid = rows[-1].qid
+
+        existing = set(connection.execute(
+            sa.select(ques_tag.c.qid, ques_tag.c.tag).where(ques_tag.c.qid.in_([row.qid for row in rows]))
+        ).tuples())
+        links = []
+        new_tags = []
+        canonical_tags = []
+        for row in rows:
+            names = _parse_tags(row.tags)
+            for name in names:
+                if name not in known_tags:
+                    known_tags.add(name)
+                    new_tags.append({'name': name, 'usage_count': 0})
+                if (row.qid, name) not in existing:
+                    links.append({'qid': row.qid, 'tag': name})
+            # Store the display copy in canonical form
+            canonical = ",".join(names) if names else None
+            if canonical != row.tags:
+                canonical_tags.append({'b_qid': row.qid, 'b_tags': canonical})
+
+        if new_tags:
+            connection.execute(tags.insert(), new_tags)
+        if links:
+            connection.execute(ques_tag.insert(), links)
+        if canonical_tags:
+            connection.execute(
+                question.update()
+                .where(question.c.qid == sa.bindparam('b_qid'))
+                .values(tags=sa.bindparam('b_tags')),
+                canonical_tags
+            )
+
+    # Any pre-existing ques_tag rows must also have a tags row before the foreign key is added
+    orphan_tags = connection.execute(
+        sa.select(ques_tag.c.tag).distinct().where(ques_tag.c.tag.not_in(sa.select(tags.c.name)))
+    ).scalars().all()
+    if orphan_tags:
+        connection.execute(tags.insert(), [{'name': name, 'usage_count': 0} for name in orphan_tags])
+
+    connection.execute(
+        tags.update().values(
+            usage_count=sa.select(sa.func.count())
+            .where(ques_tag.c.tag == tags.c.name)
+            .scalar_subquery()
+        )
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tags',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('usage_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    _backfill(op.get_bind())
+
+    with op.batch_alter_table('ques_tag') as batch_op:
+        batch_op.create_foreign_key('ques_tag_tag_fkey', 'tags', ['tag'], ['name'])
+    op.create_index('ix_ques_tag_tag_qid', 'ques_tag', ['tag', 'qid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ques_tag_tag_qid', table_name='ques_tag')
+    with op.batch_alter_table('ques_tag') as batch_op:
+        batch_op.drop_constraint('ques_tag_tag_fkey', type_='foreignkey')
+    op.drop_table('tags')
@@ -0,0 +1,63 @@
+"""Keyset sort columns not null
+
+Revision ID: b9d4e2a7c6f1
+Revises: a2e7c4f9d318
+Create Date: 2026-10-20 09:14:05.603118
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e2a7c6f1'
+down_revision: Union[str, Sequence[str], None] = 'a2e7c4f9d318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows without a creation time sort as the oldest; the hot score already ranks them from this epoch
+MISSING_CREATED_AT = datetime(2025, 1, 1)
+
+# Columns app/pagination.py seeks on: a NULL key makes the "col < :last" cursor skip rows
+KEYSET_COLUMNS = {
+    'question': {'created_at': sa.DateTime(), 'votes': sa.Integer()},
+    'answers': {'created_at': sa.DateTime(), 'votes': sa.Integer(), 'accepted': sa.Boolean()},
+    'comments': {'created_at': sa.DateTime()},
+    'users': {'created_at': sa.DateTime()},
+    'notifications': {'created_at': sa.DateTime()},
+}
+
+
+def _fill_value(table, name: str):
+    if name == 'created_at':
+        return MISSING_CREATED_AT
+    if name == 'votes':
+        return table.c.upvotes - table.c.downvotes  # votes == upvotes - downvotes
+    return sa.false()  # accepted
+
+
+def _backfill(table_name: str, columns: dict) -> None:
+    counts = (sa.column('upvotes', sa.Integer()), sa.column('downvotes', sa.Integer())) if 'votes' in columns else ()
+    table = sa.table(table_name, *(sa.column(name, column_type) for name, column_type in columns.items()), *counts)
+    for name in columns:
+        op.execute(table.update().where(table.c[name].is_(None)).values({name: _fill_value(table, name)}))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, columns in KEYSET_COLUMNS.items():
+        _backfill(table_name, columns)
+        with op.batch_alter_table(table_name) as batch_op:
+            for name, column_type in columns.items():
+                batch_op.alter_column(name, existing_type=column_type, nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, columns in KEYSET_COLUMNS.items():
+        with op.batch_alter_table(table_name) as batch_op:
+            for name, column_type in columns.items():
+                batch_op.alter_column(name, existing_type=column_type, nullable=True)
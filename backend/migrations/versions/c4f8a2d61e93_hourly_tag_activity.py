@@ -0,0 +1,64 @@
+"""Hourly tag activity buckets
+
+Revision ID: c4f8a2d61e93
+Revises: b7e2d4c91a05
+Create Date: 2026-10-18 11:26:05.309417
+
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a2d61e93'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c91a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRENDING_WINDOW = timedelta(days=7)
+
+question = sa.table(
+    'question',
+    sa.column('qid', sa.UUID()),
+    sa.column('created_at', sa.DateTime()),
+)
+ques_tag = sa.table(
+    'ques_tag',
+    sa.column('qid', sa.UUID()),
+    sa.column('tag', sa.String()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tag_activity = op.create_table('tag_activity',
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('bucket_start', 'tag')
+    )
+
+    # Seed the buckets for the current trending window; older activity is never read
+    window_start = (datetime.utcnow() - TRENDING_WINDOW).replace(minute=0, second=0, microsecond=0)
+    rows = op.get_bind().execute(
+        sa.select(ques_tag.c.tag, question.c.created_at)
+        .join(question, question.c.qid == ques_tag.c.qid)
+        .where(question.c.created_at >= window_start)
+    )
+    counts = Counter(
+        (row.created_at.replace(minute=0, second=0, microsecond=0), row.tag) for row in rows
+    )
+    if counts:
+        op.bulk_insert(tag_activity, [
+            {'bucket_start': bucket, 'tag': tag, 'question_count': count}
+            for (bucket, tag), count in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_activity')
@@ -0,0 +1,50 @@
+"""Refresh token families
+
+Revision ID: c7f2a9e4d810
+Revises: b3e96c0d5a17
+Create Date: 2026-10-18 20:04:12.731905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f2a9e4d810'
+down_revision: Union[str, Sequence[str], None] = 'b3e96c0d5a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('token_families',
+    sa.Column('family_id', sa.UUID(), nullable=False),
+    sa.Column('userid', sa.UUID(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['userid'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('family_id')
+    )
+    op.create_index('ix_token_families_userid', 'token_families', ['userid'], unique=False)
+    op.create_index('ix_token_families_expires_at', 'token_families', ['expires_at'], unique=False)
+    op.create_index(
+        'ix_token_families_revoked_at',
+        'token_families',
+        ['revoked_at'],
+        unique=False,
+        postgresql_where=sa.text('revoked_at IS NOT NULL'),
+        sqlite_where=sa.text('revoked_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_token_families_revoked_at', table_name='token_families')
+    op.drop_index('ix_token_families_expires_at', table_name='token_families')
+    op.drop_index('ix_token_families_userid', table_name='token_families')
+    op.drop_table('token_families')
@@ -0,0 +1,71 @@
+"""Question hot score
+
+Revision ID: d2a7b5e38c14
+Revises: c4f8a2d61e93
+Create Date: 2026-10-18 12:41:52.870663
+
+"""
+import math
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7b5e38c14'
+down_revision: Union[str, Sequence[str], None] = 'c4f8a2d61e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+HOT_SCORE_EPOCH = datetime(2025, 1, 1)
+HOT_SCORE_TIME_SCALE = 45000
+
+question = sa.table(
+    'question',
+    sa.column('qid', sa.UUID()),
+    sa.column('votes', sa.Integer()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('hot_score', sa.Float()),
+)
+
+
+def _hot_score(votes, created_at):
+    # Frozen copy of app.services.ranking_service.hot_score
+    votes = votes or 0
+    order = math.log10(max(abs(votes), 1))
+    sign = 1 if votes > 0 else -1 if votes < 0 else 0
+    seconds = ((created_at or HOT_SCORE_EPOCH) - HOT_SCORE_EPOCH).total_seconds()
+    return round(sign * order + seconds / HOT_SCORE_TIME_SCALE, 7)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('question', sa.Column('hot_score', sa.Float(), nullable=False, server_default='0'))
+
+    connection = op.get_bind()
+    last_qid = None
+    while True:
+        batch = sa.select(question.c.qid, question.c.votes, question.c.created_at).order_by(question.c.qid).limit(BATCH_SIZE)
+        if last_qid is not None:
+            batch = batch.where(question.c.qid > last_qid)
+        rows = connection.execute(batch).all()
+        if not rows:
+            break
+        last_qid = rows[-1].qid
+        connection.execute(
+            question.update()
+            .where(question.c.qid == sa.bindparam('b_qid'))
+            .values(hot_score=sa.bindparam('b_hot_score')),
+            [{'b_qid': row.qid, 'b_hot_score': _hot_score(row.votes, row.created_at)} for row in rows]
+        )
+
+    op.create_index('ix_question_hot_score_qid', 'question', ['hot_score', 'qid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_question_hot_score_qid', table_name='question')
+    op.drop_column('question', 'hot_score')
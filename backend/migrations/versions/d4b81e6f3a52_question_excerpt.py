@@ -0,0 +1,75 @@
+"""Question excerpt
+
+Revision ID: d4b81e6f3a52
+Revises: c7f2a9e4d810
+Create Date: 2026-10-18 21:37:05.418226
+
+"""
+import html
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b81e6f3a52'
+down_revision: Union[str, Sequence[str], None] = 'c7f2a9e4d810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+EXCERPT_LENGTH = 300
+
+HIDDEN_ELEMENT_PATTERN = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+question = sa.table(
+    'question',
+    sa.column('qid', sa.UUID()),
+    sa.column('desc', sa.Text()),
+    sa.column('excerpt', sa.Text()),
+)
+
+
+def _excerpt(desc):
+    # Frozen copy of app.services.question_service.make_excerpt
+    text = HIDDEN_ELEMENT_PATTERN.sub(" ", desc or "")
+    text = html.unescape(TAG_PATTERN.sub(" ", text))
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH - 1]
+    boundary = cut.rfind(" ")
+    if boundary > EXCERPT_LENGTH // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "…"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('question', sa.Column('excerpt', sa.Text(), nullable=False, server_default=''))
+
+    connection = op.get_bind()
+    last_qid = None
+    while True:
+        batch = sa.select(question.c.qid, question.c.desc).order_by(question.c.qid).limit(BATCH_SIZE)
+        if last_qid is not None:
+            batch = batch.where(question.c.qid > last_qid)
+        rows = connection.execute(batch).all()
+        if not rows:
+            break
+        last_qid = rows[-1].qid
+        connection.execute(
+            question.update()
+            .where(question.c.qid == sa.bindparam('b_qid'))
+            .values(excerpt=sa.bindparam('b_excerpt')),
+            [{'b_qid': row.qid, 'b_excerpt': _excerpt(row.desc)} for row in rows]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('question', 'excerpt')
@@ -0,0 +1,64 @@
+"""Answer and comment counts
+
+Revision ID: e5a93c7d1f06
+Revises: d4b81e6f3a52
+Create Date: 2026-10-18 22:58:41.093517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a93c7d1f06'
+down_revision: Union[str, Sequence[str], None] = 'd4b81e6f3a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+question = sa.table(
+    'question',
+    sa.column('qid', sa.UUID()),
+    sa.column('answer_count', sa.Integer()),
+    sa.column('accepted_aid', sa.UUID()),
+)
+answers = sa.table(
+    'answers',
+    sa.column('aid', sa.UUID()),
+    sa.column('qid', sa.UUID()),
+    sa.column('accepted', sa.Boolean()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('comment_count', sa.Integer()),
+)
+comments = sa.table(
+    'comments',
+    sa.column('aid', sa.UUID()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('question', sa.Column('answer_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('question', sa.Column('accepted_aid', sa.UUID(), nullable=True))
+    op.add_column('answers', sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Seed the counts from the existing rows
+    answer_count = sa.select(sa.func.count()).where(answers.c.qid == question.c.qid).scalar_subquery()
+    accepted_aid = (
+        sa.select(answers.c.aid)
+        .where(answers.c.qid == question.c.qid, answers.c.accepted == sa.true())
+        .order_by(answers.c.created_at, answers.c.aid)
+        .limit(1)
+        .scalar_subquery()
+    )
+    op.execute(question.update().values(answer_count=answer_count, accepted_aid=accepted_aid))
+    comment_count = sa.select(sa.func.count()).where(comments.c.aid == answers.c.aid).scalar_subquery()
+    op.execute(answers.update().values(comment_count=comment_count))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('answers', 'comment_count')
+    op.drop_column('question', 'accepted_aid')
+    op.drop_column('question', 'answer_count')
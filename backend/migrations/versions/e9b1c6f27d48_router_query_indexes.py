@@ -0,0 +1,115 @@
+"""Indexes for router query predicates
+
+Revision ID: e9b1c6f27d48
+Revises: d2a7b5e38c14
+Create Date: 2026-10-18 13:55:09.264781
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b1c6f27d48'
+down_revision: Union[str, Sequence[str], None] = 'd2a7b5e38c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+votes = sa.table(
+    'votes',
+    sa.column('vid', sa.UUID()),
+    sa.column('userid', sa.UUID()),
+    sa.column('id', sa.UUID()),
+    sa.column('is_answer', sa.Boolean()),
+    sa.column('is_upvote', sa.Boolean()),
+)
+question = sa.table('question', sa.column('qid', sa.UUID()), sa.column('votes', sa.Integer()))
+answers = sa.table('answers', sa.column('aid', sa.UUID()), sa.column('votes', sa.Integer()))
+
+
+def _remove_duplicate_votes(connection) -> None:
+    """Keep one vote per (userid, id, is_answer) and take the extras back out of the post counters."""
+    groups = connection.execute(
+        sa.select(votes.c.userid, votes.c.id, votes.c.is_answer)
+        .group_by(votes.c.userid, votes.c.id, votes.c.is_answer)
+        .having(sa.func.count() > 1)
+    ).all()
+
+    corrections = defaultdict(int)
+    for group in groups:
+        rows = connection.execute(
+            sa.select(votes.c.vid, votes.c.is_upvote)
+            .where(
+                votes.c.userid == group.userid,
+                votes.c.id == group.id,
+                votes.c.is_answer == group.is_answer
+            )
+            .order_by(votes.c.vid)
+        ).all()
+        extras = rows[1:]
+        connection.execute(votes.delete().where(votes.c.vid.in_([row.vid for row in extras])))
+        for row in extras:
+            corrections[(group.is_answer, group.id)] -= 1 if row.is_upvote else -1
+
+    for (is_answer, post_id), delta in corrections.items():
+        if not delta:
+            continue
+        if is_answer:
+            connection.execute(answers.update().where(answers.c.aid == post_id).values(votes=answers.c.votes + delta))
+        else:
+            connection.execute(question.update().where(question.c.qid == post_id).values(votes=question.c.votes + delta))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _remove_duplicate_votes(op.get_bind())
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.create_unique_constraint('uq_votes_userid_id_is_answer', ['userid', 'id', 'is_answer'])
+    op.create_index('ix_votes_id_is_answer_is_upvote', 'votes', ['id', 'is_answer', 'is_upvote'], unique=False)
+
+    op.create_index('ix_question_created_at_qid', 'question', ['created_at', 'qid'], unique=False)
+    op.create_index('ix_question_votes_created_at_qid', 'question', ['votes', 'created_at', 'qid'], unique=False)
+    op.create_index('ix_question_userid', 'question', ['userid'], unique=False)
+
+    op.create_index(
+        'ix_answers_qid_display_order',
+        'answers',
+        ['qid', sa.text('accepted DESC'), sa.text('votes DESC'), 'created_at', 'aid'],
+        unique=False
+    )
+    op.create_index('ix_answers_userid', 'answers', ['userid'], unique=False)
+
+    op.create_index('ix_comments_aid_created_at', 'comments', ['aid', 'created_at', 'cid'], unique=False)
+    op.create_index('ix_comments_userid', 'comments', ['userid'], unique=False)
+
+    op.create_index('ix_notifications_userid_created_at', 'notifications', ['userid', 'created_at', 'nid'], unique=False)
+    op.create_index(
+        'ix_notifications_userid_unread',
+        'notifications',
+        ['userid', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_read = false'),
+        sqlite_where=sa.text('is_read = false')
+    )
+
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_notifications_userid_unread', table_name='notifications')
+    op.drop_index('ix_notifications_userid_created_at', table_name='notifications')
+    op.drop_index('ix_comments_userid', table_name='comments')
+    op.drop_index('ix_comments_aid_created_at', table_name='comments')
+    op.drop_index('ix_answers_userid', table_name='answers')
+    op.drop_index('ix_answers_qid_display_order', table_name='answers')
+    op.drop_index('ix_question_userid', table_name='question')
+    op.drop_index('ix_question_votes_created_at_qid', table_name='question')
+    op.drop_index('ix_question_created_at_qid', table_name='question')
+    op.drop_index('ix_votes_id_is_answer_is_upvote', table_name='votes')
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.drop_constraint('uq_votes_userid_id_is_answer', type_='unique')
@@ -0,0 +1,37 @@
+"""Keep token families of deleted users
+
+Revision ID: f3d6a2b8c951
+Revises: e5a93c7d1f06
+Create Date: 2026-10-19 10:12:44.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d6a2b8c951'
+down_revision: Union[str, Sequence[str], None] = 'e5a93c7d1f06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('token_families', 'userid', existing_type=sa.UUID(), nullable=True)
+    op.drop_constraint('token_families_userid_fkey', 'token_families', type_='foreignkey')
+    op.create_foreign_key(
+        'token_families_userid_fkey', 'token_families', 'users', ['userid'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('token_families_userid_fkey', 'token_families', type_='foreignkey')
+    op.create_foreign_key(
+        'token_families_userid_fkey', 'token_families', 'users', ['userid'], ['id'], ondelete='CASCADE'
+    )
+    op.execute('DELETE FROM token_families WHERE userid IS NULL')
+    op.alter_column('token_families', 'userid', existing_type=sa.UUID(), nullable=False)
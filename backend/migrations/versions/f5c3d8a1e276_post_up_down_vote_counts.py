@@ -0,0 +1,55 @@
+"""Denormalized up/down vote counts
+
+Revision ID: f5c3d8a1e276
+Revises: e9b1c6f27d48
+Create Date: 2026-10-18 15:12:40.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c3d8a1e276'
+down_revision: Union[str, Sequence[str], None] = 'e9b1c6f27d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+votes = sa.table(
+    'votes',
+    sa.column('id', sa.UUID()),
+    sa.column('is_answer', sa.Boolean()),
+    sa.column('is_upvote', sa.Boolean()),
+)
+
+
+def _backfill(table, key, is_answer) -> None:
+    """Count each post's up/down votes from the votes table (served by ix_votes_id_is_answer_is_upvote)."""
+    def count(is_upvote):
+        return (
+            sa.select(sa.func.count())
+            .where(votes.c.id == key, votes.c.is_answer == is_answer, votes.c.is_upvote == is_upvote)
+            .scalar_subquery()
+        )
+    op.execute(table.update().values(upvotes=count(True), downvotes=count(False)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name in ('question', 'answers'):
+        op.add_column(table_name, sa.Column('upvotes', sa.Integer(), nullable=False, server_default='0'))
+        op.add_column(table_name, sa.Column('downvotes', sa.Integer(), nullable=False, server_default='0'))
+
+    question = sa.table('question', sa.column('qid', sa.UUID()), sa.column('upvotes', sa.Integer()), sa.column('downvotes', sa.Integer()))
+    answers = sa.table('answers', sa.column('aid', sa.UUID()), sa.column('upvotes', sa.Integer()), sa.column('downvotes', sa.Integer()))
+    _backfill(question, question.c.qid, False)
+    _backfill(answers, answers.c.aid, True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in ('answers', 'question'):
+        op.drop_column(table_name, 'downvotes')
+        op.drop_column(table_name, 'upvotes')
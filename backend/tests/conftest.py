@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+# The app builds its engine from DATABASE_URL at import time. Tests never touch a configured
+# DATABASE_URL: they run against TEST_DATABASE_URL, or a throwaway SQLite file.
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+# Cheap bcrypt; tests that need another cost hash with it explicitly
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "5")
+
+import pytest
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.auth import auth_handler
+from app.database import Base, SessionLocal, async_engine, engine
+from app.models import Users
+from app.routers import auth, user, question, answer, vote, notifications, home, comment, metrics
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", help="also run load tests and benchmarks")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: load test or benchmark, only run with --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    # Left in place afterwards: a suite run in a subprocess may share TEST_DATABASE_URL
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Async connections belong to the event loop of the app that opened them
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def make_app() -> FastAPI:
+    # app.main also mounts the chatbot router, whose provider isn't needed here
+    app = FastAPI(lifespan=lifespan)
+    for module in (auth, user, question, answer, vote, notifications, home, comment, metrics):
+        app.include_router(module.router, prefix="/api")
+    return app
+
+
+@pytest.fixture
+def client():
+    with TestClient(make_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username: str, admin: bool = False) -> Users:
+        new_user = Users(username=username, email=f"{username}@example.com", password="x", type=admin)
+        db.add(new_user)
+        db.commit()
+        return new_user
+    return make
+
+
+def auth_headers(user: Users) -> dict:
+    token = auth_handler.create_access_token({"sub": user.username, "uid": str(user.id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# The engine endpoints run their queries on (the async engine's in DATABASE_ASYNC mode)
+request_engine = async_engine.sync_engine if async_engine is not None else engine
+
+
+@contextmanager
+def count_queries(target=engine):
+    """Collects the SQL statements the engine (`target`) runs inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
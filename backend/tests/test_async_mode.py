@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from app.config import settings
+
+BACKEND_DIR = Path(__file__).parents[1]
+
+
+def run_route_tests(database_async: bool, *args: str, **env: str) -> subprocess.CompletedProcess:
+    """Run tests/test_routes.py in a fresh interpreter (the mode is fixed at import time)."""
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *args],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_ASYNC": str(database_async).lower(), **env},
+        capture_output=True,
+        text=True
+    )
+
+
+@pytest.mark.skipif(settings.DATABASE_ASYNC, reason="this run already uses async mode")
+def test_routes_in_async_mode():
+    result = run_route_tests(True, "tests/test_routes.py")
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+@pytest.mark.slow
+def test_sync_and_async_read_throughput(tmp_path):
+    throughput = {}
+    for database_async in (False, True):
+        output = tmp_path / f"async-{database_async}.json"
+        result = run_route_tests(
+            database_async, "--run-slow", "tests/test_routes.py::test_read_throughput", BENCHMARK_OUTPUT=str(output)
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        measured = json.loads(output.read_text())
+        throughput[measured["mode"]] = measured["requests_per_second"]
+
+    print(", ".join(f"{mode}: {rps:.0f} requests/s" for mode, rps in throughput.items()))
+    assert set(throughput) == {"sync", "async"}
@@ -0,0 +1,49 @@
+import time
+from app.cache import MemoryCache, ResponseCache
+
+
+def test_counters_are_bounded_least_recently_used_first():
+    cache = MemoryCache(10, max_counters=3)
+    for key in ("a", "b", "c"):
+        cache.incr(key)
+    cache.get_counters(["a"])  # a is used again, b is now the oldest
+
+    cache.incr("d")
+
+    assert set(cache._counters) == {"a", "c", "d"}
+
+
+def test_unused_counters_expire():
+    cache = MemoryCache(10, counter_ttl=0.05)
+    cache.incr("old")
+    time.sleep(0.1)
+
+    cache.incr("new")
+
+    assert set(cache._counters) == {"new"}
+
+
+def test_a_dropped_counter_never_repeats_a_generation():
+    cache = MemoryCache(10, max_counters=1)
+    start = cache.get_counters(["a"])[0]
+    assert start > 0
+
+    seen = [cache.incr("a") for _ in range(3)]
+    cache.incr("b")  # drops a
+    assert "a" not in cache._counters
+
+    assert cache.get_counters(["a"])[0] > max(seen)
+    assert cache.incr("a") > max(seen)
+
+
+def test_an_invalidated_response_is_not_served_after_its_generation_is_dropped():
+    response_cache = ResponseCache(MemoryCache(10, max_counters=1), ttl=60, stale_ttl=60)
+    stale_key = response_cache.key("page", {}, ["question:1"])
+    response_cache.store(stale_key, {"body": "stale"})
+
+    response_cache.invalidate("question:1")
+    response_cache.invalidate("question:2")  # drops question:1's generation
+
+    key = response_cache.key("page", {}, ["question:1"])
+    assert key != stale_key
+    assert response_cache.lookup(key, dict) is None
@@ -0,0 +1,53 @@
+from app.config import settings
+from app.models import Notification, NotificationOutbox
+from app.schemas.notification_schema import NotificationType
+from app.services.mention_service import extract_mentions
+from app.services.notification_pipeline import USERS_MENTIONED, pipeline
+from tests.conftest import auth_headers, count_queries
+
+MENTIONS = 300
+
+
+def mention_body(usernames) -> str:
+    """A post body mentioning each name, with repeats and e-mail addresses mixed in."""
+    parts = []
+    for username in usernames:
+        parts += [f"@{username},", f"{username}@example.com", f"(@{usernames[0]})"]
+    return " ".join(parts)
+
+
+def test_extract_mentions_is_capped_and_distinct():
+    usernames = [f"user{i}" for i in range(MENTIONS)]
+
+    mentions = extract_mentions("Title", mention_body(usernames))
+
+    assert mentions == usernames[:settings.MENTION_MAX_PER_POST]
+    assert extract_mentions("mail me at someone@example.com or @@nobody") == []
+
+
+def test_a_post_with_hundreds_of_mentions_notifies_in_one_insert(client, db, make_user):
+    author = make_user("author")
+    mentioned = [make_user(f"user{i}") for i in range(settings.MENTION_MAX_PER_POST + 5)]
+    usernames = [user.username for user in mentioned] + [f"ghost{i}" for i in range(MENTIONS)]
+
+    response = client.post(
+        "/api/question/",
+        json={"title": "Title", "desc": mention_body([author.username] + usernames), "tags": "python"},
+        headers=auth_headers(author)
+    )
+    assert response.status_code == 200
+
+    events = db.query(NotificationOutbox).filter(NotificationOutbox.event_type == USERS_MENTIONED).all()
+    assert len(events) == 1
+    # The author's own mention is dropped after the cap is applied
+    assert events[0].payload["usernames"] == usernames[:settings.MENTION_MAX_PER_POST - 1]
+
+    with count_queries() as statements:
+        assert pipeline.process(db) == 1
+
+    user_lookups = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM users" in s]
+    notification_inserts = [s for s in statements if s.lstrip().startswith("INSERT INTO notifications")]
+    assert len(user_lookups) == 1
+    assert len(notification_inserts) == 1
+    recipients = {n.userid for n in db.query(Notification).filter(Notification.type == NotificationType.MENTION.value)}
+    assert recipients == {user.id for user in mentioned[:settings.MENTION_MAX_PER_POST - 1]}
@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+import pytest
+from sqlalchemy import create_engine, exc, make_url
+from app.config import settings
+from app.database import engine
+from app.db_pool import InstrumentedQueuePool, engine_options
+from app.metrics import metrics
+from tests.conftest import auth_headers
+
+
+def counter(name: str) -> float:
+    return metrics.snapshot().get(name, 0)
+
+
+def test_metrics_are_admin_only(client, make_user):
+    assert client.get("/api/metrics/").status_code in (401, 403)
+    assert client.get("/api/metrics/", headers=auth_headers(make_user("reader"))).status_code == 403
+
+    response = client.get("/api/metrics/", headers=auth_headers(make_user("admin", admin=True)))
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
+def test_pool_counts_checkouts_that_wait():
+    pool = InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False), pool_size=1, max_overflow=1, timeout=5
+    )
+    checkouts, waits, wait_ms = (counter(f"db_pool.{name}") for name in ("checkouts", "waits", "wait_ms"))
+
+    first, second = pool.connect(), pool.connect()
+    assert counter("db_pool.waits") == waits
+
+    # The pool and its overflow are in use: the third checkout waits for one to come back
+    threading.Timer(0.1, first.close).start()
+    third = pool.connect()
+    assert counter("db_pool.checkouts") == checkouts + 3
+    assert counter("db_pool.waits") == waits + 1
+    assert counter("db_pool.wait_ms") >= wait_ms + 50
+
+    second.close()
+    third.close()
+    assert pool.recreate().max_overflow == 1
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """Swap the app engine's pool for a small one that times out quickly."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.3)
+    pool = create_engine(settings.DATABASE_URL, **engine_options(make_url(settings.DATABASE_URL))).pool
+    monkeypatch.setattr(engine, "pool", pool)
+    yield pool
+    pool.dispose()
+
+
+def test_saturated_pool_shows_in_metrics(client, db, make_user, small_pool):
+    admin = auth_headers(make_user("admin", admin=True))
+    db.close()  # hand the fixture session's connection back
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    # Also warms the principal cache, so later metrics reads need no connection
+    before = client.get("/api/metrics/", headers=admin).json()
+
+    held = [engine.connect() for _ in range(capacity)]
+    try:
+        # Nothing comes back in time: the checkout waits, then times out
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        # One comes back while the next checkout waits
+        threading.Timer(0.1, held.pop().close).start()
+        held.append(engine.connect())
+        saturated = client.get("/api/metrics/", headers=admin).json()
+    finally:
+        for connection in held:
+            connection.close()
+    after = client.get("/api/metrics/", headers=admin).json()
+
+    assert saturated["db_pool.size"] == settings.DB_POOL_SIZE
+    assert saturated["db_pool.checked_out"] == capacity
+    assert saturated["db_pool.overflow"] == settings.DB_MAX_OVERFLOW
+    assert after["db_pool.checked_out"] == 0
+    assert after["db_pool.timeouts"] == before.get("db_pool.timeouts", 0) + 1
+    assert after["db_pool.waits"] == before.get("db_pool.waits", 0) + 2
+    assert after["db_pool.wait_ms"] >= before.get("db_pool.wait_ms", 0) + 300 + 50
@@ -0,0 +1,93 @@
+import asyncio
+import json
+from uuid import UUID
+from app.routers.notifications import _notification_events
+from app.schemas.notification_schema import NotificationType
+from app.services.notification_hub import (
+    PG_NOTIFY_MAX_BYTES, SESSION_MESSAGES_KEY, NotificationHub, hub, load_message, notify_payload
+)
+from app.services.notification_service import NotificationService
+
+
+def publish_notification(db, user, content: str) -> dict:
+    """Adds a notification and returns the message it published."""
+    NotificationService(db).add_notification(user.id, content, NotificationType.MENTION)
+    (_, message), = db.info[SESSION_MESSAGES_KEY]
+    db.commit()
+    return message
+
+
+def test_small_messages_are_sent_whole(db, make_user):
+    user = make_user("reader")
+    message = publish_notification(db, user, "author mentioned you in a question: Short title")
+
+    payload = json.loads(notify_payload(user.id, message))
+    assert payload == {"user_id": str(user.id), "message": message}
+
+
+def test_oversized_messages_are_sent_as_their_id_and_reloaded(db, make_user):
+    user = make_user("reader")
+    message = publish_notification(db, user, "author mentioned you in a question: " + "é" * 4000)
+
+    raw = notify_payload(user.id, message)
+    assert len(raw.encode()) <= PG_NOTIFY_MAX_BYTES
+    payload = json.loads(raw)
+    assert payload == {"user_id": str(user.id), "nid": message["nid"]}
+    assert load_message(UUID(payload["nid"])) == message
+
+
+def test_messages_are_delivered_on_commit_only(db, make_user):
+    reader, other = make_user("reader"), make_user("other")
+
+    async def run():
+        queue = hub.subscribe(reader.id)[1]
+        other_queue = hub.subscribe(other.id)[1]
+        NotificationService(db).add_notification(reader.id, "rolled back", NotificationType.MENTION)
+        db.rollback()
+        NotificationService(db).add_notification(reader.id, "committed", NotificationType.MENTION)
+        assert queue.empty()  # not before the commit
+        db.commit()
+        await asyncio.sleep(0)  # deliver() hands over through call_soon_threadsafe
+        return [queue.get_nowait()["content"] for _ in range(queue.qsize())], other_queue.qsize()
+
+    assert asyncio.run(run()) == (["committed"], 0)
+
+
+def test_a_client_that_stops_reading_misses_pushes():
+    slow_hub = NotificationHub(queue_size=2)
+
+    async def run():
+        queue = slow_hub.subscribe("user")[1]
+        for i in range(3):
+            slow_hub.deliver("user", {"n": i})
+        await asyncio.sleep(0)
+        return [queue.get_nowait()["n"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == [0, 1]
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_stream_sends_committed_notifications_as_events(db, make_user):
+    reader = make_user("reader")
+    reader_id = reader.id
+
+    async def run():
+        events = _notification_events(ConnectedRequest(), reader_id)
+        assert await events.__anext__() == "retry: 5000\n\n"
+        NotificationService(db).add_notification(reader_id, "author answered your question", NotificationType.ANSWER)
+        db.commit()
+        event = await asyncio.wait_for(events.__anext__(), timeout=5)
+        await events.aclose()
+        return event
+
+    event = asyncio.run(run())
+    name, data = event.rstrip("\n").split("\n")
+    assert name == "event: notification"
+    message = json.loads(data.removeprefix("data: "))
+    assert (message["userid"], message["content"]) == (str(reader_id), "author answered your question")
+    # Closing the stream unsubscribes it
+    assert reader_id not in hub._subscribers
@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import UUID
+from app.metrics import metrics
+from app.models import Notification, NotificationOutbox
+from app.schemas.notification_schema import NotificationType
+from app.services import notification_pipeline
+from app.services.notification_pipeline import HANDLERS, NotificationPipeline, enqueue_event
+
+NOTIFY = "test_notify"
+FAIL = "test_fail"
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    def notify(service, user_id, content):
+        service.add_notification(UUID(user_id), content, NotificationType.MENTION)
+
+    def fail(service, **payload):
+        raise RuntimeError("handler failed")
+
+    monkeypatch.setitem(HANDLERS, NOTIFY, notify)
+    monkeypatch.setitem(HANDLERS, FAIL, fail)
+
+
+@pytest.fixture
+def worker():
+    return NotificationPipeline(queue_size=10, batch_size=10, poll_seconds=1, max_attempts=3)
+
+
+def test_events_reach_the_worker_on_commit_only(db, make_user, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(notification_pipeline.pipeline, "submit", submitted.append)
+    user_id = make_user("reader").id
+
+    enqueue_event(db, NOTIFY, user_id=str(user_id), content="rolled back")
+    db.rollback()
+    assert submitted == []
+    assert db.query(NotificationOutbox).count() == 0
+
+    enqueue_event(db, NOTIFY, user_id=str(user_id), content="committed")
+    assert submitted == []  # not before the commit
+    db.commit()
+    assert submitted == [db.query(NotificationOutbox).one().id]
+
+
+def test_a_failing_event_is_isolated_from_its_batch(db, make_user, handlers, worker):
+    user_id = make_user("reader").id
+    enqueue_event(db, NOTIFY, user_id=str(user_id), content="first")
+    enqueue_event(db, FAIL)
+    enqueue_event(db, NOTIFY, user_id=str(user_id), content="second")
+    db.commit()
+    retries = metrics.get("notification_pipeline.retries")
+
+    assert worker.process(db) == 2
+
+    contents = sorted(n.content for n in db.query(Notification).filter(Notification.userid == user_id))
+    assert contents == ["first", "second"]  # once each, although the batch was rolled back
+    failed = db.query(NotificationOutbox).filter(NotificationOutbox.event_type == FAIL).one()
+    assert failed.processed_at is None
+    assert failed.attempts == 1
+    assert "handler failed" in failed.last_error
+    assert db.query(NotificationOutbox).filter(NotificationOutbox.processed_at.is_(None)).count() == 1
+    assert metrics.get("notification_pipeline.retries") == retries + 1
+
+
+def test_retries_back_off_exponentially_then_give_up(db, handlers, worker):
+    enqueue_event(db, FAIL)
+    db.commit()
+    dead = metrics.get("notification_pipeline.dead")
+    failed = db.query(NotificationOutbox).one()
+
+    delays = []
+    for _ in range(worker.max_attempts):
+        started = datetime.utcnow()
+        assert worker.process(db) == 0
+        db.refresh(failed)
+        if failed.processed_at is None:
+            delays.append((failed.available_at - started).total_seconds())
+            # Not due yet: the next poll leaves it alone
+            assert worker.process(db) == 0
+            failed.available_at = datetime.utcnow() - timedelta(seconds=1)
+            db.commit()
+
+    assert [round(delay) for delay in delays] == [2, 4]
+    assert failed.attempts == worker.max_attempts
+    assert failed.processed_at is not None
+    assert metrics.get("notification_pipeline.dead") == dead + 1
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from app.models import Notification
+from app.schemas.notification_schema import NotificationType
+from app.services.notification_service import NotificationService
+from tests.conftest import auth_headers, count_queries, request_engine
+
+
+def add_notifications(db, user_id, count: int) -> list:
+    """Notifications an hour apart, oldest first; returns their ids as strings."""
+    service = NotificationService(db)
+    notifications = [service.add_notification(user_id, f"note {i}", NotificationType.MENTION) for i in range(count)]
+    for i, notification in enumerate(notifications):
+        notification.created_at = datetime(2026, 1, 1) + timedelta(hours=i)
+    db.commit()
+    return [str(notification.nid) for notification in notifications]
+
+
+def test_bulk_read_by_id_changes_only_the_callers_unread_notifications(client, db, make_user):
+    reader, other = make_user("reader"), make_user("other")
+    headers = auth_headers(reader)
+    nids = add_notifications(db, reader.id, 4)
+    other_nids = add_notifications(db, other.id, 1)
+    assert client.post("/api/notification/read", json={"notification_id": nids[0]}, headers=headers).status_code == 200
+
+    with count_queries(request_engine) as statements:
+        response = client.post(
+            "/api/notification/bulk/read", json={"notification_ids": nids[:3] + other_nids}, headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["updated_count"] == 2
+    assert sorted(response.json()["notification_ids"]) == sorted(nids[1:3])
+    assert len([s for s in statements if s.lstrip().startswith("UPDATE notifications")]) == 1
+    assert client.get("/api/notification/unread-count", headers=headers).json() == {"unread_count": 1}
+    assert client.get("/api/notification/unread-count", headers=auth_headers(other)).json() == {"unread_count": 1}
+
+
+def test_bulk_read_up_to_a_watermark(client, db, make_user):
+    reader = make_user("reader")
+    headers = auth_headers(reader)
+    nids = add_notifications(db, reader.id, 4)
+
+    response = client.post("/api/notification/bulk/read", json={"before": "2026-01-01T01:00:00"}, headers=headers)
+
+    assert sorted(response.json()["notification_ids"]) == sorted(nids[:2])
+    stats = client.get("/api/notification/stats", headers=headers).json()
+    assert (stats["unread_notifications"], stats["read_notifications"]) == (2, 2)
+
+
+def test_bulk_delete_by_id_and_watermark(client, db, make_user):
+    reader, other = make_user("reader"), make_user("other")
+    headers = auth_headers(reader)
+    nids = add_notifications(db, reader.id, 5)
+    other_nids = add_notifications(db, other.id, 2)
+    client.post("/api/notification/bulk/read", json={"notification_ids": nids[:1]}, headers=headers)
+
+    by_id = client.post("/api/notification/bulk/delete", json={"notification_ids": nids[3:] + other_nids}, headers=headers)
+    by_watermark = client.post("/api/notification/bulk/delete", json={"before": "2026-01-01T01:00:00"}, headers=headers)
+
+    assert sorted(by_id.json()["notification_ids"]) == sorted(nids[3:])
+    assert sorted(by_watermark.json()["notification_ids"]) == sorted(nids[:2])
+    assert [str(n.nid) for n in db.query(Notification).filter(Notification.userid == reader.id)] == [nids[2]]
+    stats = client.get("/api/notification/stats", headers=headers).json()
+    assert (stats["total_notifications"], stats["unread_notifications"]) == (1, 1)
+    assert db.query(Notification).filter(Notification.userid == other.id).count() == 2
+
+
+def test_bulk_requests_need_exactly_one_selector(client, make_user):
+    headers = auth_headers(make_user("reader"))
+    for selection in ({}, {"notification_ids": [], "before": None},
+                      {"notification_ids": ["00000000-0000-0000-0000-000000000000"], "before": "2026-01-01T00:00:00"},
+                      {"notification_ids": ["00000000-0000-0000-0000-000000000000"] * 501}):
+        for action in ("read", "delete"):
+            assert client.post(f"/api/notification/bulk/{action}", json=selection, headers=headers).status_code == 422
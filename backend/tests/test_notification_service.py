@@ -0,0 +1,131 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.models import Notification, NotificationActor, NotificationCounter, Question
+from app.schemas.notification_schema import NotificationType
+from app.services.notification_hub import SESSION_MESSAGES_KEY
+from app.services.notification_service import NotificationService
+
+
+@pytest.fixture
+def question(db, make_user):
+    author = make_user("author")
+    question = Question(username=author.username, userid=author.id, title="How?", desc="desc", tags="python")
+    db.add(question)
+    db.commit()
+    return question
+
+
+def answered(db, question, answerer) -> list:
+    """Handle an answer event; returns the messages it published."""
+    NotificationService(db).notify_question_answered(question.qid, answerer.id, answerer.username)
+    messages = [message for _, message in db.info.get(SESSION_MESSAGES_KEY, [])]
+    db.commit()
+    return messages
+
+
+def test_answers_by_new_actors_fold_into_the_unread_notification(db, make_user, question):
+    author_id, qid = question.userid, question.qid
+    first, second = make_user("first"), make_user("second")
+
+    answered(db, question, first)
+    messages = answered(db, question, second)
+
+    notification = db.query(Notification).filter(Notification.userid == author_id).one()
+    assert notification.actor_count == 2
+    assert notification.content == "2 people answered your question: 'How?'"
+    assert notification.group_key == f"answer:{qid}"
+    assert [(m["nid"], m["actor_count"], m["content"]) for m in messages] == [
+        (str(notification.nid), 2, notification.content)
+    ]
+    assert NotificationService(db).get_counts(author_id) == (1, 1)
+
+
+def test_a_repeat_actor_is_counted_once(db, make_user, question):
+    answerer = make_user("answerer")
+
+    answered(db, question, answerer)
+    assert answered(db, question, answerer) == []
+
+    notification = db.query(Notification).filter(Notification.userid == question.userid).one()
+    assert (notification.actor_count, notification.content) == (1, "answerer answered your question: 'How?'")
+    assert db.query(NotificationActor).filter(NotificationActor.nid == notification.nid).count() == 1
+
+
+def test_a_read_group_starts_a_new_notification(db, make_user, question):
+    author_id = question.userid
+    answered(db, question, make_user("first"))
+    service = NotificationService(db)
+    assert service.mark_all_as_read(author_id) == 1
+    db.commit()
+
+    answered(db, question, make_user("second"))
+
+    rows = db.query(Notification).filter(Notification.userid == author_id).order_by(Notification.created_at).all()
+    assert [(row.is_read, row.actor_count) for row in rows] == [(True, 1), (False, 1)]
+    assert rows[1].content == "second answered your question: 'How?'"
+    assert service.get_counts(author_id) == (1, 2)
+
+
+def actual_counts(db, user_id) -> tuple:
+    rows = db.query(Notification.is_read).filter(Notification.userid == user_id).all()
+    return sum(1 for row in rows if not row.is_read), len(rows)
+
+
+def add_notifications(db, user_id, count: int) -> list:
+    service = NotificationService(db)
+    nids = [service.add_notification(user_id, f"note {i}", NotificationType.MENTION).nid for i in range(count)]
+    db.commit()
+    return nids
+
+
+def test_counters_follow_reads_and_deletes(db, make_user):
+    user_id = make_user("reader").id
+    service = NotificationService(db)
+    nids = add_notifications(db, user_id, 6)
+    assert service.get_counts(user_id) == (6, 6)
+
+    steps = [
+        lambda: service.mark_as_read(user_id, nids[0]),
+        lambda: service.mark_as_read(user_id, nids[0]),  # already read: no change
+        lambda: service.mark_many_as_read(user_id, nids[:3]),
+        lambda: service.delete_notification(user_id, nids[0]),  # a read one
+        lambda: service.delete_notification(user_id, nids[3]),  # an unread one
+        lambda: service.delete_many(user_id, nids[1:5]),
+        lambda: service.mark_all_as_read(user_id),
+    ]
+    for step in steps:
+        step()
+        db.commit()
+        assert service.get_counts(user_id) == actual_counts(db, user_id)
+    assert service.get_counts(user_id) == (0, 1)
+
+
+def test_pruning_read_notifications_lowers_only_the_total(db, make_user):
+    user_ids = [make_user("reader").id, make_user("other").id]
+    service = NotificationService(db)
+    for user_id in user_ids:
+        nids = add_notifications(db, user_id, 3)
+        service.mark_many_as_read(user_id, nids[:2])
+    db.execute(update(Notification).values(created_at=datetime.utcnow() - timedelta(days=60)))
+    db.commit()
+
+    assert service.prune_read(timedelta(days=30), batch_size=3) == 3
+    assert service.prune_read(timedelta(days=30), batch_size=3) == 1
+
+    for user_id in user_ids:
+        assert service.get_counts(user_id) == actual_counts(db, user_id) == (1, 1)
+
+
+def test_reconcile_repairs_drifted_and_missing_counters(db, make_user):
+    drifted, missing = make_user("drifted").id, make_user("missing").id
+    for user_id in (drifted, missing):
+        add_notifications(db, user_id, 2)
+    db.query(NotificationCounter).filter(NotificationCounter.userid == drifted).update({"unread_count": 7})
+    db.query(NotificationCounter).filter(NotificationCounter.userid == missing).delete()
+    db.commit()
+
+    service = NotificationService(db)
+    assert service.reconcile_counters() == 2
+    assert service.get_counts(drifted) == service.get_counts(missing) == (2, 2)
+    assert service.reconcile_counters() == 0
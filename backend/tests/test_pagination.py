@@ -0,0 +1,85 @@
+import importlib.util
+import uuid
+import pytest
+from pathlib import Path
+from datetime import datetime, timedelta
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import MetaData, create_engine, inspect, select
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models import Question
+from app.pagination import keyset_page
+
+MIGRATION = Path(__file__).parents[1] / "migrations" / "versions" / "b9d4e2a7c6f1_keyset_columns_not_null.py"
+
+SORTS = {
+    "latest": ([Question.created_at, Question.qid], [True, True]),
+    "most_popular": ([Question.votes, Question.created_at, Question.qid], [True, True, True]),
+}
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("keyset_columns_not_null_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database with the schema before the migration, where the keyset columns allowed NULL."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    for table_name, columns in load_migration().KEYSET_COLUMNS.items():
+        for name in columns:
+            metadata.tables[table_name].c[name].nullable = True
+    metadata.create_all(engine)
+
+    users, question = metadata.tables["users"], metadata.tables["question"]
+    user_id = uuid.uuid4()
+    now = datetime(2026, 6, 1)
+    with engine.begin() as connection:
+        connection.execute(users.insert().values(id=user_id, username="author", email="author@example.com", created_at=None))
+        connection.execute(question.insert(), [
+            {"qid": uuid.uuid4(), "username": "author", "userid": user_id, "title": f"Q{i}", "desc": "desc",
+             "votes": votes, "upvotes": max(votes or 0, 0), "downvotes": 0, "created_at": created_at}
+            for i, (votes, created_at) in enumerate([(5, now), (3, now - timedelta(days=1)), (None, None)])
+        ])
+    yield engine
+    engine.dispose()
+
+
+def all_pages(engine, sort: str) -> list:
+    """Every qid, following next_cursor one row at a time."""
+    columns, descending = SORTS[sort]
+    qids, cursor = [], None
+    with Session(engine) as db:
+        while True:
+            rows, cursor = keyset_page(db.query(*columns), columns, descending, 1, cursor)
+            qids += [row.qid for row in rows]
+            if cursor is None:
+                return qids
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_rows_with_null_sort_keys_are_backfilled_and_paged(legacy_engine, sort):
+    with legacy_engine.connect() as connection:
+        all_qids = set(connection.execute(select(Question.qid)).scalars())
+    # The NULL row never satisfies "col < :last", so cursor paging loses it
+    assert len(all_pages(legacy_engine, sort)) == len(all_qids) - 1
+
+    with legacy_engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+        load_migration().upgrade()
+
+    columns = {column["name"]: column for column in inspect(legacy_engine).get_columns("question")}
+    assert not columns["created_at"]["nullable"] and not columns["votes"]["nullable"]
+    with legacy_engine.connect() as connection:
+        backfilled = connection.execute(select(Question.votes, Question.created_at).where(Question.title == "Q2")).one()
+    assert backfilled == (0, load_migration().MISSING_CREATED_AT)
+
+    qids = all_pages(legacy_engine, sort)
+    assert len(qids) == len(set(qids)) == len(all_qids)
+    assert set(qids) == all_qids
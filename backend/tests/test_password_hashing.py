@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from app.config import settings
+from app.metrics import metrics
+from app.models import Users
+from app.password_hashing import PasswordHasher, pwd_context
+from tests.conftest import make_app
+
+PASSWORD = "correct horse"
+
+
+def add_user(db, username: str, hashed_password: str) -> Users:
+    user = Users(username=username, email=f"{username}@example.com", password=hashed_password)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_a_full_queue_rejects_with_retry_after():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    release = threading.Event()
+    rejected = metrics.get("password_hash.rejected")
+
+    async def run():
+        blocked = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejection:
+            await hasher._run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        # Capacity is back once the pending hashes finish
+        assert await hasher.hash(PASSWORD)
+        return rejection.value
+
+    rejection = asyncio.run(run())
+    assert rejection.status_code == 503
+    assert rejection.headers == {"Retry-After": "1"}
+    assert metrics.get("password_hash.rejected") == rejected + 1
+
+
+def test_login_rehashes_a_hash_with_another_cost(client, db):
+    other_rounds = 4 if settings.PASSWORD_BCRYPT_ROUNDS != 4 else 5
+    user = add_user(db, "reader", bcrypt.using(rounds=other_rounds).hash(PASSWORD))
+
+    response = client.post("/api/auth/login", json={"username": "reader", "password": PASSWORD})
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert bcrypt.from_string(user.password).rounds == settings.PASSWORD_BCRYPT_ROUNDS
+    assert pwd_context.verify(PASSWORD, user.password)
+    # An up-to-date hash is left alone
+    current_hash = user.password
+    assert client.post("/api/auth/login", json={"username": "reader", "password": PASSWORD}).status_code == 200
+    db.refresh(user)
+    assert user.password == current_hash
+
+
+def test_wrong_password_is_rejected(client, db):
+    add_user(db, "reader", pwd_context.hash(PASSWORD))
+    response = client.post("/api/auth/login", json={"username": "reader", "password": "wrong"})
+    assert response.status_code == 401
+
+
+@pytest.mark.slow
+def test_login_throughput(db):
+    """Concurrent logins per second, and how long a cheap request waits behind them."""
+    logins = min(settings.PASSWORD_HASH_MAX_PENDING, 32)
+    hashed_password = pwd_context.hash(PASSWORD)
+    for i in range(logins):
+        add_user(db, f"user{i}", hashed_password)
+
+    async def run():
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async def login(i: int):
+                response = await http.post("/api/auth/login", json={"username": f"user{i}", "password": PASSWORD})
+                assert response.status_code == 200
+
+            async def cheap_request() -> float:
+                await asyncio.sleep(0.05)  # once the logins are queued
+                started = time.perf_counter()
+                assert (await http.get("/api/home/stats")).status_code == 200
+                return time.perf_counter() - started
+
+            started = time.perf_counter()
+            *_, cheap_seconds = await asyncio.gather(*(login(i) for i in range(logins)), cheap_request())
+            return logins / (time.perf_counter() - started), cheap_seconds
+
+    throughput, cheap_seconds = asyncio.run(run())
+    print(f"bcrypt cost {settings.PASSWORD_BCRYPT_ROUNDS}, {settings.PASSWORD_HASH_WORKERS} workers: "
+          f"{throughput:.1f} logins/s; a concurrent stats read took {cheap_seconds * 1000:.0f} ms")
@@ -0,0 +1,69 @@
+import uuid
+from uuid import UUID
+from app.models import Answer, Question
+from app.services.post_count_service import PostCountService
+from tests.conftest import auth_headers
+
+
+def counts(db, qid, aid=None) -> tuple:
+    question = db.query(Question.answer_count, Question.accepted_aid).filter(Question.qid == qid).one()
+    accepted = str(question.accepted_aid) if question.accepted_aid else None
+    if aid is None:
+        return question.answer_count, accepted
+    comment_count = db.query(Answer.comment_count).filter(Answer.aid == aid).scalar()
+    return question.answer_count, accepted, comment_count
+
+
+def test_counts_follow_answers_comments_and_acceptance(client, db, make_user):
+    author, first, second = (auth_headers(make_user(name)) for name in ("author", "first", "second"))
+    qid = client.post("/api/question/", json={"title": "How?", "desc": "desc", "tags": "python"},
+                      headers=author).json()["qid"]
+    aid = client.post("/api/answer/", json={"qid": qid, "content": "one"}, headers=first).json()["aid"]
+    client.post("/api/answer/", json={"qid": qid, "content": "two"}, headers=second)
+    cids = [client.post(f"/api/comments/{aid}", json={"message": f"comment {i}"}, headers=author).json()["cid"]
+            for i in range(2)]
+    assert counts(db, UUID(qid), UUID(aid)) == (2, None, 2)
+
+    assert client.delete(f"/api/comments/{cids[0]}", headers=author).status_code == 204
+    assert client.post(f"/api/answer/{aid}/accept", headers=author).status_code == 200
+    assert counts(db, UUID(qid), UUID(aid)) == (2, aid, 1)
+
+    assert client.post(f"/api/answer/{aid}/unaccept", headers=author).status_code == 200
+    assert counts(db, UUID(qid)) == (2, None)
+    client.post(f"/api/answer/{aid}/accept", headers=author)
+    # Deleting the accepted answer clears it from the question
+    assert client.delete(f"/api/answer/{aid}", headers=first).status_code == 204
+    assert counts(db, UUID(qid)) == (1, None)
+
+
+def test_a_rolled_back_write_leaves_the_counts_alone(db, make_user):
+    author = make_user("author")
+    question = Question(username=author.username, userid=author.id, title="How?", desc="desc")
+    db.add(question)
+    db.commit()
+
+    PostCountService(db).answer_added(question.qid)
+    db.rollback()
+
+    assert counts(db, question.qid) == (0, None)
+
+
+def test_repair_recounts_drifted_posts_in_batches(client, db, make_user):
+    author = auth_headers(make_user("author"))
+    qids = [client.post("/api/question/", json={"title": f"Q{i}", "desc": "desc", "tags": "python"},
+                        headers=author).json()["qid"] for i in range(3)]
+    aid = client.post("/api/answer/", json={"qid": qids[0], "content": "one"},
+                      headers=auth_headers(make_user("answerer"))).json()["aid"]
+    client.post(f"/api/answer/{aid}/accept", headers=author)
+    client.post(f"/api/comments/{aid}", json={"message": "thanks"}, headers=author)
+    # Drift, e.g. from rows changed outside the service
+    db.query(Question).filter(Question.qid == UUID(qids[0])).update({"answer_count": 5, "accepted_aid": None})
+    db.query(Question).filter(Question.qid == UUID(qids[1])).update({"accepted_aid": uuid.uuid4()})
+    db.query(Answer).filter(Answer.aid == UUID(aid)).update({"comment_count": 0})
+    db.commit()
+
+    assert PostCountService(db).repair(batch_size=1) == 3
+
+    assert counts(db, UUID(qids[0]), UUID(aid)) == (1, aid, 1)
+    assert counts(db, UUID(qids[1])) == counts(db, UUID(qids[2])) == (0, None)
+    assert PostCountService(db).repair(batch_size=1) == 0
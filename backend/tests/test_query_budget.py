@@ -0,0 +1,63 @@
+from uuid import UUID
+from app.services.question_service import QuestionService
+from tests.conftest import auth_headers, count_queries
+
+
+def post_question(client, author) -> UUID:
+    response = client.post("/api/question/", json={"title": "Title", "desc": "desc", "tags": "python"},
+                           headers=auth_headers(author))
+    assert response.status_code == 200
+    return UUID(response.json()["qid"])
+
+
+def post_answer(client, author, qid: UUID) -> UUID:
+    response = client.post("/api/answer/", json={"qid": str(qid), "content": "answer"}, headers=auth_headers(author))
+    assert response.status_code == 201
+    return UUID(response.json()["aid"])
+
+
+def post_comments(client, commenters, aid: UUID):
+    for commenter in commenters:
+        response = client.post(f"/api/comments/{aid}", json={"message": "comment"}, headers=auth_headers(commenter))
+        assert response.status_code == 201
+
+
+def test_comment_page_query_count_does_not_grow_with_authors(client, make_user):
+    author = make_user("author")
+    commenters = [make_user(f"commenter{i}") for i in range(10)]
+    qid = post_question(client, author)
+    few, many = post_answer(client, author, qid), post_answer(client, author, qid)
+    post_comments(client, commenters[:3], few)
+    post_comments(client, commenters, many)
+
+    with count_queries() as few_queries:
+        few_response = client.get(f"/api/comments/{few}")
+    with count_queries() as many_queries:
+        many_response = client.get(f"/api/comments/{many}")
+
+    assert len(few_response.json()) == 3
+    assert len(many_response.json()) == 10
+    assert [c["username"] for c in many_response.json()] == [c.username for c in commenters]
+    assert len(many_queries) == len(few_queries)
+
+
+def test_question_page_runs_a_fixed_number_of_queries(client, db, make_user):
+    author = make_user("author")
+    commenters = [make_user(f"commenter{i}") for i in range(4)]
+    small_qid = post_question(client, author)
+    post_comments(client, commenters[:1], post_answer(client, author, small_qid))
+    large_qid = post_question(client, author)
+    for _ in range(5):
+        post_comments(client, commenters, post_answer(client, author, large_qid))
+
+    service = QuestionService(db)
+    with count_queries() as small_queries:
+        small_page = service.page(small_qid, author.id, comments_per_answer=2)
+    with count_queries() as large_queries:
+        large_page = service.page(large_qid, author.id, comments_per_answer=2)
+
+    assert len(small_page["answers"]) == 1
+    assert len(large_page["answers"]) == 5
+    assert all(len(a["comments"]) == 2 and a["total_comments"] == 4 for a in large_page["answers"])
+    # Question, answers, first comments and the caller's votes
+    assert len(small_queries) == len(large_queries) == 4
@@ -0,0 +1,102 @@
+import json
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.database import engine
+from app.models import Answer, Notification, Question
+from tests.conftest import auth_headers
+
+QUESTIONS = 30
+ANSWERS_PER_QUESTION = 5
+NOTIFICATIONS_PER_USER = 20
+
+
+@contextmanager
+def captured_selects():
+    """Collects the (statement, parameters) of the SELECTs the engine runs inside the block."""
+    selects = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield selects
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _postgres_seq_scans(connection, statement, parameters):
+    # With sequential scans priced out, the planner still picks one only where no index applies
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, scans = [plan[0]["Plan"]], []
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def _sqlite_seq_scans(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row.detail for row in rows if row.detail.startswith("SCAN ") and " INDEX " not in row.detail]
+
+
+def seq_scans(statement, parameters):
+    """Tables the statement's plan reads with a full sequential scan."""
+    with engine.connect() as connection, connection.begin():
+        if engine.dialect.name == "postgresql":
+            return _postgres_seq_scans(connection, statement, parameters)
+        return _sqlite_seq_scans(connection, statement, parameters)
+
+
+@pytest.fixture
+def seeded(db, make_user):
+    reader, author = make_user("reader"), make_user("author")
+    start = datetime.utcnow() - timedelta(days=1)
+    questions = [
+        Question(username=author.username, userid=author.id, title=f"Question {i}", desc="desc",
+                 tags="python", votes=i % 7, created_at=start + timedelta(minutes=i))
+        for i in range(QUESTIONS)
+    ]
+    db.add_all(questions)
+    db.flush()
+    db.add_all([
+        Answer(qid=q.qid, userid=author.id, username=author.username, content="answer", votes=i,
+               accepted=i == 0, created_at=start + timedelta(minutes=i))
+        for q in questions for i in range(ANSWERS_PER_QUESTION)
+    ])
+    db.add_all([
+        Notification(userid=user.id, content="notification", type=1, is_read=i % 2 == 0,
+                     created_at=start + timedelta(minutes=i))
+        for user in (reader, author) for i in range(NOTIFICATIONS_PER_USER)
+    ])
+    db.commit()
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE")
+    return {"reader": reader, "qid": questions[0].qid}
+
+
+@pytest.mark.parametrize("path", [
+    "/api/question/?sort=latest",
+    "/api/question/?sort=most_popular",
+    "/api/question/?sort=trending",
+    "/api/answer/question/{qid}",
+    "/api/notification/",
+    "/api/notification/?unread_only=true",
+])
+def test_read_paths_use_indexes(client, seeded, path):
+    with captured_selects() as selects:
+        response = client.get(path.format(qid=seeded["qid"]), headers=auth_headers(seeded["reader"]))
+    assert response.status_code == 200
+    assert selects
+
+    for statement, parameters in selects:
+        assert seq_scans(statement, parameters) == [], statement
@@ -0,0 +1,31 @@
+import importlib.util
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from app.services.ranking_service import HOT_SCORE_EPOCH, hot_score
+
+MIGRATION = Path(__file__).parents[1] / "migrations" / "versions" / "d2a7b5e38c14_question_hot_score.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("question_hot_score_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_missing_created_at_scores_from_the_epoch():
+    assert hot_score(10, None) == hot_score(10, HOT_SCORE_EPOCH)
+    assert hot_score(None, None) == 0
+
+
+def test_newer_and_more_voted_questions_rank_higher():
+    now = datetime(2026, 6, 1)
+    assert hot_score(0, now) > hot_score(0, now - timedelta(days=1))
+    assert hot_score(100, now) > hot_score(10, now) > hot_score(-10, now)
+
+
+@pytest.mark.parametrize("votes", [None, -25, 0, 1, 3, 1000])
+@pytest.mark.parametrize("created_at", [None, HOT_SCORE_EPOCH, datetime(2026, 3, 14, 15, 9, 26)])
+def test_matches_the_migration_backfill(votes, created_at):
+    assert hot_score(votes, created_at) == load_migration()._hot_score(votes, created_at)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import time
+import httpx
+import pytest
+from app.cache import RedisCache, response_cache
+from app.config import settings
+from app.database import async_engine
+from app.services.notification_pipeline import pipeline
+from tests.conftest import auth_headers, count_queries, make_app
+
+# These tests also run with DATABASE_ASYNC=true, see test_async_mode.py
+
+
+def test_question_flow(client, db, make_user):
+    author, reader, admin = (
+        auth_headers(user) for user in (make_user("author"), make_user("reader"), make_user("admin", admin=True))
+    )
+
+    with count_queries() as sync_statements:
+        qid = client.post("/api/question/", json={"title": "How?", "desc": "<p>Like this</p>", "tags": "python"},
+                          headers=author).json()["qid"]
+        aid = client.post("/api/answer/", json={"qid": qid, "content": "Like that"},
+                          headers=reader).json()["aid"]
+        assert client.post(f"/api/comments/{aid}", json={"message": "Thanks"},
+                           headers=author).status_code == 201
+        assert client.post(f"/api/vote/question/{qid}", json={"is_upvote": True},
+                           headers=reader).json()["total_votes"] == 1
+        assert client.post(f"/api/vote/answer/{aid}", json={"is_upvote": True},
+                           headers=author).json()["total_votes"] == 1
+
+        # Cached read: the second call is served from the response cache
+        first, second = (client.get(f"/api/question/{qid}") for _ in range(2))
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+
+        page = client.get(f"/api/question/{qid}/full", headers=reader).json()
+        assert (page["votes"], page["user_vote"], page["total_answers"]) == (1, True, 1)
+        assert [c["username"] for c in page["answers"][0]["comments"]] == ["author"]
+        assert [q["qid"] for q in client.get("/api/home/").json()] == [qid]
+
+        assert client.get("/api/user/all", headers=reader).status_code == 403
+        assert client.get("/api/user/all", headers=admin).json()["total"] == 3
+
+    if settings.DATABASE_ASYNC:
+        # Endpoints and their auth both ran on the request's AsyncSession
+        assert sync_statements == []
+
+    pipeline.process(db)
+    # The author hears about the answer, the answerer about the comment
+    for headers in (author, reader):
+        assert client.get("/api/notification/", headers=headers).json()["unread_count"] == 1
+
+
+def test_missing_or_bad_tokens_are_rejected(client, make_user):
+    qid = client.post("/api/question/", json={"title": "How?", "desc": "desc", "tags": "python"},
+                      headers=auth_headers(make_user("author"))).json()["qid"]
+
+    assert client.post(f"/api/vote/question/{qid}", json={"is_upvote": True}).status_code == 403
+    assert client.get("/api/notification/", headers={"Authorization": "Bearer nope"}).status_code == 401
+    # Optional auth: a bad token reads as anonymous
+    page = client.get(f"/api/question/{qid}/full", headers={"Authorization": "Bearer nope"})
+    assert page.status_code == 200
+    assert page.json()["user_vote"] is None
+
+
+class RecordingRedis:
+    """Enough of the redis-py API for RedisCache, noting whether each call ran on an event loop."""
+
+    def __init__(self):
+        self.values = {}
+        self.calls_on_loop = []
+
+    def _record(self, name: str):
+        try:
+            asyncio.get_running_loop()
+            self.calls_on_loop.append((name, True))
+        except RuntimeError:
+            self.calls_on_loop.append((name, False))
+
+    def get(self, key):
+        self._record("get")
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self._record("set")
+        self.values[key] = value
+
+    def delete(self, key):
+        self._record("delete")
+        self.values.pop(key, None)
+
+    def incr(self, key):
+        self._record("incr")
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def mget(self, keys):
+        self._record("mget")
+        return [self.values.get(key) for key in keys]
+
+
+def test_blocking_cache_calls_stay_off_the_event_loop(client, make_user, monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(response_cache, "backend", RedisCache(redis))
+    qid = client.post("/api/question/", json={"title": "How?", "desc": "desc", "tags": "python"},
+                      headers=auth_headers(make_user("author"))).json()["qid"]
+
+    for _ in range(2):
+        assert client.get(f"/api/question/{qid}").status_code == 200
+        assert client.get("/api/home/").status_code == 200
+
+    assert {name for name, _ in redis.calls_on_loop} >= {"get", "set", "mget", "incr"}
+    assert [name for name, on_loop in redis.calls_on_loop if on_loop] == []
+
+
+@pytest.mark.slow
+def test_read_throughput(client, make_user):
+    """Requests per second for concurrent page and notification reads, in the configured mode."""
+    requests, concurrency = 600, 50
+    readers = [auth_headers(make_user(f"reader{i}")) for i in range(concurrency)]
+    qid = client.post("/api/question/", json={"title": "How?", "desc": "desc", "tags": "python"},
+                      headers=auth_headers(make_user("author"))).json()["qid"]
+    for reader in readers[:10]:
+        client.post("/api/answer/", json={"qid": qid, "content": "answer"}, headers=reader)
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async def read(i: int):
+                path = f"/api/question/{qid}/full" if i % 2 else "/api/notification/"
+                assert (await http.get(path, headers=readers[i % concurrency])).status_code == 200
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def limited(i: int):
+                async with semaphore:
+                    await read(i)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(limited(i) for i in range(requests)))
+            elapsed = time.perf_counter() - started
+        if async_engine is not None:
+            await async_engine.dispose()
+        return requests / elapsed
+
+    throughput = asyncio.run(run())
+    mode = "async" if settings.DATABASE_ASYNC else "sync"
+    print(f"{mode}: {throughput:.0f} requests/s")
+    if os.environ.get("BENCHMARK_OUTPUT"):
+        with open(os.environ["BENCHMARK_OUTPUT"], "w") as output:
+            json.dump({"mode": mode, "requests_per_second": throughput}, output)
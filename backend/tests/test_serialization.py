@@ -0,0 +1,66 @@
+import json
+import time
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.models import Question
+from app.schemas.question_schemas import QuestionListItem
+from app.serialization import json_response, rows_to_dicts
+from app.services.question_service import LISTING_FIELDS, QuestionService
+
+ITEMS = 50
+
+
+def response_model_body(questions) -> bytes:
+    """What the endpoints sent before: response_model validation, jsonable_encoder, json.dumps."""
+    items = TypeAdapter(List[QuestionListItem]).validate_python(questions, from_attributes=True)
+    return JSONResponse(jsonable_encoder(items)).body
+
+
+def add_questions(db, user) -> None:
+    created_at = datetime(2026, 3, 14, 15, 9, 26, 535897)
+    for i in range(ITEMS):
+        db.add(Question(
+            username=user.username, userid=user.id, title=f"Question {i} \"quoted\" ünïcode", desc="<p>desc</p>",
+            excerpt=f"excerpt {i}", votes=i - 10, answer_count=i % 3, is_closed=i % 7 == 0,
+            accepted_aid=uuid.uuid4() if i % 2 else None, tags="python,sql" if i % 4 else None,
+            image_path=f"/uploads/{i}.png" if i % 5 == 0 else None,
+            # Whole seconds too: both encoders must agree on dropping the zero microseconds
+            created_at=created_at - timedelta(hours=i, microseconds=0 if i % 3 else created_at.microsecond)
+        ))
+    db.commit()
+
+
+def test_json_response_matches_the_response_model_output(client, db, make_user):
+    add_questions(db, make_user("author"))
+    order = (Question.created_at.desc(), Question.qid.desc())
+    rows = QuestionService(db).listing_query().order_by(*order).all()
+    entities = db.query(Question).order_by(*order).all()
+
+    expected = json.loads(response_model_body(entities))
+    assert json.loads(json_response(rows_to_dicts(rows, LISTING_FIELDS)).body) == expected
+    assert client.get("/api/home/", params={"sort": "latest", "per_page": ITEMS}).json() == expected
+
+
+@pytest.mark.slow
+def test_list_serialization_speed(db, make_user):
+    """Per-item cost of a 50-item listing through both paths."""
+    add_questions(db, make_user("author"))
+    rows = QuestionService(db).listing_query().all()
+    entities = db.query(Question).all()
+    rounds = 200
+
+    def per_item_us(serialize) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            serialize()
+        return (time.perf_counter() - started) / (rounds * ITEMS) * 1e6
+
+    before = per_item_us(lambda: response_model_body(entities))
+    after = per_item_us(lambda: json_response(rows_to_dicts(rows, LISTING_FIELDS)).body)
+    print(f"response_model + jsonable_encoder: {before:.1f} us/item; rows_to_dicts + orjson: {after:.1f} us/item")
+    assert after < before
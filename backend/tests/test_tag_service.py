@@ -0,0 +1,28 @@
+from datetime import datetime
+from app.models import TagActivity
+from app.services import tag_service
+from app.services.tag_service import TagService
+
+NOW = datetime(2026, 6, 1, 12, 30)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+def test_trending_counts_only_whole_buckets_inside_the_window(db, monkeypatch):
+    monkeypatch.setattr(tag_service, "datetime", FrozenDatetime)
+    # The window starts at 2026-05-25 12:30, inside the 12:00 bucket
+    db.add_all([
+        TagActivity(bucket_start=datetime(2026, 5, 25, 11), tag="expired", question_count=5),
+        TagActivity(bucket_start=datetime(2026, 5, 25, 12), tag="partial", question_count=4),
+        TagActivity(bucket_start=datetime(2026, 5, 25, 13), tag="python", question_count=2),
+        TagActivity(bucket_start=datetime(2026, 6, 1, 12), tag="python", question_count=1),
+        TagActivity(bucket_start=datetime(2026, 6, 1, 12), tag="sql", question_count=1),
+        TagActivity(bucket_start=datetime(2026, 6, 1, 12), tag="deleted", question_count=0),
+    ])
+    db.commit()
+
+    assert TagService(db).trending_tags(10) == [("python", 3), ("sql", 1)]
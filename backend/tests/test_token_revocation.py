@@ -0,0 +1,82 @@
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from app import token_revocation
+from app.config import settings
+from app.metrics import metrics
+from app.models import TokenFamily
+from app.token_revocation import BloomFilter, TokenRevocations, revoke_family
+
+
+@pytest.fixture
+def revocations(db, monkeypatch):
+    """A fresh filter in place of this worker's, loaded from the (empty) table."""
+    revocations = TokenRevocations(1 << 16, 7)
+    revocations.rebuild(db)
+    monkeypatch.setattr(token_revocation, "token_revocations", revocations)
+    return revocations
+
+
+def add_family(db, revoked_at=None) -> TokenFamily:
+    family = TokenFamily(expires_at=datetime.utcnow() + timedelta(days=1), revoked_at=revoked_at)
+    db.add(family)
+    db.commit()
+    return family
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1 << 16, 7)
+    added = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in added:
+        bloom.add(key)
+
+    assert all(bloom.might_contain(key) for key in added)
+    false_positives = sum(bloom.might_contain(str(uuid.uuid4())) for _ in range(10000))
+    assert false_positives < 100
+
+
+def test_revocations_reach_this_workers_filter_on_commit_only(db, revocations):
+    rolled_back, committed = add_family(db), add_family(db)
+
+    revoke_family(db, rolled_back)
+    db.rollback()
+    revoke_family(db, committed)
+    db.commit()
+
+    assert not revocations.is_revoked(str(rolled_back.family_id))
+    assert revocations.is_revoked(str(committed.family_id))
+
+
+def test_a_filter_hit_reads_the_table_once():
+    # One bit: every family is a "maybe"
+    revocations = TokenRevocations(1, 1)
+    revocations._filter = BloomFilter(1, 1)
+    revocations._filter.add("anything")
+    lookups = metrics.get("token_revocations.lookups")
+
+    family_id = str(uuid.uuid4())
+    assert not revocations.is_revoked(family_id)
+    assert not revocations.is_revoked(family_id)
+
+    assert metrics.get("token_revocations.lookups") == lookups + 1
+
+
+def test_sync_catches_revocations_committed_out_of_order_within_the_overlap(db, revocations):
+    overlap = timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+    newest = datetime.utcnow()
+    # Another worker's revocations, written straight to the table
+    seen = add_family(db, revoked_at=newest)
+    revocations.sync(db)
+    assert revocations.is_revoked(str(seen.family_id))
+
+    # Stamped before the newest one seen, but committed after the last sync
+    late = add_family(db, revoked_at=newest - overlap / 2)
+    too_late = add_family(db, revoked_at=newest - overlap * 2)
+    revocations.sync(db)
+
+    assert revocations.is_revoked(str(late.family_id))
+    # Beyond the overlap: TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS must exceed the longest revoking transaction
+    assert not revocations.is_revoked(str(too_late.family_id))
+    # The hourly rebuild reloads the whole window
+    revocations.rebuild(db)
+    assert revocations.is_revoked(str(too_late.family_id))
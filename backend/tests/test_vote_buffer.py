@@ -0,0 +1,86 @@
+import pytest
+from app.config import settings
+from app.models import Answer, Question
+from app.services.ranking_service import hot_score
+from app.services.vote_buffer import VoteBuffer, vote_buffer
+from app.services.vote_service import VoteService
+from tests.conftest import count_queries
+
+
+@pytest.fixture
+def buffered(db, monkeypatch):
+    monkeypatch.setattr(settings, "VOTE_BUFFER_ENABLED", True)
+    yield vote_buffer
+    vote_buffer.flush(db)
+
+
+@pytest.fixture
+def posts(db, make_user):
+    author = make_user("author")
+    question = Question(username=author.username, userid=author.id, title="Title", desc="desc", tags="python")
+    db.add(question)
+    db.flush()
+    answer = Answer(qid=question.qid, userid=author.id, username=author.username, content="answer")
+    db.add(answer)
+    db.commit()
+    return question, answer
+
+
+def test_committed_votes_are_merged_into_one_update_per_post(db, make_user, buffered, posts):
+    question, answer = posts
+    voters = [make_user(f"voter{i}") for i in range(5)]
+    total = 0
+    for i, voter in enumerate(voters):
+        total += 1 if i else -1
+        # Reports the total including what is still pending
+        assert VoteService(db).cast(voter.id, question.qid, False, i != 0) == (True, total)
+        VoteService(db).cast(voter.id, answer.aid, True, True)
+        db.commit()
+
+    db.refresh(question)
+    assert (question.votes, question.upvotes, question.downvotes) == (0, 0, 0)
+    assert buffered.pending_delta(False, question.qid) == (4, 1)
+    assert buffered.pending_delta(True, answer.aid) == (5, 0)
+
+    with count_queries() as statements:
+        assert buffered.flush(db) == 2
+
+    assert len([s for s in statements if s.lstrip().startswith("UPDATE question SET votes")]) == 1
+    assert len([s for s in statements if s.lstrip().startswith("UPDATE answers SET votes")]) == 1
+    db.refresh(question)
+    db.refresh(answer)
+    assert (question.votes, question.upvotes, question.downvotes) == (3, 4, 1)
+    assert question.hot_score == hot_score(3, question.created_at)
+    assert (answer.votes, answer.upvotes, answer.downvotes) == (5, 5, 0)
+    assert buffered.pending_delta(False, question.qid) == (0, 0)
+
+
+def test_rolled_back_votes_never_reach_the_buffer(db, make_user, buffered, posts):
+    question, _ = posts
+    voter = make_user("voter")
+
+    VoteService(db).cast(voter.id, question.qid, False, True)
+    db.rollback()
+
+    assert buffered.pending_delta(False, question.qid) == (0, 0)
+    assert buffered.flush(db) == 0
+
+
+def test_a_failed_flush_keeps_the_deltas_for_the_next_one(db, posts, monkeypatch):
+    question, _ = posts
+    buffer = VoteBuffer(flush_interval_ms=1000, max_pending=100)
+    buffer.add(False, question.qid, 2, 0)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "execute", fail)
+        with pytest.raises(RuntimeError):
+            buffer.flush(db)
+    buffer.add(False, question.qid, 1, 1)
+    assert buffer.pending_delta(False, question.qid) == (3, 1)
+
+    assert buffer.flush(db) == 1
+    db.refresh(question)
+    assert (question.votes, question.upvotes, question.downvotes) == (2, 3, 1)
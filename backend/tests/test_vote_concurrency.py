@@ -0,0 +1,83 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Answer, Question, Users, Votes
+from app.services.vote_service import VoteService
+
+VOTERS = 24
+# The load test's size; point TEST_DATABASE_URL at Postgres to run it where row locks matter
+LOAD_VOTERS = int(os.environ.get("VOTE_LOAD_VOTERS", 2000))
+# As many workers as the pool can serve at once, so checkouts don't time out
+LOAD_WORKERS = int(os.environ.get("VOTE_LOAD_WORKERS", settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW))
+
+
+@pytest.fixture
+def posts(db, make_user):
+    author = make_user("author")
+    question = Question(username=author.username, userid=author.id, title="Title", desc="desc", tags="python")
+    db.add(question)
+    db.flush()
+    answer = Answer(qid=question.qid, userid=author.id, username=author.username, content="answer")
+    db.add(answer)
+    db.commit()
+    return {False: question.qid, True: answer.aid}
+
+
+def add_voters(db, count: int) -> list:
+    voters = [Users(username=f"voter{i}", email=f"voter{i}@example.com", password="x") for i in range(count)]
+    db.add_all(voters)
+    db.commit()
+    return [voter.id for voter in voters]
+
+
+def cast_in_parallel(post_id, is_answer: bool, voter_ids: list, workers: int) -> None:
+    """Every voter double-clicks (even voters upvote, odd voters downvote), `workers` ballots at a time."""
+    ballots = [(user_id, i % 2 == 0) for i, user_id in enumerate(voter_ids) for _ in range(2)]
+    start = Barrier(workers)
+
+    def vote(ballot):
+        user_id, is_upvote = ballot
+        session = SessionLocal()
+        try:
+            VoteService(session).cast(user_id, post_id, is_answer, is_upvote)
+            session.commit()
+        finally:
+            session.close()
+
+    def worker(offset: int):
+        start.wait()
+        # Neighbouring ballots (a voter's two clicks) land on different workers at about the same time
+        for ballot in ballots[offset::workers]:
+            vote(ballot)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(worker, range(workers)))
+
+
+def assert_each_voter_counted_once(db, post_id, is_answer: bool, voters: int) -> None:
+    model, key = (Answer, Answer.aid) if is_answer else (Question, Question.qid)
+    post = db.query(model).filter(key == post_id).one()
+    upvoters = sum(1 for i in range(voters) if i % 2 == 0)
+    downvoters = voters - upvoters
+    assert db.query(Votes).filter(Votes.id == post_id, Votes.is_answer == is_answer).count() == voters
+    assert (post.upvotes, post.downvotes) == (upvoters, downvoters)
+    assert post.votes == upvoters - downvoters
+
+
+@pytest.mark.parametrize("is_answer", [False, True], ids=["question", "answer"])
+def test_parallel_votes_count_each_voter_once(db, posts, is_answer):
+    voter_ids = add_voters(db, VOTERS)
+    # All ballots at once
+    cast_in_parallel(posts[is_answer], is_answer, voter_ids, workers=2 * VOTERS)
+    assert_each_voter_counted_once(db, posts[is_answer], is_answer, VOTERS)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("is_answer", [False, True], ids=["question", "answer"])
+def test_thousands_of_parallel_votes(db, posts, is_answer):
+    voter_ids = add_voters(db, LOAD_VOTERS)
+    cast_in_parallel(posts[is_answer], is_answer, voter_ids, workers=LOAD_WORKERS)
+    assert_each_voter_counted_once(db, posts[is_answer], is_answer, LOAD_VOTERS)
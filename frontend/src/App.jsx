@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useState, useEffect } from 'react'
 import './App.css'
 import './styles/dark-mode-overrides.css'
 import Nav from "./components/Nav"
@@ -16,11 +16,15 @@ import Profile from './pages/Profile'
 import AdminPanel from './pages/AdminPanel'
 import Notifications from './pages/Notifications'
 import { Toaster } from 'react-hot-toast'
+import { startTokenRefresh } from './services/tokenRefresher'
 
 
 function App() {
   const [count, setCount] = useState(0)
 
+  // Keep the short-lived access token fresh while the app is open
+  useEffect(() => startTokenRefresh(), [])
+
   return (
     <>
       <Toaster 
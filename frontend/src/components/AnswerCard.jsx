@@ -4,7 +4,7 @@ import Votes from "./Votes";
 import axios from "axios";
 import config from "../config/config.js";
 
-const AnswerCard = ({ answerId, content, votes, username, accepted, qid, onAcceptToggle }) => {
+const AnswerCard = ({ answerId, content, votes, userVote, username, accepted, qid, onAcceptToggle }) => {
     const [showCommentBox, setShowCommentBox] = useState(false);
     const [commentText, setCommentText] = useState("");
     const [comments, setComments] = useState([]);
@@ -102,7 +102,7 @@ const AnswerCard = ({ answerId, content, votes, username, accepted, qid, onAccep
 
     return (
         <div className={`flex gap-4 bg-white dark:bg-gray-800 border dark:border-gray-700 p-4 rounded-lg shadow-sm mb-4 ${accepted ? 'border-green-500 dark:border-green-400 bg-green-50 dark:bg-green-900/20' : ''}`}>
-            <Votes vote={votes || 0} itemId={answerId} isAnswer={true} />
+            <Votes vote={votes || 0} userVote={userVote} itemId={answerId} isAnswer={true} />
             
             <div className="flex-1">
                 {accepted && (
@@ -5,6 +5,7 @@ import { Button, Navbar, NavbarBrand, NavbarCollapse, NavbarToggle } from "flowb
 import { Link } from "react-router-dom";
 import NotificationDropdown from "./NotificationDropdown";
 import config from "../config/config.js";
+import { logout } from "../services/tokenRefresher.js";
 
 export default function Nav() {
     const [isLoggedIn, setIsLoggedIn] = useState(false);
@@ -37,18 +38,13 @@ export default function Nav() {
         };
     }, []);
 
-    const handleLogout = () => {
-        localStorage.removeItem(config.IS_LOGGED_IN_KEY);
-        localStorage.removeItem(config.USER_KEY);
-        localStorage.removeItem(config.TOKEN_KEY);
-        localStorage.removeItem(config.USERNAME_KEY);
+    const handleLogout = async () => {
+        // Revokes the refresh token, clears the stored login and notifies other components
+        await logout();
         
         setIsLoggedIn(false);
         setUser({});
         
-        // Dispatch custom event to notify other components
-        window.dispatchEvent(new Event('loginStateChanged'));
-        
         // Redirect to home page
         window.location.href = "/";
     };
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { FaBell } from 'react-icons/fa';
 import { Link } from 'react-router-dom';
 import notificationService from '../services/notificationService';
+import { TOKEN_REFRESHED_EVENT } from '../services/tokenRefresher';
 import config from '../config/config.js';
 
 const NotificationDropdown = () => {
@@ -11,9 +12,68 @@ const NotificationDropdown = () => {
 
     useEffect(() => {
         fetchNotifications();
-        // Poll for new notifications using config interval
-        const interval = setInterval(fetchNotifications, config.NOTIFICATION_POLL_INTERVAL);
-        return () => clearInterval(interval);
+
+        let source = null;
+        let interval = null;
+
+        // Fallback: poll for new notifications using config interval
+        const startPolling = () => {
+            if (!interval) {
+                interval = setInterval(fetchNotifications, config.NOTIFICATION_POLL_INTERVAL);
+            }
+        };
+
+        // New notifications are pushed by the server. The stream URL carries the access
+        // token, so it is reopened whenever the token is rotated
+        const connect = () => {
+            if (source) source.close();
+            source = null;
+            const token = localStorage.getItem(config.TOKEN_KEY);
+            if (!token || !window.EventSource) {
+                startPolling();
+                return;
+            }
+            source = new EventSource(
+                `${config.API_BASE_URL}/notification/stream?token=${encodeURIComponent(token)}`
+            );
+            source.addEventListener('notification', (event) => {
+                const notification = JSON.parse(event.data);
+                // A grouped notification ("3 people answered ...") replaces its earlier version
+                setNotifications(prev => [notification, ...prev.filter(n => n.nid !== notification.nid)].slice(0, 5));
+                if (notification.actor_count === 1) {
+                    setUnreadCount(prev => prev + 1);
+                }
+            });
+            source.addEventListener('open', () => {
+                if (interval) {
+                    clearInterval(interval);
+                    interval = null;
+                    fetchNotifications();
+                }
+            });
+            // EventSource retries dropped connections itself, but gives up on an error
+            // response (e.g. an expired token): poll until the next token rotation
+            source.addEventListener('error', (event) => {
+                if (event.target.readyState === EventSource.CLOSED) {
+                    startPolling();
+                }
+            });
+        };
+
+        // Rotated by this tab, or by another tab through the shared localStorage
+        const onStorage = (event) => {
+            if (event.key === config.TOKEN_KEY) connect();
+        };
+        connect();
+        window.addEventListener(TOKEN_REFRESHED_EVENT, connect);
+        window.addEventListener('storage', onStorage);
+
+        return () => {
+            window.removeEventListener(TOKEN_REFRESHED_EVENT, connect);
+            window.removeEventListener('storage', onStorage);
+            if (source) source.close();
+            if (interval) clearInterval(interval);
+        };
     }, []);
 
     const fetchNotifications = async () => {
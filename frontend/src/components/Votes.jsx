@@ -3,36 +3,17 @@ import { FaArrowUp, FaArrowDown } from 'react-icons/fa';
 import axios from 'axios';
 import config from '../config/config.js';
 
-const Votes = ({ vote: initialVote, handleVote, itemId, isAnswer = false }) => {
+// Vote counts and the user's own vote come from the page (question pages fetch them all at once
+// from /vote/question/{qid}/page-stats), so a list of posts doesn't cost a stats request per post.
+const Votes = ({ vote: initialVote, userVote: initialUserVote = null, handleVote, itemId, isAnswer = false }) => {
     const [vote, setVote] = useState(initialVote || 0);
-    const [userVote, setUserVote] = useState(null); // null, true (upvote), false (downvote)
+    const [userVote, setUserVote] = useState(initialUserVote); // null, true (upvote), false (downvote)
     const [loading, setLoading] = useState(false);
 
     useEffect(() => {
-        fetchVoteStats();
-    }, [itemId]);
-
-    const fetchVoteStats = async () => {
-        try {
-            const token = localStorage.getItem(config.TOKEN_KEY);
-            if (!token) return;
-
-            const endpoint = isAnswer 
-                ? `${config.API_BASE_URL}/vote/answer/${itemId}/stats`
-                : `${config.API_BASE_URL}/vote/question/${itemId}/stats`;
-
-            const response = await axios.get(endpoint, {
-                headers: {
-                    Authorization: `Bearer ${token}`,
-                },
-            });
-
-            setVote(response.data.total_votes);
-            setUserVote(response.data.user_vote);
-        } catch (error) {
-            console.error("Error fetching vote stats:", error);
-        }
-    };
+        setVote(initialVote || 0);
+        setUserVote(initialUserVote);
+    }, [itemId, initialVote, initialUserVote]);
 
     const handleVoteClick = async (isUpvote) => {
         if (loading) return;
@@ -90,7 +71,9 @@ const Votes = ({ vote: initialVote, handleVote, itemId, isAnswer = false }) => {
                 },
             });
 
-            fetchVoteStats(); // Refresh stats
+            // 204 No Content: take the retracted vote back out locally
+            setVote(vote - (userVote ? 1 : -1));
+            setUserVote(null);
         } catch (error) {
             console.error("Error removing vote:", error);
         } finally {
@@ -5,6 +5,7 @@ const config = {
     
     // Authentication Configuration
     TOKEN_KEY: 'token',
+    REFRESH_TOKEN_KEY: 'refreshToken',
     USER_KEY: 'user',
     USERNAME_KEY: 'username',
     IS_LOGGED_IN_KEY: 'isLoggedIn',
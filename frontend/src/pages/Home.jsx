@@ -10,7 +10,6 @@ export default function Home() {
     const [selectedTag, setSelectedTag] = useState("All");
     const [sort, setSort] = useState("trending");
     const [questions, setQuestions] = useState([]);
-    const [questionsWithAnswerCount, setQuestionsWithAnswerCount] = useState([]);
     const [loading, setLoading] = useState(false);
     const [currentPage, setCurrentPage] = useState(1);
     const postsPerPage = 5;
@@ -25,9 +24,6 @@ export default function Home() {
             const response = await axios.get(`${config.API_BASE_URL}/home/?sort=${sort}&page=${currentPage}&per_page=${postsPerPage}`);
             const questionsData = response.data;
             setQuestions(questionsData);
-            
-            // Fetch answer counts for each question
-            await fetchAnswerCounts(questionsData);
         } catch (error) {
             console.error("Error fetching questions:", error);
         } finally {
@@ -35,68 +31,22 @@ export default function Home() {
         }
     };
 
-    const fetchAnswerCounts = async (questionsData) => {
-        try {
-            const token = localStorage.getItem(config.TOKEN_KEY);
-            
-            // Create promises for fetching each question's details
-            const answerCountPromises = questionsData.map(async (question) => {
-                try {
-                    const questionId = question.qid || question.id;
-                    
-                    if (!questionId) {
-                        console.warn('Home: No question ID found for question:', question);
-                        return {
-                            ...question,
-                            answer_count: 0
-                        };
-                    }
-                    
-                    const response = await axios.get(`${config.API_BASE_URL}/question/${questionId}`, {
-                        headers: {
-                            Authorization: `Bearer ${token}`,
-                        },
-                    });
-                    
-                    return {
-                        ...question,
-                        answer_count: response.data.answers ? response.data.answers.length : 0
-                    };
-                } catch (error) {
-                    console.error(`Error fetching answers for question ${question.qid || question.id}:`, error);
-                    return {
-                        ...question,
-                        answer_count: 0
-                    };
-                }
-            });
-
-            // Wait for all promises to resolve
-            const questionsWithCounts = await Promise.all(answerCountPromises);
-            setQuestionsWithAnswerCount(questionsWithCounts);
-        } catch (error) {
-            console.error("Error fetching answer counts:", error);
-            // Fallback: set answer_count to 0 for all questions
-            setQuestionsWithAnswerCount(questionsData.map(q => ({ ...q, answer_count: 0 })));
-        }
-    };
-
     const uniqueTags = useMemo(() => {
-        const allTags = questionsWithAnswerCount.flatMap(q => 
+        const allTags = questions.flatMap(q => 
             q.tags ? (typeof q.tags === 'string' ? q.tags.split(',') : q.tags) : []
         );
         return [...new Set(allTags.map(tag => tag.trim()))].filter(Boolean);
-    }, [questionsWithAnswerCount]);
+    }, [questions]);
 
     const filteredPosts = useMemo(() => {
-        return questionsWithAnswerCount.filter((q) => {
+        return questions.filter((q) => {
             const matchSearch = q.title.toLowerCase().includes(search.toLowerCase()) || 
-                               q.desc.toLowerCase().includes(search.toLowerCase());
+                               q.excerpt.toLowerCase().includes(search.toLowerCase());
             const matchTag = selectedTag === "All" || 
                            (q.tags && q.tags.toLowerCase().includes(selectedTag.toLowerCase()));
             return matchSearch && matchTag;
         });
-    }, [questionsWithAnswerCount, search, selectedTag]);
+    }, [questions, search, selectedTag]);
 
     const totalPages = Math.ceil(filteredPosts.length / postsPerPage);
     const paginatedPosts = useMemo(() => {
@@ -161,7 +111,7 @@ export default function Home() {
                 {loading ? (
                     <div className="flex justify-center items-center py-8">
                         <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
-                        <span className="ml-2 text-gray-600 dark:text-gray-300">Loading questions and answer counts...</span>
+                        <span className="ml-2 text-gray-600 dark:text-gray-300">Loading questions...</span>
                     </div>
                 ) : paginatedPosts.length === 0 ? (
                     <div className="text-center py-8 text-gray-500 dark:text-gray-400">
@@ -175,7 +125,7 @@ export default function Home() {
                                 qid={q.qid}
                                 title={q.title}
                                 tags={q.tags}
-                                desc={q.desc}
+                                desc={q.excerpt}
                                 totalAns={q.answer_count || 0}
                                 username={q.username}
                                 votes={q.votes}
@@ -43,6 +43,7 @@ const Login = () => {
             console.log(response.data);
             
             localStorage.setItem(config.TOKEN_KEY, response.data.access_token);
+            localStorage.setItem(config.REFRESH_TOKEN_KEY, response.data.refresh_token);
             localStorage.setItem(config.USER_KEY, JSON.stringify(response.data.user));
             console.log("Login success ✅");
             setMsg("Login Success! ");
@@ -13,12 +13,14 @@ const PostDetail = () => {
   const { state } = useLocation();
   const [post, setPost] = useState(null);
   const [answers, setAnswers] = useState([]);
+  const [voteStats, setVoteStats] = useState({}); // item_id -> {total_votes, user_vote}
   const [loading, setLoading] = useState(true);
   const [editorValue, setEditorValue] = useState("");
   const [submitting, setSubmitting] = useState(false);
 
   useEffect(() => {
     fetchPost();
+    fetchVoteStats();
   }, [id]);
 
   const fetchPost = async () => {
@@ -39,6 +41,24 @@ const PostDetail = () => {
     }
   };
 
+  // One request for the question's and all its answers' votes, instead of one per post
+  const fetchVoteStats = async () => {
+    try {
+      const token = localStorage.getItem(config.TOKEN_KEY);
+      const response = await axios.get(`${config.API_BASE_URL}/vote/question/${id}/page-stats`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+      });
+
+      const stats = {};
+      [response.data.question, ...response.data.answers].forEach((item) => {
+        stats[item.item_id] = item;
+      });
+      setVoteStats(stats);
+    } catch (error) {
+      console.error("Error fetching vote stats:", error);
+    }
+  };
+
   const handleSubmit = async () => {
     if (!editorValue.trim()) {
       alert("Please write an answer before submitting.");
@@ -65,6 +85,7 @@ const PostDetail = () => {
       alert("Answer submitted successfully!");
       setEditorValue("");
       fetchPost(); // Refresh to get new answer
+      fetchVoteStats();
     } catch (error) {
       console.error("Error submitting answer:", error);
       alert("Failed to submit answer. Please try again.");
@@ -109,7 +130,12 @@ const PostDetail = () => {
 
       <Card className="dark:bg-gray-800 dark:border-gray-700 bg-white border-gray-200 shadow-lg flowbite-card">
         <div className="flex mt-6 p-6 bg-white dark:bg-gray-800">
-          <Votes vote={post.votes || 0} itemId={post.qid} isAnswer={false} />
+          <Votes
+            vote={voteStats[post.qid]?.total_votes ?? post.votes ?? 0}
+            userVote={voteStats[post.qid]?.user_vote ?? null}
+            itemId={post.qid}
+            isAnswer={false}
+          />
 
           <div className="flex-1 p-3 bg-white dark:bg-gray-800">
             <h1 className="text-2xl font-bold text-gray-800 dark:text-white mb-2">{post.title}</h1>
@@ -155,7 +181,8 @@ const PostDetail = () => {
                 key={answer.aid}
                 answerId={answer.aid}
                 content={answer.content}
-                votes={answer.votes}
+                votes={voteStats[answer.aid]?.total_votes ?? answer.votes}
+                userVote={voteStats[answer.aid]?.user_vote ?? null}
                 username={answer.username}
                 accepted={answer.accepted}
                 qid={post.qid}
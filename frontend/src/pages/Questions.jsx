@@ -9,7 +9,6 @@ const Questions = () => {
     const [search, setSearch] = useState("");
     const [sort, setSort] = useState("latest");
     const [questions, setQuestions] = useState([]);
-    const [questionsWithAnswerCount, setQuestionsWithAnswerCount] = useState([]);
     const [loading, setLoading] = useState(false);
     const [currentPage, setCurrentPage] = useState(1);
     const [totalPages, setTotalPages] = useState(1);
@@ -42,9 +41,6 @@ const Questions = () => {
             const questionsData = response.data;
             setQuestions(questionsData);
             setTotalPages(Math.ceil(questionsData.length / postsPerPage));
-            
-            // Fetch answer counts for each question
-            await fetchAnswerCounts(questionsData);
         } catch (error) {
             console.error("Error fetching questions:", error);
         } finally {
@@ -64,9 +60,6 @@ const Questions = () => {
             const questionsData = response.data;
             setQuestions(questionsData);
             setCurrentPage(1);
-            
-            // Fetch answer counts for each question
-            await fetchAnswerCounts(questionsData);
         } catch (error) {
             console.error("Error searching questions:", error);
         } finally {
@@ -74,42 +67,6 @@ const Questions = () => {
         }
     };
 
-    const fetchAnswerCounts = async (questionsData) => {
-        try {
-            const token = localStorage.getItem(config.TOKEN_KEY);
-            
-            // Create promises for fetching each question's details
-            const answerCountPromises = questionsData.map(async (question) => {
-                try {
-                    const response = await axios.get(`${config.API_BASE_URL}/question/${question.qid}`, {
-                        headers: {
-                            Authorization: `Bearer ${token}`,
-                        },
-                    });
-                    
-                    return {
-                        ...question,
-                        answer_count: response.data.answers ? response.data.answers.length : 0
-                    };
-                } catch (error) {
-                    console.error(`Error fetching answers for question ${question.qid}:`, error);
-                    return {
-                        ...question,
-                        answer_count: 0
-                    };
-                }
-            });
-
-            // Wait for all promises to resolve
-            const questionsWithCounts = await Promise.all(answerCountPromises);
-            setQuestionsWithAnswerCount(questionsWithCounts);
-        } catch (error) {
-            console.error("Error fetching answer counts:", error);
-            // Fallback: set answer_count to 0 for all questions
-            setQuestionsWithAnswerCount(questionsData.map(q => ({ ...q, answer_count: 0 })));
-        }
-    };
-
     return (
         <main className='w-full min-h-screen bg-gray-100 dark:bg-gray-900 p-6'>
             {/* Header */}
@@ -151,21 +108,21 @@ const Questions = () => {
                 {loading ? (
                     <div className="flex justify-center items-center py-8">
                         <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600"></div>
-                        <span className="ml-2 text-gray-600 dark:text-gray-300">Loading questions and answer counts...</span>
+                        <span className="ml-2 text-gray-600 dark:text-gray-300">Loading questions...</span>
                     </div>
-                ) : questionsWithAnswerCount.length === 0 ? (
+                ) : questions.length === 0 ? (
                     <div className="text-center py-8 text-gray-500 dark:text-gray-400">
                         {search ? 'No questions found matching your search.' : 'No questions available.'}
                     </div>
                 ) : (
                     <div className="flex flex-col gap-4">
-                        {questionsWithAnswerCount.map((q) => (
+                        {questions.map((q) => (
                             <PostCard
                                 key={q.qid}
                                 qid={q.qid}
                                 title={q.title}
                                 tags={q.tags}
-                                desc={q.desc}
+                                desc={q.excerpt}
                                 totalAns={q.answer_count || 0}
                                 username={q.username}
                                 votes={q.votes}
@@ -176,7 +133,7 @@ const Questions = () => {
                 )}
 
                 {/* Pagination Controls */}
-                {!loading && questionsWithAnswerCount.length > 0 && (
+                {!loading && questions.length > 0 && (
                     <div className="flex justify-center items-center gap-2 mt-6">
                         <Button
                             size="sm"
@@ -190,7 +147,7 @@ const Questions = () => {
                         </span>
                         <Button
                             size="sm"
-                            disabled={questionsWithAnswerCount.length < postsPerPage}
+                            disabled={questions.length < postsPerPage}
                             onClick={() => setCurrentPage((p) => p + 1)}
                         >
                             Next
@@ -63,17 +63,39 @@ class NotificationService {
         }
     }
 
+    // Mark several notifications as read: a list of ids, or everything up to a created_at
+    async markManyAsRead({ notificationIds, before } = {}) {
+        try {
+            const response = await this.api.post('/notification/bulk/read', {
+                notification_ids: notificationIds,
+                before: before
+            });
+            return response.data;
+        } catch (error) {
+            throw new Error(error.response?.data?.detail || 'Failed to mark notifications as read');
+        }
+    }
+
+    // Delete several notifications: a list of ids, or everything up to a created_at
+    async deleteMany({ notificationIds, before } = {}) {
+        try {
+            const response = await this.api.post('/notification/bulk/delete', {
+                notification_ids: notificationIds,
+                before: before
+            });
+            return response.data;
+        } catch (error) {
+            throw new Error(error.response?.data?.detail || 'Failed to delete notifications');
+        }
+    }
+
     // Get unread count
     async getUnreadCount() {
         try {
-            const response = await this.api.get('/notification/', {
-                params: { 
-                    unread_only: true,
-                    limit: 1000
-                }
-            });
+            // Cheap counter read; the browser revalidates it with its ETag
+            const response = await this.api.get('/notification/unread-count');
             return {
-                unread_count: response.data.unread_count || (response.data.notifications ? response.data.notifications.length : 0)
+                unread_count: response.data.unread_count || 0
             };
         } catch (error) {
             console.error('Unread count API error:', error.response?.data);
@@ -0,0 +1,81 @@
+import axios from 'axios';
+import config from '../config/config.js';
+
+// Access tokens are short-lived: renew them shortly before they expire with the
+// rotating refresh token. Each refresh token works once, so tabs take turns.
+const REFRESH_MARGIN_MS = 60 * 1000;
+const CHECK_INTERVAL_MS = 30 * 1000;
+const REFRESH_LOCK_KEY = 'tokenRefreshStartedAt';
+const REFRESH_LOCK_MS = 10 * 1000;
+// Dispatched on window after this tab stores a new access token
+export const TOKEN_REFRESHED_EVENT = 'tokenRefreshed';
+
+const tokenExpiry = (token) => {
+    try {
+        const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')));
+        return payload.exp * 1000;
+    } catch {
+        return 0;
+    }
+};
+
+const clearLogin = () => {
+    localStorage.removeItem(config.IS_LOGGED_IN_KEY);
+    localStorage.removeItem(config.USER_KEY);
+    localStorage.removeItem(config.TOKEN_KEY);
+    localStorage.removeItem(config.REFRESH_TOKEN_KEY);
+    localStorage.removeItem(config.USERNAME_KEY);
+    window.dispatchEvent(new Event('loginStateChanged'));
+};
+
+export const refreshTokens = async () => {
+    const refreshToken = localStorage.getItem(config.REFRESH_TOKEN_KEY);
+    if (!refreshToken) return false;
+
+    // Another tab is already rotating the shared refresh token
+    const startedAt = Number(localStorage.getItem(REFRESH_LOCK_KEY) || 0);
+    if (Date.now() - startedAt < REFRESH_LOCK_MS) return false;
+    localStorage.setItem(REFRESH_LOCK_KEY, String(Date.now()));
+
+    try {
+        const response = await axios.post(`${config.API_BASE_URL}/auth/refresh`, {
+            refresh_token: refreshToken
+        });
+        localStorage.setItem(config.TOKEN_KEY, response.data.access_token);
+        localStorage.setItem(config.REFRESH_TOKEN_KEY, response.data.refresh_token);
+        window.dispatchEvent(new Event(TOKEN_REFRESHED_EVENT));
+        return true;
+    } catch (error) {
+        // Expired or revoked login
+        if (error.response?.status === 401) {
+            clearLogin();
+        }
+        return false;
+    } finally {
+        localStorage.removeItem(REFRESH_LOCK_KEY);
+    }
+};
+
+export const startTokenRefresh = () => {
+    const check = () => {
+        const token = localStorage.getItem(config.TOKEN_KEY);
+        if (token && tokenExpiry(token) - Date.now() < REFRESH_MARGIN_MS) {
+            refreshTokens();
+        }
+    };
+    check();
+    const interval = setInterval(check, CHECK_INTERVAL_MS);
+    return () => clearInterval(interval);
+};
+
+export const logout = async () => {
+    const refreshToken = localStorage.getItem(config.REFRESH_TOKEN_KEY);
+    if (refreshToken) {
+        try {
+            await axios.post(`${config.API_BASE_URL}/auth/logout`, { refresh_token: refreshToken });
+        } catch (error) {
+            console.warn('Logout request failed:', error.message);
+        }
+    }
+    clearLogin();
+};